@@ -8,7 +8,7 @@ import pandas as pd
 from datetime import datetime
 import plotly.express as px
 import plotly.graph_objects as go
-from backend.collectors.defillama import DefiLlamaCollector
+from backend.snapshot import get_bridge_snapshot
 
 # Configuration
 st.set_page_config(
@@ -70,14 +70,11 @@ st.title("🔗 XRSK Platform")
 st.markdown('<p class="xrsk-baseline"><strong>Cross-Chain Risk Intelligence</strong> — Real-time bridge analytics & DeFi compliance research</p>', unsafe_allow_html=True)
 st.markdown("---")
 
-# Chargement données
-@st.cache_data(ttl=300)
-def load_bridge_data():
-    collector = DefiLlamaCollector()
-    bridges = collector.get_formatted_bridges()
-    if not bridges:
+# Chargement données (snapshot partagé avec les autres pages)
+def load_bridge_data(snapshot):
+    if snapshot.empty:
         return pd.DataFrame()
-    df = pd.DataFrame(bridges)
+    df = snapshot.frame
     
     # Calculs métriques supplémentaires
     df['dominance_volume'] = (df['volume_24h'] / df['volume_24h'].sum() * 100)
@@ -85,12 +82,16 @@ def load_bridge_data():
     return df
 
 with st.spinner("🔄 Chargement des données bridges..."):
-    df_bridges = load_bridge_data()
+    snapshot = get_bridge_snapshot()
+    df_bridges = load_bridge_data(snapshot)
 
 if df_bridges.empty:
     st.error("❌ Impossible de charger les données. Vérifiez votre connexion.")
     st.stop()
 
+if snapshot.stale:
+    st.warning(f"⚠️ Données du {snapshot.fetched_at.strftime('%d/%m %H:%M')} - actualisation DefiLlama en cours ou source indisponible")
+
 # Filtrer les bridges avec volume > 0 pour les stats
 df_active = df_bridges[df_bridges['volume_24h'] > 0].copy()
 
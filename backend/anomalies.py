@@ -0,0 +1,194 @@
+"""
+Détection d'anomalies de TVL et de volume en flux (vidange, afflux,
+effondrement ou pic de volume)
+
+À chaque snapshot, la variation log de chaque métrique surveillée
+(MONITORED) de chaque bridge depuis le snapshot précédent (ramenée à un
+pas de RAW_STEP) est comparée à une référence propre au bridge et à la
+métrique : moyenne et écart absolu moyen exponentiels des variations
+passées. Le z-score robuste qui en résulte est calculé pour tous les
+bridges en une passe vectorisée ; au-delà des seuils de SEVERITIES, une
+anomalie est enregistrée avec sa sévérité.
+
+L'écart-type de référence a un plancher par métrique (variation minimum
+signalée / seuil 'medium') : pour un bridge calme, les sévérités
+correspondent à l'amplitude de la variation (TVL : environ 2 % medium,
+3 % high, 5 % critical) au lieu de classer critique tout mouvement franchissant le
+filtre de variation minimum.
+
+La référence est mise à jour avec le résidu écrêté (HUBER_CLIP) : une
+vidange ne déplace pas la référence qui sert à détecter la suivante.
+L'état par bridge (table bridge_anomaly_state, colonnes par métrique) est
+de taille fixe et persisté avec les anomalies dans la même transaction :
+coût constant par snapshot quelle que soit la longueur de l'historique,
+et pas de perte des références au redémarrage.
+
+Utilisation :
+    from backend.anomalies import get_anomalies
+    recent = get_anomalies(start=datetime.now() - timedelta(days=1), min_severity='high')
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.history import DAY, RAW_STEP, HistoryStore, Timestamp, get_history_store, to_epoch
+
+# Sévérités, de la plus forte à la plus faible : |z-score| minimum
+SEVERITIES = [('critical', 10.0), ('high', 6.0), ('medium', 4.0)]
+
+# Métriques surveillées : variation minimum signalée (relative) et valeur
+# précédente minimum surveillée (USD)
+# HOOK: Ajouter ici les métriques surveillées (colonnes du snapshot et de bridge_anomaly_state)
+MONITORED: Dict[str, Dict[str, float]] = {
+    'tvl': {'min_change': 0.02, 'min_value': 1e5},
+    'volume_24h': {'min_change': 0.10, 'min_value': 1e4},
+}
+
+# Constante de temps de la référence (secondes)
+BASELINE_WINDOW = 3 * DAY
+
+# Variations observées avant de lever des alertes sur un bridge
+MIN_OBSERVATIONS = 12
+
+# Écrêtage du résidu (en écarts-types) pour la mise à jour de la référence
+HUBER_CLIP = 3.0
+
+# Rapport minimum nouvelle / ancienne valeur (borne la variation log d'une
+# valeur tombée à 0)
+FLOOR_RATIO = 1e-6
+
+# Écart absolu moyen -> écart-type (loi normale)
+MAD_TO_SIGMA = np.sqrt(np.pi / 2)
+
+# Colonnes d'état par métrique (préfixées par la métrique dans bridge_anomaly_state)
+METRIC_STATE = ['n', 'last', 'mean', 'mad']
+
+STATE_COLUMNS = ['ts', *(f"{metric}_{name}" for metric in MONITORED for name in METRIC_STATE)]
+
+ANOMALY_COLUMNS = ['ts', 'bridge_id', 'metric', 'kind', 'severity', 'value', 'previous', 'change_pct', 'zscore']
+
+
+def min_scale(metric: str) -> float:
+    """
+    Plancher d'écart-type des variations log d'une métrique : une
+    variation égale au minimum signalé a un z-score égal au seuil 'medium'
+    """
+    return float(np.log1p(MONITORED[metric]['min_change']) / SEVERITIES[-1][1])
+
+
+def detect(state: pd.DataFrame, frame: pd.DataFrame, ts: Timestamp) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Détecte les anomalies d'un snapshot et met à jour les références
+
+    Args:
+        state: États précédents indexés par bridge_id (STATE_COLUMNS)
+        frame: DataFrame bridges (colonnes formatting.BRIDGE_DTYPES)
+        ts: Date du snapshot
+
+    Returns:
+        (anomalies [ANOMALY_COLUMNS], nouveaux états des bridges du snapshot).
+        Un snapshot plus ancien que l'état d'un bridge (rattrapage) est
+        ignoré pour ce bridge.
+    """
+    t = to_epoch(ts)
+    current = frame.drop_duplicates('id', keep='last')
+    ids = current['id'].astype('int64').to_numpy()
+    prev = state.reindex(ids)
+
+    def column(name):
+        return prev[name].to_numpy(dtype='float64', na_value=np.nan)
+
+    last_ts = column('ts')
+    new = np.isnan(last_ts)
+    late = ~new & (last_ts >= t)
+    dt = np.where(new | late, 0.0, t - last_ts)
+
+    values = {'ts': np.where(late, last_ts, t)}
+    found = []
+    for metric, limits in MONITORED.items():
+        x = current[metric].to_numpy(dtype='float64')
+        last, n = column(f"{metric}_last"), np.nan_to_num(column(f"{metric}_n"))
+        mean, mad = np.nan_to_num(column(f"{metric}_mean")), np.nan_to_num(column(f"{metric}_mad"))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Variation log ramenée à un pas nominal, z-score robuste
+            # (une valeur tombée à 0 compte comme une baisse de FLOOR_RATIO)
+            valid = ~new & ~late & (x >= 0) & (last > 0)
+            ratio = np.maximum(x / last, FLOOR_RATIO)
+            r = np.where(valid, np.log(ratio) / np.sqrt(np.maximum(dt / RAW_STEP, 1.0)), np.nan)
+            scale = np.maximum(MAD_TO_SIGMA * mad, min_scale(metric))
+            z = (r - mean) / scale
+            change = x / last - 1
+
+        strength = np.abs(np.nan_to_num(z))
+        flagged = (valid & (n >= MIN_OBSERVATIONS) & (strength >= SEVERITIES[-1][1])
+                   & (np.abs(change) >= limits['min_change']) & (last >= limits['min_value']))
+        severity = np.select([strength >= limit for _, limit in SEVERITIES], [name for name, _ in SEVERITIES], '')
+        found.append(pd.DataFrame({
+            'ts': t,
+            'bridge_id': ids[flagged],
+            'metric': metric,
+            'kind': np.where(change[flagged] < 0, 'drop', 'spike'),
+            'severity': severity[flagged],
+            'value': x[flagged],
+            'previous': last[flagged],
+            'change_pct': change[flagged] * 100,
+            'zscore': z[flagged],
+        }, columns=ANOMALY_COLUMNS))
+
+        # Référence : EWMA en temps du résidu écrêté (apprentissage rapide au démarrage)
+        alpha = np.maximum(1.0 - np.exp(-dt / BASELINE_WINDOW), 1.0 / np.maximum(n, 1.0))
+        residual = np.nan_to_num(r - mean)
+        residual = np.where(n >= MIN_OBSERVATIONS,
+                            np.clip(residual, -HUBER_CLIP * scale, HUBER_CLIP * scale), residual)
+        learn = np.isfinite(r)
+        values[f"{metric}_n"] = np.where(late, n, n + learn)
+        values[f"{metric}_last"] = np.where(late | np.isnan(x), last, x)
+        values[f"{metric}_mean"] = np.where(learn, mean + alpha * residual, mean)
+        values[f"{metric}_mad"] = np.where(learn, (1 - alpha) * mad + alpha * np.abs(residual), mad)
+
+    updated = pd.DataFrame(values, index=pd.Index(ids, name='bridge_id'))[STATE_COLUMNS]
+    updated = updated.astype({'ts': 'int64', **{f"{metric}_n": 'int64' for metric in MONITORED}})
+    anomalies = pd.concat(found, ignore_index=True) if any(len(f) for f in found) else found[0]
+    return anomalies, updated
+
+
+def detect_snapshot(frame: pd.DataFrame, ts: Timestamp, store: Optional[HistoryStore] = None) -> pd.DataFrame:
+    """
+    Détection sur un nouveau snapshot ; anomalies et états persistés
+    ensemble
+
+    Returns:
+        Anomalies du snapshot [ANOMALY_COLUMNS]
+    """
+    store = store or get_history_store()
+    anomalies, state = detect(store.read_bridge_table('bridge_anomaly_state'), frame, ts)
+    store.append_anomalies(anomalies, state)
+    return anomalies
+
+
+def get_anomalies(
+    bridge_ids: Optional[Sequence[int]] = None,
+    start: Optional[Timestamp] = None,
+    end: Optional[Timestamp] = None,
+    min_severity: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Anomalies enregistrées, plus récentes en premier
+
+    Args:
+        bridge_ids: Bridges (tous si None)
+        start: Début inclus
+        end: Fin incluse
+        min_severity: Sévérité minimum ('medium', 'high', 'critical')
+
+    Returns:
+        DataFrame [ANOMALY_COLUMNS], ts en datetime
+    """
+    names = [name for name, _ in SEVERITIES]
+    if min_severity is not None and min_severity not in names:
+        raise ValueError(f"Sévérité inconnue: {min_severity}. Disponibles: {names}")
+    severities = names[:names.index(min_severity) + 1] if min_severity else None
+    return get_history_store().read_anomalies(bridge_ids, start, end, severities)
@@ -0,0 +1,167 @@
+"""
+Backfill de l'historique quotidien des bridges
+
+Récupère l'historique complet /bridgevolume de chaque bridge (un appel par
+bridge couvre tout l'historique), par lots traités en parallèle, et le
+charge en masse dans le store historique. Chaque lot est chargé avec ses
+points de reprise dans une seule transaction : un backfill interrompu
+reprend au lot suivant.
+
+Utilisation :
+    python -m backend.backfill
+    python -m backend.backfill --bridges 1 2 3 --chunk-size 20
+    python -m backend.backfill --restart
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from backend.collectors.defillama import DefiLlamaCollector
+from backend.collectors.defillama_async import DEFAULT_CONCURRENCY, AsyncDefiLlamaCollector
+from backend.history import HistoryStore, get_history_store
+
+# Nom du job de backfill (points de reprise)
+VOLUME_JOB = 'bridgevolume'
+
+# Bridges par lot chargé (et par point de reprise)
+DEFAULT_CHUNK_SIZE = 50
+
+# Colonnes et types de l'historique quotidien chargé (voir HistoryStore.load_daily)
+DAILY_DTYPES = {
+    'bridge_id': 'int64',
+    'day': 'int64',
+    'deposit_usd': 'float64',
+    'withdraw_usd': 'float64',
+    'deposit_txs': 'int64',
+    'withdraw_txs': 'int64',
+}
+
+
+def volumes_to_frame(volumes: Dict[int, List[Dict]]) -> pd.DataFrame:
+    """
+    Réponses /bridgevolume -> DataFrame (colonnes DAILY_DTYPES)
+
+    Args:
+        volumes: {bridge_id: [{date, depositUSD, withdrawUSD, depositTxs, withdrawTxs}]}
+    """
+    records = [dict(day, bridge_id=bridge_id) for bridge_id, days in volumes.items() for day in days or []]
+    if not records:
+        return pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in DAILY_DTYPES.items()})
+
+    raw = pd.DataFrame.from_records(records)
+
+    def column(name, dtype):
+        values = raw[name] if name in raw else pd.Series(0, index=raw.index)
+        return pd.to_numeric(values, errors='coerce').fillna(0).astype(dtype)
+
+    frame = pd.DataFrame({
+        'bridge_id': raw['bridge_id'].astype('int64'),
+        'day': column('date', 'int64'),
+        'deposit_usd': column('depositUSD', 'float64'),
+        'withdraw_usd': column('withdrawUSD', 'float64'),
+        'deposit_txs': column('depositTxs', 'int64'),
+        'withdraw_txs': column('withdrawTxs', 'int64'),
+    })
+    return frame[frame['day'] > 0]
+
+
+def _chunks(items: List[int], size: int) -> Iterable[List[int]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def _backfill(bridge_ids: List[int], store: HistoryStore, chunk_size: int, max_concurrency: int,
+                    base_url: Optional[str]) -> Dict[str, int]:
+    stats = {'bridges': 0, 'days': 0, 'failed': 0}
+    loading: Optional[asyncio.Task] = None
+
+    async with AsyncDefiLlamaCollector(max_concurrency=max_concurrency, base_url=base_url) as collector:
+        for chunk in _chunks(bridge_ids, chunk_size):
+            volumes = await collector.get_many_bridge_volumes(chunk)
+            frame = volumes_to_frame(volumes)
+
+            # Chargement du lot en parallèle du téléchargement du suivant
+            if loading is not None:
+                await loading
+            loading = asyncio.create_task(asyncio.to_thread(store.load_daily, frame, VOLUME_JOB, list(volumes)))
+
+            stats['bridges'] += len(volumes)
+            stats['days'] += len(frame)
+            stats['failed'] += len(chunk) - len(volumes)
+            print(f"   {stats['bridges'] + stats['failed']}/{len(bridge_ids)} bridges traités")
+
+        if loading is not None:
+            await loading
+    return stats
+
+
+def backfill_history(
+    bridge_ids: Optional[Iterable[int]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_concurrency: int = DEFAULT_CONCURRENCY,
+    restart: bool = False,
+    store: Optional[HistoryStore] = None,
+    base_url: Optional[str] = None,
+) -> Dict[str, int]:
+    """
+    Charge l'historique quotidien de tous les bridges
+
+    Args:
+        bridge_ids: Bridges à charger (défaut : tous les bridges de /bridges)
+        chunk_size: Bridges par lot (un point de reprise par lot)
+        max_concurrency: Appels simultanés vers l'API
+        restart: Ignore les points de reprise et recharge tout
+        store: Store historique (défaut : store partagé)
+        base_url: URL de l'API (défaut : settings.DEFILLAMA_BASE_URL)
+
+    Returns:
+        Statistiques {bridges, days, failed, skipped}
+    """
+    store = store or get_history_store()
+
+    if bridge_ids is None:
+        columns = DefiLlamaCollector(base_url=base_url).get_bridge_columns()
+        if not columns:
+            print("❌ Backfill impossible: liste des bridges indisponible")
+            return {'bridges': 0, 'days': 0, 'failed': 0, 'skipped': 0}
+        bridge_ids = columns.ids
+
+    ids = list(dict.fromkeys(int(i) for i in bridge_ids))
+    if restart:
+        store.reset_backfill(VOLUME_JOB)
+    done = store.backfill_done(VOLUME_JOB)
+    todo = [i for i in ids if i not in done]
+    if done:
+        print(f"✓ Reprise du backfill: {len(ids) - len(todo)}/{len(ids)} bridges déjà chargés")
+
+    started = time.monotonic()
+    stats = asyncio.run(_backfill(todo, store, chunk_size, max_concurrency, base_url)) if todo else \
+        {'bridges': 0, 'days': 0, 'failed': 0}
+    stats['skipped'] = len(ids) - len(todo)
+
+    print(f"✓ Backfill terminé en {time.monotonic() - started:.0f}s: {stats['bridges']} bridges, "
+          f"{stats['days']} jours ({stats['failed']} échecs, {stats['skipped']} déjà chargés)")
+    if stats['failed']:
+        print("⚠️ Relancer la commande pour reprendre les bridges en échec")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m backend.backfill', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--bridges', type=int, nargs='*', default=None, help='IDs des bridges (défaut: tous)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--restart', action='store_true', help='Ignore les points de reprise')
+    parser.add_argument('--base-url', default=None)
+    args = parser.parse_args(argv)
+
+    backfill_history(args.bridges or None, chunk_size=args.chunk_size, max_concurrency=args.concurrency,
+                     restart=args.restart, base_url=args.base_url)
+
+
+if __name__ == '__main__':
+    main()
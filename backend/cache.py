@@ -0,0 +1,180 @@
+"""
+Cache disque des réponses brutes des collecteurs
+
+Chaque réponse est stockée compressée (gzip) avec ses validateurs HTTP ;
+la date de collecte est la date de modification du fichier. Une entrée est fraîche pendant `ttl` secondes, puis
+périmée mais utilisable pendant `stale_ttl` secondes supplémentaires
+(stale-while-revalidate) : les pages l'affichent immédiatement pendant
+qu'un rafraîchissement tourne en arrière-plan.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from backend.settings import CACHE_DIR
+
+# Fraîcheur d'une entrée (secondes)
+DEFAULT_TTL = 300
+
+# Fenêtre stale-while-revalidate après expiration (secondes)
+DEFAULT_STALE_TTL = 24 * 3600
+
+
+@dataclass
+class CacheEntry:
+    """Réponse brute mise en cache"""
+    body: bytes
+    stored_at: float
+    validators: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class DiskCache:
+    """
+    Cache clé → réponse brute, un fichier gzip par clé
+    Écritures atomiques : un lecteur ne voit jamais de fichier partiel.
+    """
+
+    def __init__(self, directory=CACHE_DIR, ttl: float = DEFAULT_TTL, stale_ttl: float = DEFAULT_STALE_TTL):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return self.directory / f"{digest}.json.gz"
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return entry.age <= self.ttl
+
+    def get(self, key: str, allow_expired: bool = False) -> Optional[CacheEntry]:
+        """
+        Lit une entrée
+
+        Args:
+            key: Clé de l'entrée
+            allow_expired: Retourner l'entrée même au-delà de la fenêtre
+                stale (dernier recours quand la source est indisponible)
+
+        Returns:
+            CacheEntry fraîche ou périmée-utilisable, None si absente,
+            illisible ou au-delà de la fenêtre stale
+        """
+        path = self._path(key)
+        try:
+            stored_at = path.stat().st_mtime
+            with gzip.open(path, 'rb') as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError) as e:
+            print(f"⚠️  Cache illisible {path.name}: {e}")
+            return None
+
+        entry = CacheEntry(body, stored_at, meta.get('validators', {}))
+        if not allow_expired and entry.age > self.ttl + self.stale_ttl:
+            return None
+        return entry
+
+    def set(self, key: str, body: bytes, validators: Optional[Dict[str, str]] = None):
+        """Écrit une entrée (remplacement atomique)"""
+        with self.writer(key, validators) as sink:
+            sink.write(body)
+
+    @contextmanager
+    def writer(self, key: str, validators: Optional[Dict[str, str]] = None):
+        """
+        Écriture en flux d'une entrée : sink.write(morceau) dans le bloc
+
+        L'entrée n'est publiée qu'à la sortie normale du bloc. Une erreur
+        disque désactive l'écriture sans interrompre l'appelant.
+        """
+        sink = _EntryWriter(self.directory, self._path(key), {'key': key, 'validators': validators or {}})
+        try:
+            yield sink
+        except BaseException:
+            sink.discard()
+            raise
+        sink.commit()
+
+    def touch(self, key: str):
+        """Remet à zéro l'âge d'une entrée (réponse 304 : contenu confirmé)"""
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+
+class _EntryWriter:
+    """Fichier temporaire gzip publié par renommage atomique"""
+
+    def __init__(self, directory: Path, path: Path, meta: Dict):
+        self.path = path
+        self._tmp_path = None
+        self._raw = None
+        self._gzip = None
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            fd, self._tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            self._raw = os.fdopen(fd, 'wb')
+            self._gzip = gzip.GzipFile(fileobj=self._raw, mode='wb', compresslevel=6)
+            self._gzip.write(json.dumps(meta).encode('utf-8') + b'\n')
+        except OSError as e:
+            self._fail(e)
+
+    def _fail(self, error: OSError):
+        print(f"⚠️  Écriture cache impossible ({self.path.name}): {error}")
+        self.discard()
+
+    def write(self, chunk: bytes):
+        if self._gzip is None:
+            return
+        try:
+            self._gzip.write(chunk)
+        except OSError as e:
+            self._fail(e)
+
+    def _close(self):
+        for f in (self._gzip, self._raw):
+            if f is not None:
+                try:
+                    f.close()
+                except OSError:
+                    pass
+        self._gzip = self._raw = None
+
+    def commit(self):
+        if self._gzip is None:
+            return
+        try:
+            self._gzip.close()
+            self._raw.close()
+            self._gzip = self._raw = None
+            os.replace(self._tmp_path, self.path)
+            self._tmp_path = None
+        except OSError as e:
+            self._fail(e)
+
+    def discard(self):
+        self._close()
+        if self._tmp_path is not None:
+            try:
+                os.unlink(self._tmp_path)
+            except OSError:
+                pass
+            self._tmp_path = None
@@ -0,0 +1,97 @@
+"""
+Circuit breaker des endpoints collecteurs
+
+- Fermé : les appels passent ; après `failure_threshold` échecs
+  consécutifs, le circuit s'ouvre.
+- Ouvert : les appels échouent immédiatement (CircuitOpenError) pendant
+  `recovery_timeout` secondes, sans attendre le timeout réseau.
+- Semi-ouvert : un seul appel de test passe ; succès -> fermé,
+  échec -> ouvert à nouveau.
+"""
+
+import threading
+import time
+from typing import Dict
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Appel refusé : circuit ouvert"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"circuit '{name}' ouvert - nouvel essai dans {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Circuit breaker thread-safe d'un endpoint"""
+
+    def __init__(self, name: str, failure_threshold: int = 3, recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def before_call(self):
+        """
+        À appeler avant chaque requête
+
+        Raises:
+            CircuitOpenError: circuit ouvert, ou test semi-ouvert déjà en cours
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            elapsed = time.monotonic() - self._opened_at
+            if self._state == OPEN and elapsed < self.recovery_timeout:
+                raise CircuitOpenError(self.name, self.recovery_timeout - elapsed)
+            if self._probe_in_flight:
+                raise CircuitOpenError(self.name, 0)
+            self._state = HALF_OPEN
+            self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                print(f"✓ Circuit '{self.name}' refermé")
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    print(f"⚠️  Circuit '{self.name}' ouvert pour {self.recovery_timeout:.0f}s")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+
+_lock = threading.Lock()
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Circuit breaker partagé d'un endpoint (créé à la demande)"""
+    with _lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
@@ -0,0 +1,208 @@
+"""
+Décodage en flux de la réponse /bridges DefiLlama
+
+La réponse est lue par morceaux et chaque bridge est décodé puis versé
+directement dans des colonnes typées (BridgeColumns) : ni le corps complet,
+ni la liste de dictionnaires ne sont matérialisés en mémoire.
+"""
+
+import codecs
+import hashlib
+import json
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+from backend.collectors.formatting import columns_to_frame
+
+# Taille des morceaux lus sur le réseau
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+
+
+def _number(value) -> float:
+    if value is None:
+        return 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _first(bridge: Dict, *keys, default=None):
+    """Première valeur non nulle parmi plusieurs champs (fallbacks API)"""
+    for key in keys:
+        value = bridge.get(key)
+        if value is not None:
+            return value
+    return default
+
+
+@dataclass
+class BridgeColumns:
+    """
+    Bridges en colonnes typées
+
+    Les chaînes de tous les bridges sont stockées à plat dans `chains` ;
+    celles du bridge i sont chains[chain_offsets[i]:chain_offsets[i + 1]].
+    """
+    ids: array = field(default_factory=lambda: array('q'))
+    names: List[str] = field(default_factory=list)
+    tvl: array = field(default_factory=lambda: array('d'))
+    volume_24h: array = field(default_factory=lambda: array('d'))
+    volume_7d: array = field(default_factory=lambda: array('d'))
+    volume_30d: array = field(default_factory=lambda: array('d'))
+    chains: List[str] = field(default_factory=list)
+    chain_offsets: array = field(default_factory=lambda: array('q', [0]))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, bridge: Dict):
+        """Ajoute un bridge brut de l'API (mêmes fallbacks que format_bridges)"""
+        # Identifiant numérique tronqué, 0 si illisible (comme format_bridges_frame)
+        self.ids.append(int(_number(bridge.get('id'))))
+        self.names.append(str(_first(bridge, 'displayName', 'name', default='Unknown')))
+        self.tvl.append(_number(bridge.get('tvl')))
+        self.volume_24h.append(_number(_first(bridge, 'last24hVolume', 'lastDailyVolume')))
+        self.volume_7d.append(_number(bridge.get('weeklyVolume')))
+        self.volume_30d.append(_number(bridge.get('monthlyVolume')))
+        # Chaînes : liste uniquement (comme format_bridges_frame), une chaîne
+        # de caractères n'est pas découpée en lettres
+        chains = bridge.get('chains')
+        if isinstance(chains, list):
+            self.chains.extend(chains)
+        self.chain_offsets.append(len(self.chains))
+
+    @classmethod
+    def from_records(cls, bridges: Iterable[Dict]) -> 'BridgeColumns':
+        columns = cls()
+        for bridge in bridges:
+            columns.append(bridge)
+        return columns
+
+    def chains_of(self, i: int) -> List[str]:
+        return self.chains[self.chain_offsets[i]:self.chain_offsets[i + 1]]
+
+    def fingerprint(self) -> str:
+        """Empreinte du contenu (version des données)"""
+        digest = hashlib.sha1()
+        for column in (self.ids, self.tvl, self.volume_24h, self.volume_7d, self.volume_30d, self.chain_offsets):
+            digest.update(column.tobytes())
+        digest.update('\x1f'.join(self.names).encode('utf-8'))
+        digest.update('\x1f'.join(self.chains).encode('utf-8'))
+        return digest.hexdigest()[:16]
+
+    def to_frame(self, snapshot_time: Optional[datetime] = None) -> pd.DataFrame:
+        """DataFrame typé (voir formatting.BRIDGE_DTYPES)"""
+        return columns_to_frame(
+            self.ids, self.names, self.tvl, self.volume_24h, self.volume_7d, self.volume_30d,
+            self.chains, self.chain_offsets, snapshot_time,
+        )
+
+
+class _StreamReader:
+    """Tampon texte alimenté par morceaux, avec décodage JSON incrémental"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def more(self) -> bool:
+        """Lit le morceau suivant ; False en fin de flux"""
+        if self.eof:
+            return False
+        # Abandonne la partie déjà consommée du tampon
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        for chunk in self._chunks:
+            if chunk:
+                self.buf += self._utf8.decode(chunk)
+                return True
+        self.buf += self._utf8.decode(b'', final=True)
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        """Prochain caractère significatif (espaces ignorés), '' en fin de flux"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.more():
+                return ''
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"JSON /bridges inattendu: '{char}' attendu, '{found}' trouvé")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Décode la prochaine valeur JSON complète"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                if not self.more():
+                    raise
+                continue
+            # Une valeur qui touche la fin du tampon peut être tronquée (nombre)
+            if end == len(self.buf) and self.more():
+                continue
+            self.pos = end
+            return value
+
+
+def decode_bridges_stream(chunks: Iterable[bytes], key: str = 'bridges') -> BridgeColumns:
+    """
+    Décode en flux {"bridges": [...], ...} vers des colonnes typées
+
+    Args:
+        chunks: Morceaux bruts de la réponse (ex: response.iter_content())
+        key: Clé du tableau de bridges dans l'objet racine
+
+    Returns:
+        BridgeColumns (vide si la clé est absente)
+    """
+    reader = _StreamReader(chunks)
+    columns = BridgeColumns()
+
+    reader.expect('{')
+    if reader.peek() == '}':
+        return columns
+
+    while True:
+        name = reader.value()
+        reader.expect(':')
+        if name == key and reader.peek() == '[':
+            reader.expect('[')
+            if reader.peek() == ']':
+                reader.pos += 1
+            else:
+                while True:
+                    columns.append(reader.value())
+                    if reader.peek() == ',':
+                        reader.pos += 1
+                        continue
+                    reader.expect(']')
+                    break
+        else:
+            reader.value()  # autre clé : valeur ignorée
+
+        if reader.peek() == ',':
+            reader.pos += 1
+            continue
+        reader.expect('}')
+        return columns
@@ -2,40 +2,298 @@
 DefiLlama Collector - Récupération données bridges
 """
 
+import json
+import time
 import requests
-from datetime import datetime
-from typing import List, Dict, Optional
+import pandas as pd
+from urllib.parse import urlencode
+from typing import Any, Callable, Iterable, Iterator, List, Dict, Optional, Tuple
+
+from backend.cache import DiskCache
+from backend.circuit import CircuitOpenError, get_breaker
+from backend.collectors.decode import CHUNK_SIZE, BridgeColumns, decode_bridges_stream
+from backend.collectors.formatting import format_bridges_frame
+from backend.ratelimit import RETRY_STATUSES, endpoint_name, get_bucket, get_policy
+from backend.settings import DEFILLAMA_BASE_URL
+from backend.singleflight import SingleFlight
+
+# Garde single-flight partagée par toutes les instances du processus
+_flights = SingleFlight()
+
+# Décodeur de réponse : morceaux bruts -> données
+Decoder = Callable[[Iterable[bytes]], Any]
+
+
+def decode_json(chunks: Iterable[bytes]) -> Any:
+    return json.loads(b''.join(chunks))
+
+
+def _tee(chunks: Iterable[bytes], sink) -> Iterator[bytes]:
+    """Transmet les morceaux tout en les copiant dans sink"""
+    for chunk in chunks:
+        sink.write(chunk)
+        yield chunk
+
 
 class DefiLlamaCollector:
     """
     Collecteur de données depuis l'API DefiLlama
     """
     
-    BASE_URL = "https://bridges.llama.fi"
+    BASE_URL = DEFILLAMA_BASE_URL
     
-    def __init__(self):
+    def __init__(self, cache: Optional[DiskCache] = None, base_url: Optional[str] = None):
+        if base_url:
+            self.BASE_URL = base_url.rstrip('/')
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'XRSK-Platform/1.0'
         })
+        # Cache disque optionnel des réponses brutes (survit aux redémarrages)
+        self.cache = cache
+        # Revalidation HTTP : validateurs et dernière réponse décodée,
+        # par (URL, décodeur)
+        self._validators: Dict[tuple, Dict[str, str]] = {}
+        self._payloads: Dict[tuple, Any] = {}
     
-    def get_all_bridges(self) -> Optional[List[Dict]]:
+    def _load_cached(self, url: str, decoder: Decoder):
+        """Reprend validateurs et réponse depuis le cache disque (démarrage à froid)"""
+        key = (url, decoder)
+        if self.cache is None or key in self._payloads:
+            return
+        entry = self.cache.get(url)
+        if entry is not None and entry.validators:
+            self._validators[key] = entry.validators
+            self._payloads[key] = decoder([entry.body])
+    
+    def _get_json(self, path: str, params: Optional[Dict] = None) -> Any:
+        """GET JSON (voir _get)"""
+        return self._get(path, params, decoder=decode_json)
+    
+    def _get(self, path: str, params: Optional[Dict] = None, decoder: Decoder = decode_json) -> Any:
+        """GET décodé (voir _request)"""
+        return self._request(path, params, decoder)[0]
+    
+    def _request(self, path: str, params: Optional[Dict] = None,
+                 decoder: Decoder = decode_json) -> Tuple[Any, bool]:
         """
-        Récupère la liste complète des bridges depuis DefiLlama
+        GET avec revalidation conditionnelle (ETag / Last-Modified)
+        
+        Le corps est lu en flux et passé morceau par morceau à `decoder`
+        (et au cache disque) sans être matérialisé en entier.
+        
+        Sur une réponse 304, la réponse déjà décodée est réutilisée telle
+        quelle (même objet).
+        
+        Les appels identiques simultanés (même URL, mêmes paramètres, mêmes
+        validateurs), toutes instances et tous threads confondus, partagent
+        une seule requête HTTP.
+        
+        Returns:
+            (données décodées, True si la réponse était un 304 Not Modified)
+        """
+        url = f"{self.BASE_URL}{path}"
+        if params:
+            url = f"{url}?{urlencode(sorted(params.items()))}"
+        self._load_cached(url, decoder)
+        
+        key = (url, decoder)
+        validators = self._validators.get(key, {}) if key in self._payloads else {}
+        flight = (url, decoder, validators.get('etag'), validators.get('last_modified'))
+        not_modified, data, new_validators = _flights.do(flight, lambda: self._fetch(url, validators, decoder))
+        
+        if not_modified:
+            return (self._payloads[key] if data is None else data), True
+        
+        if new_validators:
+            self._validators[key] = new_validators
+            self._payloads[key] = data
+        else:
+            self._validators.pop(key, None)
+            self._payloads.pop(key, None)
+        
+        return data, False
+    
+    def _fetch(self, url: str, validators: Dict[str, str], decoder: Decoder):
         """
+        Requête HTTP effective (exécutée par un seul appelant à la fois)
+        
+        Returns:
+            (not_modified, données décodées, nouveaux validateurs) ;
+            données None sur un 304 revalidant la réponse en mémoire
+        """
+        headers = {}
+        if 'etag' in validators:
+            headers['If-None-Match'] = validators['etag']
+        if 'last_modified' in validators:
+            headers['If-Modified-Since'] = validators['last_modified']
+        
+        response = self._send(url, headers)
         try:
-            response = self.session.get(
-                f"{self.BASE_URL}/bridges",
-                timeout=10
-            )
+            if response.status_code == 304:
+                if validators:
+                    if self.cache is not None:
+                        self.cache.touch(url)
+                    return True, None, validators
+                # 304 à une requête non conditionnelle : pas de corps à
+                # décoder, dernière réponse du cache disque à défaut d'erreur
+                entry = self.cache.get(url, allow_expired=True) if self.cache is not None else None
+                if entry is None:
+                    raise requests.exceptions.HTTPError(
+                        f"304 Not Modified sans requête conditionnelle ni réponse en cache: {url}",
+                        response=response)
+                return True, decoder([entry.body]), validators
+            
             response.raise_for_status()
             
-            data = response.json()
+            new_validators = {}
+            if response.headers.get('ETag'):
+                new_validators['etag'] = response.headers['ETag']
+            if response.headers.get('Last-Modified'):
+                new_validators['last_modified'] = response.headers['Last-Modified']
+            
+            chunks = response.iter_content(CHUNK_SIZE)
+            if self.cache is None:
+                data = decoder(chunks)
+            else:
+                with self.cache.writer(url, new_validators) as sink:
+                    teed = _tee(chunks, sink)
+                    data = decoder(teed)
+                    for _ in teed:  # le cache reçoit aussi la fin du corps
+                        pass
+        finally:
+            response.close()
+        
+        return False, data, new_validators
+    
+    def _send(self, url: str, headers: Dict[str, str]) -> requests.Response:
+        """
+        Envoi HTTP sous circuit breaker et limitation de débit, avec retry
+        
+        Les erreurs réseau et les statuts 429/5xx sont retentés selon la
+        politique de l'endpoint ; un 429 suspend l'endpoint pour tout le
+        processus pendant la durée Retry-After, et la réponse est retournée
+        sans nouvelle tentative si cette durée dépasse retry_after_max de
+        la politique. Un échec définitif compte
+        pour le circuit breaker, qui refuse ensuite les appels sans attendre
+        le timeout réseau (CircuitOpenError).
+        """
+        endpoint = endpoint_name(url[len(self.BASE_URL):])
+        policy = get_policy(endpoint)
+        bucket = get_bucket(endpoint)
+        breaker = get_breaker(endpoint)
+        breaker.before_call()
+        
+        try:
+            response = self._send_with_retry(url, headers, endpoint, policy, bucket)
+        except BaseException:
+            breaker.record_failure()
+            raise
+        
+        if response.status_code in RETRY_STATUSES:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+    
+    def _send_with_retry(self, url, headers, endpoint, policy, bucket) -> requests.Response:
+        attempt = 0
+        while True:
+            bucket.acquire()
+            try:
+                response = self.session.get(url, headers=headers, timeout=policy.timeout, stream=True)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt >= policy.max_retries:
+                    raise
+                delay = policy.backoff(attempt)
+                print(f"⚠️  {endpoint}: {e} - nouvelle tentative dans {delay:.1f}s")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= policy.max_retries:
+                    return response
+                delay = policy.backoff(attempt, response.headers.get('Retry-After'))
+                if response.status_code == 429:
+                    bucket.pause(delay)
+                if policy.gives_up(delay):
+                    print(f"⚠️  {endpoint}: HTTP {response.status_code} - Retry-After {delay:.0f}s, abandon")
+                    return response
+                response.close()
+                print(f"⚠️  {endpoint}: HTTP {response.status_code} - nouvelle tentative dans {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
+    
+    def get_cached_bridge_columns(self, allow_expired: bool = False):
+        """
+        Dernière réponse /bridges du cache disque, sans appel réseau
+        
+        Args:
+            allow_expired: Accepter une réponse au-delà de la fenêtre stale
+        
+        Returns:
+            (BridgeColumns, CacheEntry) ou None si pas de cache utilisable
+        """
+        if self.cache is None:
+            return None
+        entry = self.cache.get(f"{self.BASE_URL}/bridges", allow_expired=allow_expired)
+        if entry is None:
+            return None
+        try:
+            return decode_bridges_stream([entry.body]), entry
+        except ValueError as e:
+            print(f"⚠️  Cache /bridges illisible: {e}")
+            return None
+    
+    def get_all_bridges(self) -> Optional[List[Dict]]:
+        """
+        Récupère la liste complète des bridges depuis DefiLlama
+        """
+        try:
+            data, not_modified = self._request("/bridges")
             bridges = data.get('bridges', [])
             
-            print(f"✓ {len(bridges)} bridges récupérés depuis DefiLlama")
+            if not_modified:
+                print(f"✓ {len(bridges)} bridges inchangés (304 Not Modified)")
+            else:
+                print(f"✓ {len(bridges)} bridges récupérés depuis DefiLlama")
             return bridges
             
+        except CircuitOpenError as e:
+            print(f"⚠️  DefiLlama API indisponible: {e}")
+            return None
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Erreur DefiLlama API: {e}")
+            return None
+        except Exception as e:
+            print(f"❌ Erreur inattendue: {e}")
+            return None
+    
+    def get_bridge_columns(self) -> Optional[BridgeColumns]:
+        """
+        Récupère les bridges en colonnes typées (décodage en flux)
+        Même contenu que get_formatted_bridges, sans liste de dictionnaires
+        """
+        fetched = self.fetch_bridge_columns()
+        return fetched[0] if fetched else None
+    
+    def fetch_bridge_columns(self) -> Optional[Tuple[BridgeColumns, bool]]:
+        """
+        Comme get_bridge_columns
+        
+        Returns:
+            (colonnes, True si inchangées depuis la réponse précédente
+            - 304 Not Modified) ou None si l'API est indisponible
+        """
+        try:
+            columns, not_modified = self._request("/bridges", decoder=decode_bridges_stream)
+            
+            if not_modified:
+                print(f"✓ {len(columns)} bridges inchangés (304 Not Modified)")
+            else:
+                print(f"✓ {len(columns)} bridges récupérés depuis DefiLlama")
+            return columns, not_modified
+            
+        except CircuitOpenError as e:
+            print(f"⚠️  DefiLlama API indisponible: {e}")
+            return None
         except requests.exceptions.RequestException as e:
             print(f"❌ Erreur DefiLlama API: {e}")
             return None
@@ -46,43 +304,70 @@ class DefiLlamaCollector:
     def get_formatted_bridges(self) -> List[Dict]:
         """
         Retourne les bridges formatés pour l'affichage
-        Mapping correct des champs API DefiLlama
         """
         bridges = self.get_all_bridges()
         
         if not bridges:
             return []
         
-        formatted = []
-        for bridge in bridges:
-            # Mapping correct des champs
-            formatted_bridge = {
-                'id': bridge.get('id', 0),
-                'name': bridge.get('displayName', bridge.get('name', 'Unknown')),
-                'tvl': bridge.get('tvl', 0),  # Peut être 0 si non dispo
-                'volume_24h': bridge.get('last24hVolume', bridge.get('lastDailyVolume', 0)),  # Corrigé
-                'volume_7d': bridge.get('weeklyVolume', 0),
-                'volume_30d': bridge.get('monthlyVolume', 0),
-                'chains': bridge.get('chains', []),
-                'chains_count': len(bridge.get('chains', [])),
-                'last_updated': datetime.now()
-            }
-            formatted.append(formatted_bridge)
-        
-        return formatted
+        return self.format_bridges(bridges)
+    
+    def get_formatted_frame(self) -> pd.DataFrame:
+        """
+        Retourne les bridges formatés en DataFrame typé
+        (vide mais typé si l'API est indisponible)
+        """
+        return format_bridges_frame(self.get_all_bridges() or [])
+    
+    @staticmethod
+    def format_bridges(bridges: List[Dict]) -> List[Dict]:
+        """
+        Formate une liste brute de bridges
+        Mapping des champs API DefiLlama : voir formatting.format_bridges_frame
+        """
+        return format_bridges_frame(bridges).to_dict('records')
     
     def get_bridge_details(self, bridge_id: int) -> Optional[Dict]:
         """
         Récupère les détails d'un bridge spécifique
         """
         try:
-            response = self.session.get(
-                f"{self.BASE_URL}/bridge/{bridge_id}",
-                timeout=10
-            )
-            response.raise_for_status()
-            return response.json()
+            return self._get_json(f"/bridge/{bridge_id}")
             
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, CircuitOpenError) as e:
             print(f"❌ Erreur récupération bridge {bridge_id}: {e}")
             return None
+
+    def get_bridge_volume(self, bridge_id: int, chain: str = 'all') -> Optional[List[Dict]]:
+        """
+        Historique quotidien des volumes d'un bridge
+
+        Args:
+            bridge_id: ID du bridge
+            chain: Chaîne ('all' pour le total toutes chaînes)
+
+        Returns:
+            Liste [{date, depositUSD, withdrawUSD, depositTxs, withdrawTxs}]
+        """
+        try:
+            return self._get_json(f"/bridgevolume/{chain}", params={'id': bridge_id})
+
+        except (requests.exceptions.RequestException, CircuitOpenError) as e:
+            print(f"❌ Erreur volume bridge {bridge_id}: {e}")
+            return None
+
+    def get_bridge_day_stats(self, bridge_id: int, timestamp: int, chain: str = 'all') -> Optional[Dict]:
+        """
+        Statistiques d'un bridge pour une journée (détail par token et adresse)
+
+        Args:
+            bridge_id: ID du bridge
+            timestamp: Horodatage unix du jour (minuit UTC)
+            chain: Chaîne ('all' pour le total toutes chaînes)
+        """
+        try:
+            return self._get_json(f"/bridgedaystats/{int(timestamp)}/{chain}", params={'id': bridge_id})
+
+        except (requests.exceptions.RequestException, CircuitOpenError) as e:
+            print(f"❌ Erreur statistiques bridge {bridge_id} ({timestamp}): {e}")
+            return None
@@ -0,0 +1,207 @@
+"""
+DefiLlama Collector asynchrone - Récupération en parallèle des détails bridges
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import aiohttp
+
+from backend.circuit import CircuitOpenError, get_breaker
+from backend.collectors.defillama import DefiLlamaCollector
+from backend.ratelimit import RETRY_STATUSES, endpoint_name, get_bucket, get_policy
+
+# Nombre maximum de requêtes simultanées vers l'API
+DEFAULT_CONCURRENCY = 10
+
+# Délai maximum par appel, tentatives comprises (secondes)
+# Chaque tentative est en plus bornée par le timeout de l'endpoint (backend.ratelimit)
+DEFAULT_TIMEOUT = 30.0
+
+
+class AsyncDefiLlamaCollector:
+    """
+    Collecteur asyncio pour les appels en masse à l'API DefiLlama
+
+    Utilisation :
+        async with AsyncDefiLlamaCollector() as collector:
+            details = await collector.get_many_bridge_details(ids)
+    """
+
+    BASE_URL = DefiLlamaCollector.BASE_URL
+
+    def __init__(self, max_concurrency: int = DEFAULT_CONCURRENCY, timeout: float = DEFAULT_TIMEOUT,
+                 base_url: Optional[str] = None):
+        if base_url:
+            self.BASE_URL = base_url.rstrip('/')
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(
+            headers={'User-Agent': 'XRSK-Platform/1.0'},
+            connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _get_json(self, path: str):
+        """
+        GET JSON sous circuit breaker et limitation de débit, avec retry
+        Lève l'exception d'origine après épuisement des tentatives,
+        CircuitOpenError si le circuit de l'endpoint est ouvert
+        """
+        if self.session is None:
+            raise RuntimeError("Session fermée : utiliser 'async with AsyncDefiLlamaCollector()'")
+
+        endpoint = endpoint_name(path)
+        breaker = get_breaker(endpoint)
+        breaker.before_call()
+        try:
+            data = await self._get_json_with_retry(path, endpoint)
+        except aiohttp.ClientResponseError as e:
+            if e.status in RETRY_STATUSES:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        except BaseException:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        return data
+
+    async def _get_json_with_retry(self, path: str, endpoint: str):
+        policy = get_policy(endpoint)
+        bucket = get_bucket(endpoint)
+        client_timeout = aiohttp.ClientTimeout(total=policy.timeout)
+
+        attempt = 0
+        while True:
+            await bucket.acquire_async()
+            try:
+                async with self.session.get(f"{self.BASE_URL}{path}", timeout=client_timeout) as response:
+                    if response.status not in RETRY_STATUSES or attempt >= policy.max_retries:
+                        response.raise_for_status()
+                        return await response.json(content_type=None)
+                    delay = policy.backoff(attempt, response.headers.get('Retry-After'))
+                    if response.status == 429:
+                        bucket.pause(delay)
+                    if policy.gives_up(delay):
+                        print(f"⚠️  {endpoint}: HTTP {response.status} - Retry-After {delay:.0f}s, abandon")
+                        response.raise_for_status()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= policy.max_retries:
+                    raise
+                delay = policy.backoff(attempt)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def get_bridge_details(self, bridge_id: int) -> Optional[Dict]:
+        """
+        Récupère les détails d'un bridge spécifique
+        """
+        try:
+            return await self._get_json(f"/bridge/{bridge_id}")
+        except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError) as e:
+            print(f"❌ Erreur récupération bridge {bridge_id}: {type(e).__name__} {e}")
+            return None
+
+    async def get_bridge_volume(self, bridge_id: int, chain: str = 'all') -> Optional[List[Dict]]:
+        """
+        Historique quotidien des volumes d'un bridge
+        """
+        try:
+            return await self._get_json(f"/bridgevolume/{chain}?id={bridge_id}")
+        except (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError) as e:
+            print(f"❌ Erreur volume bridge {bridge_id}: {type(e).__name__} {e}")
+            return None
+
+    async def _get_many(self, bridge_ids: Iterable[int], path: Callable[[int], str], label: str,
+                        max_concurrency: Optional[int] = None, timeout: Optional[float] = None) -> Dict[int, Any]:
+        """Un appel par bridge, en parallèle borné ; résultats partiels"""
+        # Le pool de connexions est dimensionné à la construction : une
+        # concurrence supérieure serait plafonnée sans le dire
+        if max_concurrency is not None and max_concurrency > self.max_concurrency:
+            raise ValueError(f"max_concurrency={max_concurrency} dépasse celle du collecteur "
+                             f"({self.max_concurrency}) : la passer à AsyncDefiLlamaCollector()")
+        ids: List[int] = list(dict.fromkeys(bridge_ids))
+        deadline = timeout or self.timeout
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def fetch(bridge_id):
+            async with semaphore:
+                return await asyncio.wait_for(self._get_json(path(bridge_id)), deadline)
+
+        results = await asyncio.gather(*(fetch(i) for i in ids), return_exceptions=True)
+
+        found = {}
+        failures = 0
+        for bridge_id, result in zip(ids, results):
+            if isinstance(result, BaseException):
+                failures += 1
+                print(f"❌ Erreur {label} {bridge_id}: {type(result).__name__} {result}")
+            elif result is not None:
+                found[bridge_id] = result
+
+        print(f"✓ {len(found)}/{len(ids)} {label}s récupérés ({failures} échecs)")
+        return found
+
+    async def get_many_bridge_details(
+        self,
+        bridge_ids: Iterable[int],
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[int, Dict]:
+        """
+        Récupère les détails de plusieurs bridges en parallèle
+
+        Args:
+            bridge_ids: IDs des bridges
+            max_concurrency: Nombre maximum d'appels simultanés, au plus
+                celui du collecteur (ValueError sinon)
+            timeout: Délai maximum par appel, tentatives comprises (secondes)
+
+        Returns:
+            Dictionnaire {bridge_id: détails} - résultats partiels :
+            les bridges en échec sont absents du dictionnaire
+        """
+        return await self._get_many(bridge_ids, lambda i: f"/bridge/{i}", 'détail bridge',
+                                    max_concurrency, timeout)
+
+    async def get_many_bridge_volumes(
+        self,
+        bridge_ids: Iterable[int],
+        chain: str = 'all',
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[int, List[Dict]]:
+        """
+        Historique quotidien des volumes de plusieurs bridges en parallèle
+
+        Returns:
+            Dictionnaire {bridge_id: [jours]} - résultats partiels
+        """
+        return await self._get_many(bridge_ids, lambda i: f"/bridgevolume/{chain}?id={i}", 'volume bridge',
+                                    max_concurrency, timeout)
+
+
+def fetch_many_bridge_details(bridge_ids: Iterable[int], **kwargs) -> Dict[int, Dict]:
+    """
+    Point d'entrée synchrone (pages Streamlit, scripts)
+    Voir AsyncDefiLlamaCollector.get_many_bridge_details
+    """
+    async def run():
+        concurrency = kwargs.get('max_concurrency') or DEFAULT_CONCURRENCY
+        async with AsyncDefiLlamaCollector(max_concurrency=concurrency) as collector:
+            return await collector.get_many_bridge_details(bridge_ids, **kwargs)
+
+    return asyncio.run(run())
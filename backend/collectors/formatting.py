@@ -0,0 +1,97 @@
+"""
+Formatage vectorisé des bridges DefiLlama
+
+Transforme la liste brute /bridges en DataFrame typé en une seule passe
+colonne par colonne : un horodatage unique par snapshot, fallbacks de
+champs appliqués sur les colonnes entières, types numériques fixes.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Colonnes et types du DataFrame bridges consommé par les pages
+BRIDGE_DTYPES = {
+    'id': 'int64',
+    'name': 'object',
+    'tvl': 'float64',
+    'volume_24h': 'float64',
+    'volume_7d': 'float64',
+    'volume_30d': 'float64',
+    'chains': 'object',
+    'chains_count': 'int64',
+    'last_updated': 'datetime64[ns]',
+}
+
+
+def empty_bridges_frame() -> pd.DataFrame:
+    return pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in BRIDGE_DTYPES.items()})
+
+
+def _coalesce(raw: pd.DataFrame, *names: str) -> pd.Series:
+    """Première valeur non nulle parmi plusieurs colonnes (fallbacks API)"""
+    result = pd.Series(None, index=raw.index, dtype='object')
+    for name in names:
+        if name in raw:
+            result = result.where(result.notna(), raw[name])
+    return result
+
+
+def _numeric(raw: pd.DataFrame, *names: str) -> pd.Series:
+    values = pd.to_numeric(_coalesce(raw, *names), errors='coerce')
+    return values.fillna(0.0).astype('float64')
+
+
+def format_bridges_frame(bridges: List[Dict], snapshot_time: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Liste brute /bridges -> DataFrame typé (colonnes BRIDGE_DTYPES)
+
+    Args:
+        bridges: Bridges bruts de l'API DefiLlama
+        snapshot_time: Horodatage commun à toutes les lignes (défaut: maintenant)
+
+    Returns:
+        DataFrame typé, vide (mais typé) si aucune donnée
+    """
+    if not bridges:
+        return empty_bridges_frame()
+
+    # Valeurs brutes conservées (dtype object) : pas de conversion d'un nom
+    # numérique en float, mêmes valeurs que le décodage en flux
+    raw = pd.DataFrame(bridges, dtype='object')
+
+    chains = raw['chains'] if 'chains' in raw else pd.Series(None, index=raw.index, dtype='object')
+    chains = chains.where(chains.map(lambda c: isinstance(c, list)), pd.Series([[]] * len(raw), index=raw.index))
+
+    frame = pd.DataFrame({
+        'id': _numeric(raw, 'id').astype('int64'),
+        'name': _coalesce(raw, 'displayName', 'name').fillna('Unknown').astype(str).astype('object'),
+        'tvl': _numeric(raw, 'tvl'),
+        'volume_24h': _numeric(raw, 'last24hVolume', 'lastDailyVolume'),
+        'volume_7d': _numeric(raw, 'weeklyVolume'),
+        'volume_30d': _numeric(raw, 'monthlyVolume'),
+        'chains': chains,
+        'chains_count': chains.map(len).astype('int64'),
+    })
+    frame['last_updated'] = pd.Timestamp(snapshot_time or datetime.now())
+    return frame.astype(BRIDGE_DTYPES)
+
+
+def columns_to_frame(ids, names, tvl, volume_24h, volume_7d, volume_30d, chains, chain_offsets,
+                     snapshot_time: Optional[datetime] = None) -> pd.DataFrame:
+    """Colonnes déjà typées (BridgeColumns) -> DataFrame (colonnes BRIDGE_DTYPES)"""
+    offsets = np.asarray(chain_offsets, dtype='int64')
+    frame = pd.DataFrame({
+        'id': np.asarray(ids, dtype='int64'),
+        'name': pd.Series(names, dtype='object'),
+        'tvl': np.asarray(tvl, dtype='float64'),
+        'volume_24h': np.asarray(volume_24h, dtype='float64'),
+        'volume_7d': np.asarray(volume_7d, dtype='float64'),
+        'volume_30d': np.asarray(volume_30d, dtype='float64'),
+        'chains': pd.Series([chains[a:b] for a, b in zip(offsets[:-1], offsets[1:])], dtype='object'),
+        'chains_count': np.diff(offsets),
+    })
+    frame['last_updated'] = pd.Timestamp(snapshot_time or datetime.now())
+    return frame.astype(BRIDGE_DTYPES)
@@ -0,0 +1,499 @@
+"""
+Fichiers colonnes mappés en mémoire (NumPy memmap)
+
+Le dernier snapshot bridges et les segments d'historique sont écrits une
+fois en colonnes .npy ; chaque processus les ouvre en lecture seule avec
+mmap : les workers Streamlit partagent la même copie (cache de pages du
+système) au lieu de garder chacun leur DataFrame.
+
+Arborescence :
+    columnar/snapshots/<version>/   colonnes + meta.json, un dossier par version
+    columnar/snapshots/CURRENT      version courante
+    columnar/history/<debut>-<fin>/ segment d'historique (immuable, un jour
+                                    puis une semaine après compaction)
+    columnar/history/MANIFEST       liste des segments publiés
+
+Les lectures d'historique brut (read_history, read_snapshot) prennent les
+jours publiés dans les segments mappés et le reste (jour en cours, jours
+pas encore exportés ou complétés depuis par un rattrapage) dans le store
+SQLite.
+
+Les publications sont atomiques (dossier temporaire renommé puis pointeur
+remplacé par os.replace) : un lecteur voit l'ancienne ou la nouvelle
+version, jamais un état partiel. Les DataFrames retournés partagent les
+fichiers (copy=False) ; toute modification par une page crée une copie
+privée (copy-on-write pandas), les fichiers ne sont jamais modifiés.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.collectors.decode import BridgeColumns
+from backend.history import (DAY, HistoryStore, Timestamp, bucket_start, day_epoch, from_epoch,
+                             get_history_store, to_epoch)
+from backend.settings import COLUMNAR_DIR
+
+# Versions de snapshot conservées sur disque (les lecteurs peuvent encore
+# avoir mappé une version précédente)
+KEEP_SNAPSHOTS = 3
+
+# Durée des segments fusionnés par la compaction (segments quotidiens
+# regroupés par semaine, lundi - dimanche)
+SEGMENT_SPAN = 7 * DAY
+
+# Jours d'historique exportés au plus par appel de export_closed_days
+# (premier passage sur un historique existant)
+EXPORT_BATCH = 7
+
+# Colonnes numériques d'un snapshot
+SNAPSHOT_ARRAYS = ['id', 'tvl', 'volume_24h', 'volume_7d', 'volume_30d', 'chains_count']
+
+# Colonnes d'un segment d'historique (triées par ts puis bridge_id)
+HISTORY_ARRAYS = {
+    'ts': 'int64',
+    'bridge_id': 'int64',
+    'tvl': 'float64',
+    'volume_24h': 'float64',
+    'volume_7d': 'float64',
+    'volume_30d': 'float64',
+    'chains_count': 'int64',
+}
+
+
+def _write_json(path: Path, payload: Any):
+    """Écriture atomique d'un petit fichier JSON"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _read_json(path: Path) -> Optional[Any]:
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def _publish_dir(directory: Path, target: Path, write) -> Path:
+    """Écrit un dossier complet dans un dossier temporaire puis le renomme"""
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(dir=directory, prefix='.tmp-'))
+    try:
+        write(tmp)
+        try:
+            os.rename(tmp, target)
+        except OSError:
+            # Déjà publié (autre worker) : le contenu est identique
+            if not target.exists():
+                raise
+            shutil.rmtree(tmp, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return target
+
+
+def _open(directory: Path, name: str) -> np.ndarray:
+    """Colonne en lecture seule, mappée en mémoire"""
+    return np.load(directory / f"{name}.npy", mmap_mode='r')
+
+
+# ----------------------------------------------------------------------
+# Snapshot courant
+# ----------------------------------------------------------------------
+
+class ColumnarSnapshots:
+    """Snapshots bridges en colonnes mappées, un dossier par version"""
+
+    def __init__(self, directory=COLUMNAR_DIR / 'snapshots'):
+        self.directory = Path(directory)
+
+    def write(self, columns: BridgeColumns, version: str, fetched_at: datetime) -> Path:
+        """Écrit une version (sans changer la version courante)"""
+        target = self.directory / version
+        if (target / 'meta.json').exists():
+            return target
+
+        # Chaînes encodées par dictionnaire : codes int32 + offsets par bridge
+        chain_names = sorted(set(columns.chains))
+        codes = {name: code for code, name in enumerate(chain_names)}
+        offsets = np.asarray(columns.chain_offsets, dtype='int64')
+        arrays = {
+            'id': np.asarray(columns.ids, dtype='int64'),
+            'tvl': np.asarray(columns.tvl, dtype='float64'),
+            'volume_24h': np.asarray(columns.volume_24h, dtype='float64'),
+            'volume_7d': np.asarray(columns.volume_7d, dtype='float64'),
+            'volume_30d': np.asarray(columns.volume_30d, dtype='float64'),
+            'chains_count': np.diff(offsets),
+            'chain_codes': np.fromiter((codes[c] for c in columns.chains), dtype='int32', count=len(columns.chains)),
+            'chain_offsets': offsets,
+        }
+        meta = {
+            'version': version,
+            'fetched_at': fetched_at.timestamp(),
+            'rows': len(columns),
+            'names': list(columns.names),
+            'chains': chain_names,
+        }
+
+        def write(tmp: Path):
+            for name, values in arrays.items():
+                np.save(tmp / f"{name}.npy", values)
+            with open(tmp / 'meta.json', 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+
+        return _publish_dir(self.directory, target, write)
+
+    def publish(self, columns: BridgeColumns, version: str, fetched_at: datetime):
+        """Écrit une version et en fait la version courante"""
+        self.write(columns, version, fetched_at)
+        _write_json(self.directory / 'CURRENT', {'version': version, 'fetched_at': fetched_at.timestamp()})
+        self._prune(version)
+
+    def current(self) -> Optional[Dict[str, Any]]:
+        """Version courante {version, fetched_at (epoch)} ou None"""
+        return _read_json(self.directory / 'CURRENT')
+
+    def open(self, version: Optional[str] = None) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """
+        Ouvre une version en lecture seule (défaut : version courante)
+
+        Returns:
+            (DataFrame aux colonnes BRIDGE_DTYPES, meta) ou None si absente
+        """
+        if version is None:
+            current = self.current()
+            if not current:
+                return None
+            version = current['version']
+        directory = self.directory / version
+        meta = _read_json(directory / 'meta.json')
+        if meta is None:
+            return None
+        try:
+            arrays = {name: _open(directory, name) for name in SNAPSHOT_ARRAYS + ['chain_codes', 'chain_offsets']}
+        except (OSError, ValueError):
+            return None
+
+        # Seules les colonnes texte (quelques Ko) sont matérialisées
+        chain_names = np.asarray(meta['chains'] or [''], dtype=object)
+        chains = chain_names[arrays['chain_codes']] if len(arrays['chain_codes']) else np.empty(0, dtype=object)
+        offsets = arrays['chain_offsets']
+        frame = pd.DataFrame({
+            'id': arrays['id'],
+            'name': pd.Series(meta['names'], dtype='object'),
+            'tvl': arrays['tvl'],
+            'volume_24h': arrays['volume_24h'],
+            'volume_7d': arrays['volume_7d'],
+            'volume_30d': arrays['volume_30d'],
+            'chains': pd.Series([list(chains[a:b]) for a, b in zip(offsets[:-1], offsets[1:])], dtype='object'),
+            'chains_count': arrays['chains_count'],
+        }, copy=False)
+        frame['last_updated'] = pd.Timestamp(datetime.fromtimestamp(meta['fetched_at'])).as_unit('ns')
+        return frame, meta
+
+    def _prune(self, current: str):
+        """Supprime les versions les plus anciennes au-delà de KEEP_SNAPSHOTS"""
+        versions = sorted(
+            (d for d in self.directory.iterdir() if d.is_dir() and not d.name.startswith('.') and d.name != current),
+            key=lambda d: d.stat().st_mtime, reverse=True,
+        )
+        for old in versions[KEEP_SNAPSHOTS - 1:]:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+# ----------------------------------------------------------------------
+# Segments d'historique
+# ----------------------------------------------------------------------
+
+class ColumnarHistory:
+    """
+    Segments d'historique en colonnes mappées
+
+    Un segment couvre [start, end[ (epoch) et n'est jamais modifié ;
+    MANIFEST liste les segments publiés, triés par début.
+    """
+
+    def __init__(self, directory=COLUMNAR_DIR / 'history'):
+        self.directory = Path(directory)
+
+    def segments(self) -> List[Dict[str, Any]]:
+        """Segments publiés [{name, start, end, rows}]"""
+        manifest = _read_json(self.directory / 'MANIFEST')
+        return manifest['segments'] if manifest else []
+
+    def covered_until(self) -> Optional[int]:
+        """Fin du dernier segment publié (epoch)"""
+        segments = self.segments()
+        return segments[-1]['end'] if segments else None
+
+    def write_segment(self, frame: pd.DataFrame, start: int, end: int) -> Dict[str, Any]:
+        """
+        Écrit un segment (sans le publier)
+
+        Args:
+            frame: Historique brut [ts (epoch), bridge_id, ...] couvrant [start, end[
+        """
+        ordered = frame.sort_values(['ts', 'bridge_id'], kind='stable')
+        name = f"{start}-{end}"
+
+        def write(tmp: Path):
+            for column, dtype in HISTORY_ARRAYS.items():
+                np.save(tmp / f"{column}.npy", ordered[column].to_numpy(dtype=dtype))
+
+        _publish_dir(self.directory, self.directory / name, write)
+        return {'name': name, 'start': int(start), 'end': int(end), 'rows': len(ordered),
+                'snapshots': int(ordered['ts'].nunique())}
+
+    def publish(self, add: List[Dict[str, Any]], remove: Optional[List[str]] = None):
+        """Remplace atomiquement la liste des segments publiés"""
+        removed = set(remove or [])
+        segments = [s for s in self.segments() if s['name'] not in removed]
+        published = {s['name'] for s in segments}
+        segments += [s for s in add if s['name'] not in published]
+        segments.sort(key=lambda s: s['start'])
+        _write_json(self.directory / 'MANIFEST', {'segments': segments, 'updated_at': time.time()})
+        for name in removed:
+            shutil.rmtree(self.directory / name, ignore_errors=True)
+
+    def compact(self, before: Optional[int] = None, span: int = SEGMENT_SPAN) -> Tuple[int, int]:
+        """
+        Supprime les segments terminés avant `before` (rétention) et fusionne
+        les segments d'un même intervalle de `span` secondes une fois
+        celui-ci entièrement exporté
+
+        Les segments fusionnés sont écrits puis publiés d'un coup : les
+        lecteurs gardent les anciens fichiers mappés jusqu'à leur fermeture.
+
+        Returns:
+            (segments supprimés, segments fusionnés)
+        """
+        segments = self.segments()
+        expired = [s['name'] for s in segments if before is not None and s['end'] <= before]
+        covered = self.covered_until()
+
+        groups: Dict[int, List[Dict[str, Any]]] = {}
+        for segment in segments:
+            if segment['name'] not in expired:
+                groups.setdefault(bucket_start(segment['start'], span), []).append(segment)
+
+        merged, replaced = [], []
+        for start, group in groups.items():
+            end = start + span
+            if len(group) < 2 or covered is None or end > covered or any(s['end'] > end for s in group):
+                continue
+            frame = pd.concat([self.open_segment(s['name']) for s in group], ignore_index=True)
+            merged.append(self.write_segment(frame, group[0]['start'], group[-1]['end']))
+            replaced += [s['name'] for s in group]
+
+        if expired or merged:
+            self.publish(merged, expired + replaced)
+        return len(expired), len(replaced)
+
+    def open_segment(self, name: str) -> pd.DataFrame:
+        """Segment en lecture seule [ts (epoch), bridge_id, ...]"""
+        directory = self.directory / name
+        return pd.DataFrame({column: _open(directory, column) for column in HISTORY_ARRAYS}, copy=False)
+
+    def open_range(self, start: Optional[int] = None, end: Optional[int] = None) -> List[pd.DataFrame]:
+        """
+        Segments recouvrant [start, end] (epoch), sans copie
+
+        Les lignes hors plage des segments de bord ne sont pas filtrées :
+        voir read_range pour un DataFrame filtré.
+        """
+        frames = []
+        for segment in self.segments():
+            if (start is not None and segment['end'] <= start) or (end is not None and segment['start'] > end):
+                continue
+            try:
+                frames.append(self.open_segment(segment['name']))
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Segment d'historique illisible {segment['name']}: {e}")
+        return frames
+
+    def read_range(self, start: Optional[int] = None, end: Optional[int] = None) -> pd.DataFrame:
+        """Historique brut des segments sur [start, end] (copie filtrée)"""
+        parts = []
+        for frame in self.open_range(start, end):
+            ts = frame['ts'].to_numpy()
+            lo = np.searchsorted(ts, start, 'left') if start is not None else 0
+            hi = np.searchsorted(ts, end, 'right') if end is not None else len(ts)
+            parts.append(frame.iloc[lo:hi])
+        if not parts:
+            return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in HISTORY_ARRAYS.items()})
+        return pd.concat(parts, ignore_index=True)
+
+
+def export_closed_days(
+    store: HistoryStore,
+    history: Optional['ColumnarHistory'] = None,
+    limit: Optional[int] = EXPORT_BATCH,
+) -> int:
+    """
+    Publie un segment par jour UTC terminé pas encore exporté, du plus
+    ancien au plus récent
+
+    Un jour est terminé dès qu'un snapshot du jour suivant est enregistré ;
+    les points arrivés après l'export d'un jour restent lisibles dans
+    le store SQLite (voir read_history).
+
+    Args:
+        limit: Jours exportés au plus par appel (None : tous) ; les
+            suivants le sont aux appels suivants
+
+    Returns:
+        Nombre de segments publiés
+    """
+    history = history or get_columnar_history()
+    first, latest = store.time_bounds()
+    if first is None:
+        return 0
+
+    # Jours purgés par la rétention : jamais exportés
+    start = max(history.covered_until() or 0, day_epoch(first))
+    today = day_epoch(latest)
+    segments = []
+    days = range(start, today, DAY)
+    for day in days[:limit] if limit is not None else days:
+        frame = store.read_range(start=day, end=day + DAY - 1, columns=list(HISTORY_ARRAYS)[2:], epoch=True)
+        segments.append(history.write_segment(frame, day, day + DAY))
+    if segments:
+        history.publish(segments)
+    return len(segments)
+
+
+def _current_segments(store: HistoryStore, history: 'ColumnarHistory', start: Optional[int],
+                      end: Optional[int]) -> List[Dict[str, Any]]:
+    """
+    Segments recouvrant [start, end] encore complets : un segment auquel
+    le store a ajouté des snapshots depuis l'export (rattrapage) est lu
+    dans SQLite
+    """
+    segments = []
+    for segment in history.segments():
+        if (start is not None and segment['end'] <= start) or (end is not None and segment['start'] > end):
+            continue
+        exported = segment.get('snapshots')
+        if exported is not None and store.count_snapshots(segment['start'], segment['end'] - 1) > exported:
+            continue
+        segments.append(segment)
+    return segments
+
+
+def _slice_segment(history: 'ColumnarHistory', segment: Dict[str, Any], bridge_ids, start: Optional[int],
+                   end: Optional[int], columns: Sequence[str]) -> Optional[pd.DataFrame]:
+    """Lignes d'un segment sur [start, end] (None si le segment est illisible)"""
+    try:
+        frame = history.open_segment(segment['name'])
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Segment d'historique illisible {segment['name']}: {e}")
+        return None
+    ts = frame['ts'].to_numpy()
+    lo = np.searchsorted(ts, start, 'left') if start is not None else 0
+    hi = np.searchsorted(ts, end, 'right') if end is not None else len(ts)
+    part = frame.iloc[lo:hi][['ts', 'bridge_id', *columns]]
+    if bridge_ids is not None:
+        part = part[np.isin(part['bridge_id'].to_numpy(), np.asarray(bridge_ids, dtype='int64'))]
+    return part
+
+
+def read_history(
+    bridge_ids: Optional[Sequence[int]] = None,
+    start: Optional[Timestamp] = None,
+    end: Optional[Timestamp] = None,
+    columns: Sequence[str] = ('tvl',),
+    epoch: bool = False,
+    store: Optional[HistoryStore] = None,
+    history: Optional['ColumnarHistory'] = None,
+) -> pd.DataFrame:
+    """
+    Historique brut (voir HistoryStore.read_range) : jours publiés lus dans
+    les segments mappés, le reste de la plage dans le store SQLite
+
+    Returns:
+        DataFrame long [ts, bridge_id, *columns], trié par (bridge_id, ts)
+    """
+    store = store or get_history_store()
+    history = history or get_columnar_history()
+    columns = list(columns)
+    start = to_epoch(start) if start is not None else None
+    end = to_epoch(end) if end is not None else None
+    if not set(columns) <= set(HISTORY_ARRAYS):
+        return store.read_range(bridge_ids, start, end, columns, epoch=epoch)
+
+    parts, cursor = [], start
+    for segment in _current_segments(store, history, start, end):
+        part = _slice_segment(history, segment, bridge_ids, start, end, columns)
+        if part is None:
+            continue
+        # Intervalle non couvert avant le segment : SQLite
+        if cursor is None or cursor < segment['start']:
+            parts.append(store.read_range(bridge_ids, cursor, segment['start'] - 1, columns, epoch=True))
+        parts.append(part)
+        cursor = segment['end']
+    if cursor is None or end is None or cursor <= end:
+        parts.append(store.read_range(bridge_ids, cursor, end, columns, epoch=True))
+
+    dtypes = {'ts': 'int64', 'bridge_id': 'int64', **{c: HISTORY_ARRAYS[c] for c in columns}}
+    result = pd.concat([p.astype(dtypes) for p in parts], ignore_index=True)
+    result = result.sort_values(['bridge_id', 'ts'], ignore_index=True, kind='stable')
+    if not epoch:
+        result['ts'] = from_epoch(result['ts'])
+    return result
+
+
+def read_snapshot(
+    ts: Timestamp,
+    columns: Sequence[str] = ('tvl',),
+    store: Optional[HistoryStore] = None,
+    history: Optional['ColumnarHistory'] = None,
+) -> pd.DataFrame:
+    """
+    État des bridges à la date `ts` (voir HistoryStore.read_as_of) : dernier
+    snapshot à ou avant `ts`, lu dans le segment publié qui le contient,
+    sinon reconstruit dans SQLite
+
+    Returns:
+        DataFrame [bridge_id, ts, *columns]
+    """
+    store = store or get_history_store()
+    history = history or get_columnar_history()
+    t = store.snapshot_before(ts)
+    if t is None:
+        return store.read_as_of(ts, columns=list(columns))
+    if set(columns) <= set(HISTORY_ARRAYS):
+        for segment in _current_segments(store, history, t, t):
+            part = _slice_segment(history, segment, None, t, t, columns)
+            # Segment illisible ou sans ce snapshot : SQLite
+            if part is not None and not part.empty:
+                state = part[['bridge_id', 'ts', *columns]].reset_index(drop=True)
+                state['ts'] = from_epoch(state['ts'])
+                return state
+    return store.read_as_of(t, columns=list(columns))
+
+
+_snapshots = ColumnarSnapshots()
+_history = ColumnarHistory()
+
+
+def get_columnar_snapshots() -> ColumnarSnapshots:
+    return _snapshots
+
+
+def get_columnar_history() -> ColumnarHistory:
+    return _history
@@ -0,0 +1,295 @@
+"""
+Diff de snapshots bridges - revue d'incidents
+
+Compare l'état des bridges entre deux dates : bridges apparus ou
+disparus, chaînes ajoutées ou retirées, sauts de TVL / volume au-delà
+d'un seuil. Les états sont chargés une fois en matrices (temps × bridge,
+ids triés : fusion par tri sur bridge_id) puis toutes les paires sont
+comparées en une seule passe vectorisée.
+
+Utilisation :
+    python -m backend.diff --from 2026-01-01 --to 2026-01-02
+    python -m backend.diff --from 2026-01-01 --to 2026-01-08 --consecutive --csv incidents.csv
+
+N'importe pas Streamlit : utilisable en script, cron ou notebook.
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.history import HistoryStore, Timestamp, chains_key, from_epoch, get_history_store, to_epoch
+
+# Métriques surveillées pour les sauts
+JUMP_METRICS = ['tvl', 'volume_24h']
+
+# Saut relatif minimum signalé (0.2 = 20 %)
+DEFAULT_THRESHOLD = 0.2
+
+# Valeur minimum (USD, avant ou après) pour signaler un saut
+DEFAULT_MIN_USD = 0.0
+
+# Types d'événements
+ADDED = 'added'
+REMOVED = 'removed'
+CHAIN_ADDED = 'chain_added'
+CHAIN_REMOVED = 'chain_removed'
+JUMP = 'jump'
+
+EVENT_COLUMNS = ['before', 'after', 'bridge_id', 'event', 'metric', 'chain', 'value_before', 'value_after', 'change_pct']
+
+
+@dataclass
+class StateMatrix:
+    """
+    États des bridges à plusieurs dates
+
+    Ligne t, colonne b : valeur du bridge bridge_ids[b] au snapshot times[t]
+    (present[t, b] False si le bridge n'existait pas).
+    """
+    times: np.ndarray               # epoch, trié
+    bridge_ids: np.ndarray          # trié
+    present: np.ndarray             # bool [T, B]
+    values: Dict[str, np.ndarray]   # float64 [T, B] par métrique
+    chains: np.ndarray              # clé de chaînes ('a|b') [T, B]
+
+    @classmethod
+    def from_long(cls, long: pd.DataFrame, metrics: Sequence[str]) -> 'StateMatrix':
+        """DataFrame long [ts (epoch), bridge_id, *metrics, chains] -> matrices"""
+        times = np.unique(long['ts'].to_numpy(dtype='int64'))
+        bridge_ids = np.unique(long['bridge_id'].to_numpy(dtype='int64'))
+        t = np.searchsorted(times, long['ts'].to_numpy(dtype='int64'))
+        b = np.searchsorted(bridge_ids, long['bridge_id'].to_numpy(dtype='int64'))
+        shape = (len(times), len(bridge_ids))
+
+        present = np.zeros(shape, dtype=bool)
+        present[t, b] = True
+        values = {}
+        for metric in metrics:
+            matrix = np.full(shape, np.nan)
+            matrix[t, b] = long[metric].to_numpy(dtype='float64')
+            values[metric] = matrix
+        chains = np.full(shape, '', dtype=object)
+        chains[t, b] = long['chains'].to_numpy(dtype=object)
+        return cls(times, bridge_ids, present, values, chains)
+
+    def index_at(self, when: np.ndarray) -> np.ndarray:
+        """Ligne de l'état à chaque date (dernier snapshot à ou avant, -1 si aucun)"""
+        return np.searchsorted(self.times, when, side='right') - 1
+
+
+def load_states(
+    start: Timestamp,
+    end: Timestamp,
+    bridge_ids: Optional[Sequence[int]] = None,
+    metrics: Sequence[str] = JUMP_METRICS,
+    store: Optional[HistoryStore] = None,
+) -> StateMatrix:
+    """États de tous les snapshots entre start et end (plus l'état à start)"""
+    store = store or get_history_store()
+    origin = store.snapshot_before(start)
+    long = store.read_range(bridge_ids, origin if origin is not None else start, end,
+                            columns=[*metrics, 'chains'], epoch=True)
+    return StateMatrix.from_long(long, metrics)
+
+
+def diff_indices(
+    states: StateMatrix,
+    before: np.ndarray,
+    after: np.ndarray,
+    threshold: float = DEFAULT_THRESHOLD,
+    min_usd: float = DEFAULT_MIN_USD,
+) -> pd.DataFrame:
+    """
+    Compare les lignes `before[i]` et `after[i]` de la matrice, pour toutes
+    les paires à la fois
+
+    Returns:
+        DataFrame d'événements (colonnes EVENT_COLUMNS, dates en epoch)
+    """
+    before = np.asarray(before, dtype='int64')
+    after = np.asarray(after, dtype='int64')
+    times = np.append(states.times, -1)  # ligne -1 : aucun snapshot
+
+    def rows(index):
+        present = states.present[index] & (index >= 0)[:, None]
+        return present, {m: v[index] for m, v in states.values.items()}, states.chains[index]
+
+    present_a, values_a, chains_a = rows(before)
+    present_b, values_b, chains_b = rows(after)
+    both = present_a & present_b
+    parts = []
+
+    def events(mask, event, metric=None, chain=None, value_a=None, value_b=None):
+        pair, bridge = np.nonzero(mask)
+        frame = pd.DataFrame({
+            'before': times[before[pair]],
+            'after': times[after[pair]],
+            'bridge_id': states.bridge_ids[bridge],
+            'event': event,
+            'metric': metric,
+            'chain': chain,
+            'value_before': value_a[pair, bridge] if value_a is not None else np.nan,
+            'value_after': value_b[pair, bridge] if value_b is not None else np.nan,
+        })
+        parts.append(frame)
+        return pair, bridge
+
+    events(~present_a & present_b, ADDED)
+    events(present_a & ~present_b, REMOVED)
+
+    for metric in states.values:
+        a, b = values_a[metric], values_b[metric]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = np.abs(b - a) / np.abs(a)
+        jump = both & (change > threshold) & (np.maximum(np.abs(a), np.abs(b)) >= min_usd)
+        events(jump, JUMP, metric=metric, value_a=a, value_b=b)
+
+    # Chaînes : différence d'ensembles uniquement sur les cellules modifiées
+    pair, bridge = np.nonzero(both & (chains_a != chains_b))
+    records = []
+    for p, b in zip(pair, bridge):
+        old = set(filter(None, chains_a[p, b].split('|')))
+        new = set(filter(None, chains_b[p, b].split('|')))
+        records += [(p, b, CHAIN_ADDED, c) for c in sorted(new - old)]
+        records += [(p, b, CHAIN_REMOVED, c) for c in sorted(old - new)]
+    if records:
+        p, b, kind, chain = (np.asarray(x) for x in zip(*records))
+        parts.append(pd.DataFrame({
+            'before': times[before[p.astype('int64')]],
+            'after': times[after[p.astype('int64')]],
+            'bridge_id': states.bridge_ids[b.astype('int64')],
+            'event': kind,
+            'metric': None,
+            'chain': chain,
+            'value_before': np.nan,
+            'value_after': np.nan,
+        }))
+
+    result = pd.concat(parts, ignore_index=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result['change_pct'] = (result['value_after'] - result['value_before']) / result['value_before'].abs() * 100
+    return result[EVENT_COLUMNS].sort_values(['after', 'before', 'bridge_id', 'event'], ignore_index=True)
+
+
+def _with_dates(events: pd.DataFrame) -> pd.DataFrame:
+    events['before'] = from_epoch(events['before'].where(events['before'] >= 0))
+    events['after'] = from_epoch(events['after'])
+    return events
+
+
+def diff_pairs(
+    pairs: Sequence[Tuple[Timestamp, Timestamp]],
+    bridge_ids: Optional[Sequence[int]] = None,
+    threshold: float = DEFAULT_THRESHOLD,
+    min_usd: float = DEFAULT_MIN_USD,
+    metrics: Sequence[str] = JUMP_METRICS,
+    store: Optional[HistoryStore] = None,
+) -> pd.DataFrame:
+    """
+    Diff de plusieurs paires de dates en un lot
+
+    Chaque date est résolue au dernier snapshot enregistré à ou avant elle ;
+    l'historique couvrant toutes les paires est lu une seule fois.
+
+    Args:
+        pairs: [(avant, après), ...]
+        bridge_ids: Bridges comparés (tous si None)
+        threshold: Saut relatif minimum (0.2 = 20 %)
+        min_usd: Valeur minimum (USD) pour signaler un saut
+        metrics: Métriques surveillées
+
+    Returns:
+        DataFrame d'événements (EVENT_COLUMNS) : before / after sont les dates
+        des snapshots comparés, change_pct le saut en % (événements jump)
+    """
+    if not pairs:
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+    epochs = np.array([[to_epoch(a), to_epoch(b)] for a, b in pairs], dtype='int64')
+    states = load_states(int(epochs.min()), int(epochs.max()), bridge_ids, metrics, store)
+    events = diff_indices(states, states.index_at(epochs[:, 0]), states.index_at(epochs[:, 1]), threshold, min_usd)
+    return _with_dates(events)
+
+
+def diff_consecutive(
+    start: Timestamp,
+    end: Timestamp,
+    bridge_ids: Optional[Sequence[int]] = None,
+    threshold: float = DEFAULT_THRESHOLD,
+    min_usd: float = DEFAULT_MIN_USD,
+    metrics: Sequence[str] = JUMP_METRICS,
+    store: Optional[HistoryStore] = None,
+) -> pd.DataFrame:
+    """Diff de chaque snapshot avec le précédent entre start et end"""
+    states = load_states(start, end, bridge_ids, metrics, store)
+    if len(states.times) < 2:
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+    after = np.arange(1, len(states.times))
+    after = after[states.times[after] >= to_epoch(start)]
+    return _with_dates(diff_indices(states, after - 1, after, threshold, min_usd))
+
+
+def diff_frames(
+    before: pd.DataFrame,
+    after: pd.DataFrame,
+    threshold: float = DEFAULT_THRESHOLD,
+    min_usd: float = DEFAULT_MIN_USD,
+    metrics: Sequence[str] = JUMP_METRICS,
+) -> pd.DataFrame:
+    """
+    Diff de deux DataFrames bridges (colonnes formatting.BRIDGE_DTYPES),
+    par exemple le snapshot courant et un état historique
+
+    Returns:
+        DataFrame d'événements (EVENT_COLUMNS, before = 0 / after = 1)
+    """
+    long = pd.concat([
+        pd.DataFrame({'ts': ts, 'bridge_id': frame['id'].astype('int64'),
+                      **{m: frame[m] for m in metrics}, 'chains': frame['chains'].map(chains_key)})
+        for ts, frame in ((0, before), (1, after))
+    ], ignore_index=True)
+    states = StateMatrix.from_long(long, metrics)
+    # Lignes 0 / 1 même si l'un des deux DataFrames est vide
+    return diff_indices(states, states.index_at(np.array([0])), states.index_at(np.array([1])), threshold, min_usd)
+
+
+def summarize(events: pd.DataFrame) -> pd.Series:
+    """Nombre d'événements par type"""
+    return events['event'].value_counts().reindex([ADDED, REMOVED, CHAIN_ADDED, CHAIN_REMOVED, JUMP], fill_value=0)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog='python -m backend.diff', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--from', dest='start', required=True, help='Date de départ (ex: 2026-01-01T08:00)')
+    parser.add_argument('--to', dest='end', required=True, help="Date d'arrivée")
+    parser.add_argument('--consecutive', action='store_true', help='Diff de chaque snapshot avec le précédent')
+    parser.add_argument('--bridges', type=int, nargs='*', default=None, help='IDs des bridges (défaut: tous)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Saut relatif (0.2 = 20%%)')
+    parser.add_argument('--min-usd', type=float, default=DEFAULT_MIN_USD)
+    parser.add_argument('--csv', default=None, help='Écrit les événements dans un fichier CSV')
+    args = parser.parse_args(argv)
+
+    if args.consecutive:
+        events = diff_consecutive(args.start, args.end, args.bridges, args.threshold, args.min_usd)
+    else:
+        events = diff_pairs([(args.start, args.end)], args.bridges, args.threshold, args.min_usd)
+
+    events.insert(3, 'name', events['bridge_id'].map(get_history_store().bridge_names()))
+    if args.csv:
+        events.to_csv(args.csv, index=False)
+        print(f"✓ {len(events)} événements écrits dans {args.csv}")
+    elif events.empty:
+        print("✓ Aucun changement")
+    else:
+        with pd.option_context('display.max_rows', 200, 'display.width', 160):
+            print(events.drop(columns=['before']).to_string(index=False))
+
+    print("   " + ", ".join(f"{kind}: {count}" for kind, count in summarize(events).items()))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
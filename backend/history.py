@@ -0,0 +1,1212 @@
+"""
+Historique des snapshots bridges (SQLite, mode WAL)
+
+Chaque snapshot /bridges collecté est ajouté à une table de séries
+temporelles indexée par (bridge_id, ts). Les écritures d'un snapshot
+(ou d'un lot de snapshots) se font en une seule transaction ; les
+lectures par bridge et par plage de temps utilisent la clé primaire.
+Un index chaîne -> bridges et des séries agrégées par chaîne sont
+maintenus à chaque snapshot.
+
+Stockage delta : seuls les bridges qui ont bougé au-delà d'une tolérance
+sont écrits, avec un snapshot complet (keyframe) périodique et une ligne
+tombstone quand un bridge disparaît. Les lectures reconstruisent l'état
+à n'importe quelle date depuis la keyframe précédente. Un snapshot de
+rattrapage (antérieur au dernier enregistré) est écrit en entier mais
+n'est visible qu'à sa propre date : il ne sert ni de keyframe ni de base
+aux deltas suivants.
+
+Lecteurs et écrivain sont concurrents (WAL) : une connexion par thread,
+un seul écrivain à la fois.
+
+Rétention par paliers (RETENTION) : les snapshots bruts, puis les agrégats
+horaires, sont purgés au-delà de leur durée par lots courts
+(apply_retention) ; maintain() ré-analyse les index, rend les pages
+libres au système et tronque le WAL sans bloquer les lecteurs.
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from backend.settings import HISTORY_DB, HISTORY_RETENTION_DAYS
+
+# Colonnes numériques historisées
+METRICS = ['tvl', 'volume_24h', 'volume_7d', 'volume_30d']
+
+DAY = 86400
+
+# Intervalle nominal entre deux snapshots (secondes, TTL du snapshot)
+RAW_STEP = 300
+
+# Agrégats maintenus à l'ingestion : nom -> durée d'un intervalle (secondes)
+ROLLUPS = {'1h': 3600, '1d': DAY, '1w': 7 * DAY}
+
+# Résolutions de lecture, de la plus fine à la plus grossière
+RESOLUTIONS = {'raw': RAW_STEP, **ROLLUPS}
+
+# Rétention par résolution (secondes, None = illimitée, voir settings)
+RETENTION: Dict[str, Optional[int]] = {
+    name: HISTORY_RETENTION_DAYS.get(name) * DAY if HISTORY_RETENTION_DAYS.get(name) else None
+    for name in RESOLUTIONS
+}
+
+# Durée maximum d'une transaction de purge (secondes d'historique) : les
+# écritures d'ingestion s'intercalent entre deux lots
+PURGE_CHUNK = DAY
+
+# Pages libérées par lot de PRAGMA incremental_vacuum
+VACUUM_PAGES = 2000
+
+# Colonnes agrégées et statistiques disponibles par intervalle
+ROLLUP_METRICS = ['tvl', 'volume_24h']
+ROLLUP_STATS = ['sum', 'mean', 'min', 'max', 'last']
+
+# Encodage delta : à chaque snapshot, une ligne n'est écrite que pour les
+# bridges dont une métrique a bougé de plus de DELTA_REL_TOLERANCE (relatif,
+# avec un plancher de DELTA_ABS_TOLERANCE USD) ou dont les chaînes ont changé,
+# par rapport à la dernière valeur écrite
+DELTA_REL_TOLERANCE = 0.001
+DELTA_ABS_TOLERANCE = 1.0
+
+# Snapshot écrit en entier (keyframe) au moins tous les KEYFRAME_INTERVAL
+# secondes : une reconstruction ne lit jamais plus d'un intervalle de lignes
+KEYFRAME_INTERVAL = 6 * 3600
+
+# Type de ligne de bridge_history
+ROW_DELTA = 0
+ROW_KEYFRAME = 1
+ROW_TOMBSTONE = 2  # bridge disparu de /bridges
+ROW_LATE = 3       # ligne d'un snapshot de rattrapage (lue à sa seule date)
+
+# Colonnes des séries par chaîne (exposition : somme sur les bridges qui
+# desservent la chaîne, /bridges ne ventilant pas la TVL par chaîne)
+CHAIN_COLUMNS = ['bridges', *METRICS]
+
+# Les semaines commencent le lundi (1970-01-05) à minuit UTC
+_WEEK_ORIGIN = 4 * DAY
+
+
+def bucket_start(ts: int, step: int) -> int:
+    """Début de l'intervalle de `step` secondes contenant ts (UTC)"""
+    origin = _WEEK_ORIGIN if step % (7 * DAY) == 0 else 0
+    return (ts - origin) // step * step + origin
+
+
+def _rollup_ddl(name: str) -> str:
+    stats = ''.join(f"{m}_sum REAL NOT NULL, {m}_min REAL NOT NULL, {m}_max REAL NOT NULL, {m}_last REAL NOT NULL, "
+                    for m in ROLLUP_METRICS)
+    return (f"CREATE TABLE IF NOT EXISTS rollup_{name} (bridge_id INTEGER NOT NULL, bucket INTEGER NOT NULL, "
+            f"n INTEGER NOT NULL, last_ts INTEGER NOT NULL, {stats}"
+            f"PRIMARY KEY (bridge_id, bucket)) WITHOUT ROWID")
+
+
+def _rollup_upsert(name: str) -> str:
+    """Ajout d'un point à un intervalle (ordre d'arrivée quelconque)"""
+    columns = ', '.join(f"{m}_sum, {m}_min, {m}_max, {m}_last" for m in ROLLUP_METRICS)
+    updates = ', '.join(
+        f"{m}_sum = {m}_sum + excluded.{m}_sum, {m}_min = MIN({m}_min, excluded.{m}_min), "
+        f"{m}_max = MAX({m}_max, excluded.{m}_max), "
+        f"{m}_last = CASE WHEN excluded.last_ts >= last_ts THEN excluded.{m}_last ELSE {m}_last END"
+        for m in ROLLUP_METRICS
+    )
+    placeholders = ', '.join('?' * (3 + 4 * len(ROLLUP_METRICS)))
+    return (f"INSERT INTO rollup_{name} (bridge_id, bucket, last_ts, {columns}, n) VALUES ({placeholders}, 1) "
+            f"ON CONFLICT (bridge_id, bucket) DO UPDATE SET n = n + 1, {updates}, "
+            f"last_ts = MAX(last_ts, excluded.last_ts)")
+
+
+def _update_rollups(conn: sqlite3.Connection, points: Sequence[Tuple]):
+    """
+    Met à jour les agrégats avec des points (bridge_id, ts, *ROLLUP_METRICS)
+    """
+    for name, step in ROLLUPS.items():
+        conn.executemany(
+            _rollup_upsert(name),
+            ((point[0], bucket_start(point[1], step), point[1],
+              *(v for value in point[2:] for v in (value,) * 4)) for point in points),
+        )
+
+
+def _create_rollups(conn: sqlite3.Connection):
+    """v3 - agrégats, alimentés depuis l'historique déjà enregistré"""
+    for name in ROLLUPS:
+        conn.execute(_rollup_ddl(name))
+    cursor = conn.execute(f"SELECT bridge_id, ts, {', '.join(ROLLUP_METRICS)} FROM bridge_history ORDER BY ts")
+    while True:
+        points = cursor.fetchmany(50000)
+        if not points:
+            break
+        _update_rollups(conn, points)
+
+
+def _delta_encoding(conn: sqlite3.Connection):
+    """v4 - encodage delta ; l'historique existant est fait de keyframes"""
+    conn.execute("ALTER TABLE snapshots ADD COLUMN keyframe INTEGER NOT NULL DEFAULT 1")
+    conn.execute(f"ALTER TABLE bridge_history ADD COLUMN kind INTEGER NOT NULL DEFAULT {ROW_KEYFRAME}")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS bridge_state (bridge_id INTEGER PRIMARY KEY, ts INTEGER NOT NULL, "
+        "tvl REAL NOT NULL, volume_24h REAL NOT NULL, volume_7d REAL NOT NULL, volume_30d REAL NOT NULL, "
+        "chains_count INTEGER NOT NULL, chains TEXT NOT NULL, removed INTEGER NOT NULL DEFAULT 0) WITHOUT ROWID"
+    )
+    conn.execute(
+        "INSERT INTO bridge_state (bridge_id, ts, tvl, volume_24h, volume_7d, volume_30d, chains_count, chains, removed) "
+        "SELECT h.bridge_id, h.ts, h.tvl, h.volume_24h, h.volume_7d, h.volume_30d, h.chains_count, h.chains, "
+        "h.ts < (SELECT MAX(ts) FROM snapshots) FROM bridge_history h "
+        "JOIN (SELECT bridge_id, MAX(ts) AS ts FROM bridge_history GROUP BY bridge_id) last USING (bridge_id, ts)"
+    )
+
+
+def _upsert_rows(conn: sqlite3.Connection, table: str, frame: pd.DataFrame) -> int:
+    """INSERT OR REPLACE des lignes d'un DataFrame (colonnes = colonnes de la table, NaN -> NULL)"""
+    columns = list(frame.columns)
+    rows = [tuple(None if isinstance(v, float) and np.isnan(v) else v for v in row)
+            for row in frame.astype(object).itertuples(index=False, name=None)]
+    conn.executemany(f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) "
+                     f"VALUES ({', '.join('?' * len(columns))})", rows)
+    return len(rows)
+
+
+def _chain_members(current: pd.DataFrame) -> pd.DataFrame:
+    """
+    Bridges x chaînes desservies
+
+    Args:
+        current: DataFrame indexé par bridge_id [*METRICS, chains (chains_key)]
+
+    Returns:
+        DataFrame [bridge_id, *METRICS, chain], une ligne par couple
+    """
+    members = current[METRICS].assign(chain=current['chains'].str.split('|')).explode('chain')
+    return members[members['chain'].notna() & (members['chain'] != '')].reset_index()
+
+
+def _update_chains(conn: sqlite3.Connection, current: pd.DataFrame, ts: int, index: bool = True):
+    """
+    Séries par chaîne du snapshot et, si `index`, intervalles de l'index
+    chaîne -> bridges (ouverts à l'apparition d'un couple, fermés à sa
+    disparition)
+    """
+    members = _chain_members(current)
+    totals = members.groupby('chain')[METRICS].sum()
+    counts = members.groupby('chain').size()
+    conn.executemany(
+        f"INSERT OR REPLACE INTO chain_history (chain, ts, {', '.join(CHAIN_COLUMNS)}) "
+        f"VALUES (?, ?{', ?' * len(CHAIN_COLUMNS)})",
+        zip(totals.index.tolist(), [ts] * len(totals), counts.reindex(totals.index).tolist(),
+            *(totals[m].tolist() for m in METRICS)),
+    )
+    if not index:
+        return
+
+    active = set(conn.execute('SELECT chain, bridge_id FROM chain_bridges WHERE until IS NULL'))
+    pairs = set(zip(members['chain'].tolist(), members['bridge_id'].tolist()))
+    conn.executemany('INSERT OR IGNORE INTO chain_bridges (chain, bridge_id, since) VALUES (?, ?, ?)',
+                     [(chain, bridge_id, ts) for chain, bridge_id in pairs - active])
+    conn.executemany('UPDATE chain_bridges SET until = ? WHERE chain = ? AND bridge_id = ? AND until IS NULL',
+                     [(ts, chain, bridge_id) for chain, bridge_id in active - pairs])
+
+
+def _chain_index(conn: sqlite3.Connection):
+    """v6 - index chaîne -> bridges et séries par chaîne, rejoués depuis l'historique"""
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS chain_bridges (chain TEXT NOT NULL, bridge_id INTEGER NOT NULL, "
+        "since INTEGER NOT NULL, until INTEGER, PRIMARY KEY (chain, bridge_id, since)) WITHOUT ROWID"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_chain_bridges_bridge ON chain_bridges (bridge_id)")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS chain_history (chain TEXT NOT NULL, ts INTEGER NOT NULL, "
+        "bridges INTEGER NOT NULL, tvl REAL NOT NULL, volume_24h REAL NOT NULL, volume_7d REAL NOT NULL, "
+        "volume_30d REAL NOT NULL, PRIMARY KEY (chain, ts)) WITHOUT ROWID"
+    )
+
+    # État de chaque bridge à chaque snapshot : dernière ligne écrite
+    state = {}
+    rows = conn.execute(f"SELECT ts, bridge_id, {', '.join(METRICS)}, chains, kind FROM bridge_history ORDER BY ts")
+    pending = rows.fetchone()
+    for (ts,) in conn.execute('SELECT ts FROM snapshots ORDER BY ts').fetchall():
+        while pending is not None and pending[0] <= ts:
+            _, bridge_id, *values, kind = pending
+            if kind == ROW_TOMBSTONE:
+                state.pop(bridge_id, None)
+            else:
+                state[bridge_id] = values
+            pending = rows.fetchone()
+        if state:
+            current = pd.DataFrame.from_dict(state, orient='index', columns=[*METRICS, 'chains'])
+            _update_chains(conn, current.rename_axis('bridge_id'), ts)
+
+
+# Migrations du schéma, appliquées dans l'ordre (PRAGMA user_version) :
+# script SQL ou fonction(conn) exécutée dans une transaction
+MIGRATIONS = [
+    # v1 - snapshots bruts
+    """
+    CREATE TABLE IF NOT EXISTS snapshots (
+        ts INTEGER PRIMARY KEY,
+        version TEXT NOT NULL,
+        bridges INTEGER NOT NULL,
+        late INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS bridges (
+        bridge_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        first_seen INTEGER NOT NULL,
+        last_seen INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS bridge_history (
+        bridge_id INTEGER NOT NULL,
+        ts INTEGER NOT NULL,
+        tvl REAL NOT NULL,
+        volume_24h REAL NOT NULL,
+        volume_7d REAL NOT NULL,
+        volume_30d REAL NOT NULL,
+        chains_count INTEGER NOT NULL,
+        chains TEXT NOT NULL,
+        PRIMARY KEY (bridge_id, ts)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_bridge_history_ts ON bridge_history (ts);
+    """,
+    # v2 - historique quotidien (backfill /bridgevolume) et reprise des backfills
+    """
+    CREATE TABLE IF NOT EXISTS bridge_daily (
+        bridge_id INTEGER NOT NULL,
+        day INTEGER NOT NULL,
+        deposit_usd REAL NOT NULL,
+        withdraw_usd REAL NOT NULL,
+        deposit_txs INTEGER NOT NULL,
+        withdraw_txs INTEGER NOT NULL,
+        PRIMARY KEY (bridge_id, day)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_bridge_daily_day ON bridge_daily (day);
+    CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+        job TEXT NOT NULL,
+        bridge_id INTEGER NOT NULL,
+        days INTEGER NOT NULL,
+        last_day INTEGER,
+        completed_at INTEGER NOT NULL,
+        PRIMARY KEY (job, bridge_id)
+    ) WITHOUT ROWID;
+    """,
+    _create_rollups,
+    _delta_encoding,
+    # v5 - compteur de version des données (cache des requêtes)
+    """
+    CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID;
+    INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', 0);
+    """,
+    _chain_index,
+    # v7 - table des scores (recalcul incrémental, voir scoring.rescore)
+    """
+    CREATE TABLE IF NOT EXISTS bridge_scores (
+        bridge_id INTEGER PRIMARY KEY,
+        weights_version TEXT NOT NULL,
+        input_hash INTEGER NOT NULL,
+        security_hash INTEGER NOT NULL,
+        liquidity_hash INTEGER NOT NULL,
+        governance_hash INTEGER NOT NULL,
+        operational_hash INTEGER NOT NULL,
+        regulatory_hash INTEGER NOT NULL,
+        security_score REAL,
+        liquidity_score REAL,
+        governance_score REAL,
+        operational_score REAL,
+        regulatory_score REAL,
+        total_score REAL,
+        updated_at INTEGER NOT NULL
+    ) WITHOUT ROWID;
+    """,
+    # v8 - statistiques glissantes par bridge (voir backend.rolling)
+    """
+    CREATE TABLE IF NOT EXISTS bridge_rolling (
+        bridge_id INTEGER PRIMARY KEY,
+        ts INTEGER NOT NULL,
+        n INTEGER NOT NULL,
+        tvl_last REAL NOT NULL,
+        tvl_mean REAL NOT NULL,
+        tvl_var REAL NOT NULL,
+        return_var REAL,
+        peak REAL NOT NULL,
+        drawdown REAL NOT NULL,
+        max_drawdown REAL NOT NULL,
+        turnover REAL
+    ) WITHOUT ROWID;
+    """,
+    # v9 - détection d'anomalies : état par bridge et par métrique, anomalies
+    # détectées (voir backend.anomalies)
+    """
+    CREATE TABLE IF NOT EXISTS bridge_anomaly_state (
+        bridge_id INTEGER PRIMARY KEY,
+        ts INTEGER NOT NULL,
+        tvl_n INTEGER NOT NULL,
+        tvl_last REAL,
+        tvl_mean REAL NOT NULL,
+        tvl_mad REAL NOT NULL,
+        volume_24h_n INTEGER NOT NULL,
+        volume_24h_last REAL,
+        volume_24h_mean REAL NOT NULL,
+        volume_24h_mad REAL NOT NULL
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS anomalies (
+        ts INTEGER NOT NULL,
+        bridge_id INTEGER NOT NULL,
+        metric TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        severity TEXT NOT NULL,
+        value REAL NOT NULL,
+        previous REAL NOT NULL,
+        change_pct REAL NOT NULL,
+        zscore REAL NOT NULL,
+        PRIMARY KEY (ts, bridge_id, metric)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_anomalies_bridge ON anomalies (bridge_id, ts);
+    """,
+]
+
+# Tables d'état par bridge (clé bridge_id) maintenues à l'ingestion
+BRIDGE_TABLES = ('bridge_scores', 'bridge_rolling', 'bridge_anomaly_state')
+
+# Colonnes de l'historique quotidien
+DAILY_COLUMNS = ['deposit_usd', 'withdraw_usd', 'deposit_txs', 'withdraw_txs']
+
+Timestamp = Union[int, float, datetime, pd.Timestamp, str]
+
+
+def to_epoch(value: Timestamp) -> int:
+    """
+    Horodatage -> secondes epoch
+
+    Un horodatage sans fuseau est en heure locale, comme les
+    datetime.now() des snapshots.
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(pd.Timestamp(value).to_pydatetime().timestamp())
+
+
+def day_epoch(value: Timestamp) -> int:
+    """Jour (date UTC) -> epoch de minuit UTC"""
+    if isinstance(value, (int, float)):
+        return int(value) // DAY * DAY
+    ts = pd.Timestamp(value)
+    ts = ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+    return int(ts.normalize().timestamp())
+
+
+def from_epoch(values) -> pd.Series:
+    """Secondes epoch -> datetime64 en heure locale (sans fuseau)"""
+    local = datetime.now().astimezone().tzinfo
+    return pd.to_datetime(pd.Series(values), unit='s', utc=True).dt.tz_convert(local).dt.tz_localize(None)
+
+
+def chains_key(chains) -> str:
+    """Ensemble de chaînes normalisé (trié, séparateur '|')"""
+    return '|'.join(sorted(chains)) if chains is not None and len(chains) else ''
+
+
+class HistoryStore:
+    """
+    Stockage historique des snapshots bridges
+
+    Utilisation :
+        store = HistoryStore()
+        store.append_snapshot(frame, ts=snapshot.fetched_at, version=snapshot.version)
+        df = store.read_range([1, 2], start='2026-01-01', end='2026-02-01')
+    """
+
+    def __init__(self, path: Union[str, Path] = HISTORY_DB, retention: Optional[Dict[str, Optional[int]]] = None):
+        self.path = Path(path)
+        self.retention = {**RETENTION, **(retention or {})}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._migrate()
+
+    def connection(self) -> sqlite3.Connection:
+        """Connexion du thread courant"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            # Sans effet sur une base existante (voir maintain(full=True)) : avant WAL,
+            # qui initialise le fichier
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            self._local.conn = conn
+        return conn
+
+    def _migrate(self):
+        conn = self.connection()
+        with self._write_lock:
+            current = conn.execute('PRAGMA user_version').fetchone()[0]
+            for version, step in enumerate(MIGRATIONS[current:], start=current + 1):
+                if not callable(step):
+                    conn.executescript(f"BEGIN;\n{step}\nPRAGMA user_version = {version};\nCOMMIT;")
+                    continue
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    step(conn)
+                    conn.execute(f"PRAGMA user_version = {version}")
+                except BaseException:
+                    conn.execute('ROLLBACK')
+                    raise
+                conn.execute('COMMIT')
+
+    def _transaction(self, fn):
+        """
+        Exécute fn(conn) dans une transaction d'écriture (un écrivain à la fois)
+        et incrémente la version des données
+        """
+        conn = self.connection()
+        with self._write_lock:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = fn(conn)
+                conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'data_version'")
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+        return result
+
+    # ------------------------------------------------------------------
+    # Écriture
+    # ------------------------------------------------------------------
+
+    def append_snapshot(self, frame: pd.DataFrame, ts: Timestamp, version: str = '') -> int:
+        """
+        Ajoute un snapshot (une transaction)
+
+        Args:
+            frame: DataFrame bridges (colonnes formatting.BRIDGE_DTYPES)
+            ts: Horodatage de collecte
+            version: Version des données (BridgeSnapshot.version)
+
+        Returns:
+            Nombre de lignes écrites (0 si le snapshot existait déjà)
+        """
+        return self.append_snapshots([(frame, ts, version)])
+
+    def append_snapshots(self, snapshots: Iterable[Tuple[pd.DataFrame, Timestamp, str]]) -> int:
+        """Ajoute un lot de snapshots en une seule transaction"""
+        batch = [(frame, to_epoch(ts), version) for frame, ts, version in snapshots]
+        if not batch:
+            return 0
+        return self._transaction(lambda conn: sum(self._write_snapshot(conn, *item) for item in batch))
+
+    def _write_snapshot(self, conn: sqlite3.Connection, frame: pd.DataFrame, ts: int, version: str) -> int:
+        if frame.empty:
+            return 0
+
+        last_ts, last_keyframe = conn.execute(
+            'SELECT MAX(ts), MAX(CASE WHEN keyframe = 1 THEN ts END) FROM snapshots').fetchone()
+        # Un snapshot antérieur au dernier enregistré (rattrapage) est écrit en
+        # entier (ROW_LATE), n'est pas une keyframe et ne modifie pas l'état
+        # courant : les lectures des autres dates l'ignorent
+        late = last_ts is not None and ts < last_ts
+        keyframe = not late and (last_keyframe is None or ts - last_keyframe >= KEYFRAME_INTERVAL)
+
+        inserted = conn.execute(
+            'INSERT OR IGNORE INTO snapshots (ts, version, bridges, keyframe, late) VALUES (?, ?, ?, ?, ?)',
+            (ts, version, len(frame), int(keyframe), int(late)),
+        ).rowcount
+        if not inserted:
+            return 0
+
+        current = pd.DataFrame({
+            'bridge_id': frame['id'].astype('int64').to_numpy(),
+            **{m: frame[m].astype('float64').to_numpy() for m in METRICS},
+            'chains_count': frame['chains_count'].astype('int64').to_numpy(),
+            'chains': frame['chains'].map(chains_key).to_numpy(),
+        }).drop_duplicates('bridge_id', keep='last').set_index('bridge_id')
+
+        _update_rollups(conn, list(zip(current.index.tolist(), [ts] * len(current),
+                                       *(current[m].tolist() for m in ROLLUP_METRICS))))
+        _update_chains(conn, current, ts, index=not late)
+
+        state = pd.read_sql_query(
+            f"SELECT bridge_id, {', '.join(METRICS)}, chains_count, chains FROM bridge_state WHERE removed = 0",
+            conn, index_col='bridge_id',
+        )
+        if keyframe or late:
+            changed = current
+        else:
+            previous = state.reindex(current.index)
+            delta = (current[METRICS] - previous[METRICS]).abs()
+            bound = np.maximum(previous[METRICS].abs() * DELTA_REL_TOLERANCE, DELTA_ABS_TOLERANCE)
+            moved = (delta > bound).any(axis=1) | (current['chains'] != previous['chains'])
+            changed = current[moved | previous['chains'].isna()]
+        removed = [] if late else state.index.difference(current.index).tolist()
+
+        kind = ROW_LATE if late else ROW_KEYFRAME if keyframe else ROW_DELTA
+        rows = [(i, ts, *values, kind) for i, *values in changed.itertuples(name=None)]
+        rows += [(i, ts, *([0.0] * len(METRICS)), 0, '', ROW_TOMBSTONE) for i in removed]
+        conn.executemany(
+            'INSERT OR REPLACE INTO bridge_history '
+            '(bridge_id, ts, tvl, volume_24h, volume_7d, volume_30d, chains_count, chains, kind) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            rows,
+        )
+
+        # Dernière valeur écrite par bridge : référence des prochains deltas
+        if not late:
+            conn.executemany(
+                'INSERT OR REPLACE INTO bridge_state '
+                '(bridge_id, ts, tvl, volume_24h, volume_7d, volume_30d, chains_count, chains, removed) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)',
+                [row[:-1] for row in rows[:len(changed)]],
+            )
+            conn.executemany('UPDATE bridge_state SET ts = ?, removed = 1 WHERE bridge_id = ?',
+                             [(ts, i) for i in removed])
+
+        conn.executemany(
+            'INSERT INTO bridges (bridge_id, name, first_seen, last_seen) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT (bridge_id) DO UPDATE SET name = excluded.name, '
+            'first_seen = MIN(first_seen, excluded.first_seen), last_seen = MAX(last_seen, excluded.last_seen)',
+            zip(frame['id'].astype('int64').tolist(), frame['name'].astype(str).tolist(),
+                [ts] * len(frame), [ts] * len(frame)),
+        )
+        return len(rows)
+
+    def load_daily(self, frame: pd.DataFrame, job: Optional[str] = None,
+                   completed: Optional[Sequence[int]] = None) -> int:
+        """
+        Chargement en masse de l'historique quotidien (une transaction)
+
+        Les points de reprise des bridges `completed` sont écrits dans la même
+        transaction que leurs données : un backfill interrompu reprend
+        exactement après le dernier lot chargé.
+
+        Args:
+            frame: DataFrame [bridge_id, day (epoch), *DAILY_COLUMNS]
+            job: Nom du backfill (points de reprise)
+            completed: Bridges terminés par ce lot
+
+        Returns:
+            Nombre de jours écrits
+        """
+        def write(conn):
+            conn.executemany(
+                'INSERT OR REPLACE INTO bridge_daily '
+                '(bridge_id, day, deposit_usd, withdraw_usd, deposit_txs, withdraw_txs) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                zip(frame['bridge_id'].astype('int64').tolist(), frame['day'].astype('int64').tolist(),
+                    frame['deposit_usd'].astype('float64').tolist(), frame['withdraw_usd'].astype('float64').tolist(),
+                    frame['deposit_txs'].astype('int64').tolist(), frame['withdraw_txs'].astype('int64').tolist()),
+            )
+            if job and completed:
+                stats = frame.groupby('bridge_id')['day'].agg(['size', 'max'])
+                now = int(time.time())
+                conn.executemany(
+                    'INSERT OR REPLACE INTO backfill_checkpoints (job, bridge_id, days, last_day, completed_at) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    [(job, int(i), int(stats['size'].get(i, 0)),
+                      int(stats['max'][i]) if i in stats.index else None, now) for i in completed],
+                )
+            return len(frame)
+
+        return self._transaction(write)
+
+    def backfill_done(self, job: str) -> Set[int]:
+        """Bridges déjà chargés par un backfill"""
+        rows = self.connection().execute('SELECT bridge_id FROM backfill_checkpoints WHERE job = ?', (job,))
+        return {row[0] for row in rows}
+
+    def reset_backfill(self, job: str):
+        """Oublie les points de reprise d'un backfill (rechargement complet)"""
+        self._transaction(lambda conn: conn.execute('DELETE FROM backfill_checkpoints WHERE job = ?', (job,)))
+
+    def read_bridge_table(self, table: str) -> pd.DataFrame:
+        """
+        Table d'état par bridge (BRIDGE_TABLES), indexée par bridge_id ;
+        colonnes *_hash en Int64 (entiers 64 bits exacts, NA après reindex)
+        """
+        self._check_bridge_table(table)
+        conn = self.connection()
+        declared = {name: kind for _, name, kind, *_ in conn.execute(f"PRAGMA table_info({table})")}
+        dtypes = {name: 'float64' if kind == 'REAL' else 'Int64' if name.endswith('_hash')
+                  else 'int64' if kind == 'INTEGER' else 'str' for name, kind in declared.items()}
+        df = pd.read_sql_query(f"SELECT * FROM {table}", conn, dtype=dtypes)
+        return df.set_index('bridge_id')
+
+    def write_bridge_table(self, table: str, frame: pd.DataFrame, keep: Optional[Sequence[int]] = None) -> int:
+        """
+        Met à jour des lignes d'une table d'état par bridge (une transaction)
+
+        Args:
+            table: Table (BRIDGE_TABLES)
+            frame: DataFrame indexé par bridge_id, colonnes de la table
+            keep: Bridges à conserver (les autres lignes sont supprimées)
+
+        Returns:
+            Nombre de lignes écrites
+        """
+        self._check_bridge_table(table)
+
+        def write(conn):
+            rows = _upsert_rows(conn, table, frame.reset_index())
+            if keep is not None:
+                ids = [int(i) for i in keep]
+                conn.execute(f"DELETE FROM {table} WHERE bridge_id NOT IN ({','.join('?' * len(ids)) or 'NULL'})",
+                             ids)
+            return rows
+
+        return self._transaction(write)
+
+    def append_anomalies(self, anomalies: pd.DataFrame, state: pd.DataFrame) -> int:
+        """
+        Enregistre les anomalies d'un snapshot et l'état du détecteur dans
+        la même transaction (un redémarrage reprend exactement après)
+
+        Args:
+            anomalies: DataFrame [ts (epoch), bridge_id, metric, kind, severity,
+                value, previous, change_pct, zscore]
+            state: État du détecteur indexé par bridge_id (bridge_anomaly_state)
+
+        Returns:
+            Nombre d'anomalies écrites
+        """
+        def write(conn):
+            _upsert_rows(conn, 'bridge_anomaly_state', state.reset_index())
+            return _upsert_rows(conn, 'anomalies', anomalies)
+
+        return self._transaction(write)
+
+    def read_anomalies(
+        self,
+        bridge_ids: Optional[Sequence[int]] = None,
+        start: Optional[Timestamp] = None,
+        end: Optional[Timestamp] = None,
+        severities: Optional[Sequence[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Anomalies détectées sur une plage de temps
+
+        Returns:
+            DataFrame [ts, bridge_id, metric, kind, severity, value, previous,
+            change_pct, zscore], plus récentes en premier
+        """
+        where, params = self._range_filter(bridge_ids, start, end)
+        if severities is not None:
+            severities = list(severities)
+            where += (' AND ' if where else ' WHERE ') + f"severity IN ({','.join('?' * len(severities)) or 'NULL'})"
+            params.extend(severities)
+        df = pd.read_sql_query(f"SELECT * FROM anomalies{where} ORDER BY ts DESC, bridge_id",
+                               self.connection(), params=params)
+        df['ts'] = from_epoch(df['ts'])
+        return df
+
+    @staticmethod
+    def _check_bridge_table(table: str):
+        if table not in BRIDGE_TABLES:
+            raise ValueError(f"Table inconnue: {table}. Disponibles: {list(BRIDGE_TABLES)}")
+
+    # ------------------------------------------------------------------
+    # Rétention et maintenance
+    # ------------------------------------------------------------------
+
+    def apply_retention(self, now: Optional[Timestamp] = None) -> Dict[str, int]:
+        """
+        Purge les données au-delà de la rétention de chaque résolution
+
+        - snapshots bruts : supprimés avant la dernière keyframe précédant
+          la limite (la fenêtre conservée commence par une keyframe et reste
+          reconstructible) ;
+        - agrégats : intervalles terminés avant la limite ;
+        - séries par chaîne : ramenées au pas de la résolution suivante
+          (dernier point de chaque intervalle), supprimées au-delà de la
+          dernière résolution.
+
+        Chaque lot de PURGE_CHUNK secondes est une transaction courte :
+        lecteurs (WAL) et ingestion ne sont pas bloqués.
+
+        Args:
+            now: Date de référence (défaut : dernier snapshot)
+
+        Returns:
+            Nombre de lignes supprimées par table
+        """
+        now = to_epoch(now) if now is not None else self.time_bounds()[1]
+        deleted: Dict[str, int] = {}
+        if now is None:
+            return deleted
+
+        kept = self.retention.get('raw')
+        cutoff = self._keyframe_before(now - kept) if kept else None
+        if cutoff is not None:
+            for table in ('bridge_history', 'snapshots'):
+                deleted[table] = self._purge(table, 'ts', cutoff)
+
+        for name, step in ROLLUPS.items():
+            kept = self.retention.get(name)
+            if kept:
+                deleted[f"rollup_{name}"] = self._purge(f"rollup_{name}", 'bucket', bucket_start(now - kept, step))
+
+        # Séries par chaîne : palier par palier, du brut au plus grossier
+        tiers = list(RESOLUTIONS)
+        for name, coarser in zip(tiers, tiers[1:] + [None]):
+            kept = self.retention.get(name)
+            if not kept:
+                break
+            if coarser is None:
+                deleted['chain_history'] = (deleted.get('chain_history', 0)
+                                            + self._purge('chain_history', 'ts', now - kept))
+                continue
+            step = RESOLUTIONS[coarser]
+            origin = _WEEK_ORIGIN if step % (7 * DAY) == 0 else 0
+            # Supprime un point s'il en existe un plus récent dans le même intervalle
+            condition = (
+                f"EXISTS (SELECT 1 FROM chain_history later WHERE later.chain = chain_history.chain "
+                f"AND later.ts > chain_history.ts "
+                f"AND later.ts < (chain_history.ts - {origin}) / {step} * {step} + {origin} + {step})"
+            )
+            deleted['chain_history'] = (deleted.get('chain_history', 0)
+                                        + self._purge('chain_history', 'ts', bucket_start(now - kept, step), condition))
+        return deleted
+
+    def _purge(self, table: str, column: str, before: int, condition: Optional[str] = None) -> int:
+        """Supprime les lignes `column < before` par lots de PURGE_CHUNK (une transaction par lot)"""
+        first = self.connection().execute(f"SELECT MIN({column}) FROM {table}").fetchone()[0]
+        if first is None:
+            return 0
+        extra = f" AND {condition}" if condition else ''
+        total = 0
+        for lo in range(first, before, PURGE_CHUNK):
+            hi = min(lo + PURGE_CHUNK, before)
+            total += self._transaction(lambda conn: conn.execute(
+                f"DELETE FROM {table} WHERE {column} >= ? AND {column} < ?{extra}", (lo, hi)).rowcount)
+        return total
+
+    def maintain(self, full: bool = False) -> Dict[str, int]:
+        """
+        Maintenance après purge, sans bloquer les lecteurs
+
+        Met à jour les statistiques des index (PRAGMA optimize), rend les
+        pages libres au système par lots (incremental_vacuum) et reporte
+        le WAL dans la base (checkpoint PASSIVE : n'attend aucun lecteur).
+
+        Args:
+            full: Reconstruit les index et la base (REINDEX + VACUUM) ;
+                bloque les écritures pendant l'opération. Nécessaire une fois
+                pour activer l'auto_vacuum incrémental d'une base créée
+                avant celui-ci.
+
+        Returns:
+            {freed_pages, wal_pages}
+        """
+        conn = self.connection()
+        freed = 0
+        if full:
+            with self._write_lock:
+                conn.execute('REINDEX')
+                conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+                before = conn.execute('PRAGMA page_count').fetchone()[0]
+                conn.execute('VACUUM')
+                freed = before - conn.execute('PRAGMA page_count').fetchone()[0]
+        elif conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+            # Lots courts : l'ingestion reprend la main entre deux lots
+            while True:
+                with self._write_lock:
+                    before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+                    if before:
+                        conn.execute(f"PRAGMA incremental_vacuum({VACUUM_PAGES})").fetchall()
+                    after = conn.execute('PRAGMA freelist_count').fetchone()[0]
+                freed += before - after
+                if not after or after == before:
+                    break
+
+        conn.execute('PRAGMA optimize')
+        _, wal_pages, _ = conn.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchone()
+        return {'freed_pages': freed, 'wal_pages': wal_pages}
+
+    def claim_maintenance(self, interval: int) -> bool:
+        """
+        Réserve la prochaine maintenance si la précédente date d'au moins
+        `interval` secondes (un seul processus la lance)
+        """
+        now = int(time.time())
+        with self._write_lock:
+            return self.connection().execute(
+                "INSERT INTO meta (key, value) VALUES ('maintained_at', ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value WHERE value <= ?",
+                (now, now - interval)).rowcount > 0
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    def read_range(
+        self,
+        bridge_ids: Optional[Sequence[int]] = None,
+        start: Optional[Timestamp] = None,
+        end: Optional[Timestamp] = None,
+        columns: Sequence[str] = METRICS,
+        epoch: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Historique brut sur une plage de temps, une ligne par snapshot et par
+        bridge présent (reconstruit depuis la keyframe précédente et les deltas)
+
+        Args:
+            bridge_ids: Bridges à lire (tous si None)
+            start: Début inclus (None = depuis l'origine)
+            end: Fin incluse (None = jusqu'au dernier snapshot)
+            columns: Colonnes à lire parmi METRICS, chains_count, chains
+            epoch: ts en secondes epoch au lieu de datetime
+
+        Returns:
+            DataFrame long [ts, bridge_id, *columns], trié par (bridge_id, ts)
+        """
+        columns = self._check_columns(columns)
+        conn = self.connection()
+        where, params = self._range_filter(None, start, end)
+        snapshots = pd.read_sql_query(f"SELECT ts, late FROM snapshots{where} ORDER BY ts", conn, params=params)
+        times = snapshots['ts']
+
+        result = pd.DataFrame({'ts': pd.Series(dtype='int64'), 'bridge_id': pd.Series(dtype='int64')})
+        if not times.empty:
+            origin = self._keyframe_before(int(times.iloc[0]))
+            rows = self.read_changes(bridge_ids, origin, int(times.iloc[-1]), columns, epoch=True)
+            # Snapshots de rattrapage : leurs lignes, à leur seule date
+            late = (rows['kind'] == ROW_LATE).to_numpy()
+            parts = [rows[late & (rows['ts'] >= times.iloc[0]).to_numpy()]]
+            rows = rows[~late]
+            regular = times[snapshots['late'] == 0]
+            if not rows.empty and not regular.empty:
+                # Valeur de chaque bridge à chaque snapshot : dernière ligne écrite
+                grid = pd.merge(regular.to_frame(), pd.DataFrame({'bridge_id': rows['bridge_id'].unique()}),
+                                how='cross')
+                merged = pd.merge_asof(grid, rows, on='ts', by='bridge_id', direction='backward')
+                parts.append(merged[merged['kind'].notna() & (merged['kind'] != ROW_TOMBSTONE)])
+            parts = [part for part in parts if not part.empty]
+            if parts:
+                result = pd.concat(parts, ignore_index=True).drop(columns='kind')
+                result = result.sort_values(['bridge_id', 'ts'], ignore_index=True)
+                result = result.astype({c: rows[c].dtype for c in columns})
+
+        result = result.reindex(columns=['ts', 'bridge_id', *columns])
+        if not epoch:
+            result['ts'] = from_epoch(result['ts'])
+        return result
+
+    def read_as_of(
+        self,
+        when: Timestamp,
+        bridge_ids: Optional[Sequence[int]] = None,
+        columns: Sequence[str] = METRICS,
+    ) -> pd.DataFrame:
+        """
+        État des bridges à une date (keyframe précédente + deltas), ou
+        lignes du snapshot de rattrapage si c'est le dernier à cette date
+
+        Returns:
+            DataFrame [bridge_id, ts (dernière écriture), *columns],
+            bridges présents à cette date uniquement
+        """
+        columns = self._check_columns(columns)
+        t = to_epoch(when)
+        nearest = self.connection().execute(
+            'SELECT ts, late FROM snapshots WHERE ts <= ? ORDER BY ts DESC LIMIT 1', (t,)).fetchone()
+        if nearest is not None and nearest[1]:
+            rows = self.read_changes(bridge_ids, nearest[0], nearest[0], columns, epoch=True)
+        else:
+            rows = self.read_changes(bridge_ids, self._keyframe_before(t), t, columns, epoch=True)
+            rows = rows[rows['kind'] != ROW_LATE]
+        state = rows.drop_duplicates('bridge_id', keep='last')
+        state = state[state['kind'] != ROW_TOMBSTONE].drop(columns='kind')
+        state = state[['bridge_id', 'ts', *columns]].reset_index(drop=True)
+        state['ts'] = from_epoch(state['ts'])
+        return state
+
+    def read_changes(
+        self,
+        bridge_ids: Optional[Sequence[int]] = None,
+        start: Optional[Timestamp] = None,
+        end: Optional[Timestamp] = None,
+        columns: Sequence[str] = METRICS,
+        epoch: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Lignes réellement écrites (keyframes, deltas, tombstones, lignes
+        de rattrapage)
+
+        Returns:
+            DataFrame [ts, bridge_id, *columns, kind], trié par (ts, bridge_id)
+        """
+        columns = self._check_columns(columns)
+        where, params = self._range_filter(bridge_ids, start, end)
+        df = pd.read_sql_query(f"SELECT ts, bridge_id{''.join(', ' + c for c in columns)}, kind FROM bridge_history"
+                               f"{where} ORDER BY ts, bridge_id", self.connection(), params=params)
+        if not epoch:
+            df['ts'] = from_epoch(df['ts'])
+        return df
+
+    def snapshot_before(self, when: Timestamp) -> Optional[int]:
+        """Dernier snapshot à ou avant une date (epoch, None si aucun)"""
+        row = self.connection().execute('SELECT MAX(ts) FROM snapshots WHERE ts <= ?', (to_epoch(when),)).fetchone()
+        return row[0]
+
+    def _keyframe_before(self, ts: int) -> Optional[int]:
+        """Dernière keyframe à ou avant ts (None : depuis l'origine)"""
+        row = self.connection().execute(
+            'SELECT MAX(ts) FROM snapshots WHERE keyframe = 1 AND ts <= ?', (ts,)).fetchone()
+        return row[0]
+
+    @staticmethod
+    def _check_columns(columns: Sequence[str]) -> List[str]:
+        allowed = set(METRICS) | {'chains_count', 'chains'}
+        unknown = set(columns) - allowed
+        if unknown:
+            raise ValueError(f"Colonnes inconnues: {sorted(unknown)}")
+        return list(columns)
+
+    @staticmethod
+    def _range_filter(bridge_ids, start, end, time_column: str = 'ts') -> Tuple[str, List]:
+        clauses, params = [], []
+        if bridge_ids is not None:
+            ids = [int(i) for i in bridge_ids]
+            clauses.append(f"bridge_id IN ({','.join('?' * len(ids)) or 'NULL'})")
+            params.extend(ids)
+        if start is not None:
+            clauses.append(f"{time_column} >= ?")
+            params.append(to_epoch(start))
+        if end is not None:
+            clauses.append(f"{time_column} <= ?")
+            params.append(to_epoch(end))
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def read_rollup(
+        self,
+        resolution: str,
+        bridge_ids: Optional[Sequence[int]] = None,
+        start: Optional[Timestamp] = None,
+        end: Optional[Timestamp] = None,
+    ) -> pd.DataFrame:
+        """
+        Agrégats d'une résolution (ROLLUPS) sur une plage de temps
+
+        L'intervalle contenant `start` est inclus en entier.
+
+        Returns:
+            DataFrame long [ts (début d'intervalle), bridge_id, n,
+            {metric}_{stat} pour ROLLUP_METRICS x ROLLUP_STATS]
+        """
+        if resolution not in ROLLUPS:
+            raise ValueError(f"Résolution inconnue: {resolution}. Disponibles: {list(ROLLUPS)}")
+        step = ROLLUPS[resolution]
+        if start is not None:
+            start = bucket_start(to_epoch(start), step)
+
+        where, params = self._range_filter(bridge_ids, start, end, time_column='bucket')
+        stats = ''.join(f", {m}_sum, {m}_min, {m}_max, {m}_last" for m in ROLLUP_METRICS)
+        df = pd.read_sql_query(f"SELECT bucket AS ts, bridge_id, n{stats} FROM rollup_{resolution}"
+                               f"{where} ORDER BY bridge_id, bucket", self.connection(), params=params)
+        for metric in ROLLUP_METRICS:
+            df.insert(df.columns.get_loc(f"{metric}_sum") + 1, f"{metric}_mean", df[f"{metric}_sum"] / df['n'])
+        df['ts'] = from_epoch(df['ts'])
+        return df
+
+    def time_bounds(self) -> Tuple[Optional[int], Optional[int]]:
+        """Premier et dernier snapshot enregistrés (epoch)"""
+        return self.connection().execute('SELECT MIN(ts), MAX(ts) FROM snapshots').fetchone()
+
+    def choose_resolution(self, start: Optional[Timestamp], end: Optional[Timestamp], max_points: int) -> str:
+        """
+        Résolution la plus fine encore conservée au début de la plage dont
+        le nombre de points par bridge tient dans le budget (la plus
+        grossière si aucune ne tient)
+        """
+        first, last = self.time_bounds()
+        start = to_epoch(start) if start is not None else first
+        end = to_epoch(end) if end is not None else (last or int(time.time()))
+        if start is None:
+            return 'raw'
+        span = max(0, end - start)
+        for name, step in RESOLUTIONS.items():
+            # Résolution purgée avant le début de la plage : la rétention
+            # compte depuis le dernier snapshot (apply_retention), pas depuis `end`
+            kept = self.retention.get(name)
+            if kept and last is not None and start < last - kept and name != list(RESOLUTIONS)[-1]:
+                continue
+            if span // step + 1 <= max_points:
+                return name
+        return name
+
+    def query_range(
+        self,
+        bridge_ids: Optional[Sequence[int]] = None,
+        start: Optional[Timestamp] = None,
+        end: Optional[Timestamp] = None,
+        metrics: Sequence[str] = ('tvl',),
+        resolution: Optional[str] = None,
+        max_points: Optional[int] = None,
+        stat: str = 'last',
+    ) -> pd.DataFrame:
+        """
+        Historique à la résolution adaptée à la plage demandée
+
+        Args:
+            bridge_ids: Bridges à lire (tous si None)
+            start: Début inclus
+            end: Fin incluse
+            metrics: Colonnes à lire (ROLLUP_METRICS hors résolution 'raw')
+            resolution: 'raw', '1h', '1d' ou '1w' (défaut : selon max_points)
+            max_points: Nombre maximum de points par bridge
+            stat: Statistique par intervalle (ROLLUP_STATS) hors 'raw'
+
+        Returns:
+            DataFrame long [ts, bridge_id, *metrics] ;
+            la résolution utilisée est dans df.attrs['resolution']
+        """
+        if resolution is None:
+            resolution = self.choose_resolution(start, end, max_points) if max_points else 'raw'
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Résolution inconnue: {resolution}. Disponibles: {list(RESOLUTIONS)}")
+
+        if resolution == 'raw':
+            df = self.read_range(bridge_ids, start, end, columns=list(metrics))
+        else:
+            if stat not in ROLLUP_STATS:
+                raise ValueError(f"Statistique inconnue: {stat}. Disponibles: {ROLLUP_STATS}")
+            missing = set(metrics) - set(ROLLUP_METRICS)
+            if missing:
+                raise ValueError(f"Pas d'agrégats pour {sorted(missing)} (disponibles: {ROLLUP_METRICS})")
+            rollup = self.read_rollup(resolution, bridge_ids, start, end)
+            df = rollup[['ts', 'bridge_id']].assign(**{m: rollup[f"{m}_{stat}"] for m in metrics})
+
+        df.attrs['resolution'] = resolution
+        return df
+
+    def read_daily(
+        self,
+        bridge_ids: Optional[Sequence[int]] = None,
+        start: Optional[Timestamp] = None,
+        end: Optional[Timestamp] = None,
+    ) -> pd.DataFrame:
+        """
+        Historique quotidien (backfill) sur une plage de temps
+
+        Les jours sont des dates UTC (minuit UTC de l'API) : start et end
+        sans fuseau sont lus comme des dates UTC.
+
+        Returns:
+            DataFrame long [day, bridge_id, *DAILY_COLUMNS], trié par (bridge_id, day)
+        """
+        start, end = (day_epoch(value) if value is not None else None for value in (start, end))
+        where, params = self._range_filter(bridge_ids, start, end, time_column='day')
+        df = pd.read_sql_query(f"SELECT day, bridge_id, {', '.join(DAILY_COLUMNS)} FROM bridge_daily"
+                               f"{where} ORDER BY bridge_id, day", self.connection(), params=params)
+        df['day'] = pd.to_datetime(df['day'], unit='s')
+        return df
+
+    def chain_bridges(self, chain: str, when: Optional[Timestamp] = None) -> List[int]:
+        """Bridges desservant une chaîne à une date (défaut : dernier snapshot)"""
+        if when is None:
+            rows = self.connection().execute(
+                'SELECT bridge_id FROM chain_bridges WHERE chain = ? AND until IS NULL ORDER BY bridge_id', (chain,))
+        else:
+            t = to_epoch(when)
+            rows = self.connection().execute(
+                'SELECT DISTINCT bridge_id FROM chain_bridges WHERE chain = ? AND since <= ? '
+                'AND (until IS NULL OR until > ?) ORDER BY bridge_id', (chain, t, t))
+        return [row[0] for row in rows]
+
+    def chain_names(self) -> List[str]:
+        """Chaînes desservies par au moins un bridge (toutes dates)"""
+        return [row[0] for row in self.connection().execute('SELECT DISTINCT chain FROM chain_bridges ORDER BY chain')]
+
+    def read_chain_history(
+        self,
+        chains: Optional[Sequence[str]] = None,
+        start: Optional[Timestamp] = None,
+        end: Optional[Timestamp] = None,
+        columns: Sequence[str] = ('tvl',),
+        resolution: str = 'raw',
+    ) -> pd.DataFrame:
+        """
+        Séries agrégées par chaîne (somme sur les bridges qui la desservent)
+
+        Args:
+            chains: Chaînes à lire (toutes si None)
+            start: Début inclus
+            end: Fin incluse
+            columns: Colonnes parmi CHAIN_COLUMNS
+            resolution: 'raw' ou résolution d'agrégat (dernier point de
+                chaque intervalle, daté du début de l'intervalle)
+
+        Returns:
+            DataFrame long [ts, chain, *columns], trié par (chain, ts)
+        """
+        unknown = set(columns) - set(CHAIN_COLUMNS)
+        if unknown:
+            raise ValueError(f"Colonnes inconnues: {sorted(unknown)}")
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Résolution inconnue: {resolution}. Disponibles: {list(RESOLUTIONS)}")
+
+        where, params = self._range_filter(None, start, end)
+        if chains is not None:
+            chains = [str(c) for c in chains]
+            where += (' AND ' if where else ' WHERE ') + f"chain IN ({','.join('?' * len(chains)) or 'NULL'})"
+            params.extend(chains)
+        selected = ''.join(', ' + c for c in columns)
+        if resolution == 'raw':
+            query = f"SELECT ts, chain{selected} FROM chain_history{where} ORDER BY chain, ts"
+        else:
+            # Colonnes nues avec MAX(ts) : valeurs du dernier point de l'intervalle (SQLite)
+            step = ROLLUPS[resolution]
+            origin = _WEEK_ORIGIN if step % (7 * DAY) == 0 else 0
+            query = (f"SELECT (ts - {origin}) / {step} * {step} + {origin} AS bucket, chain, MAX(ts){selected} "
+                     f"FROM chain_history{where} GROUP BY chain, bucket ORDER BY chain, bucket")
+        df = pd.read_sql_query(query, self.connection(), params=params)
+        if resolution != 'raw':
+            df = df.drop(columns='MAX(ts)').rename(columns={'bucket': 'ts'})
+        df['ts'] = from_epoch(df['ts'])
+        df.attrs['resolution'] = resolution
+        return df
+
+    def snapshot_times(self, start: Optional[Timestamp] = None, end: Optional[Timestamp] = None) -> pd.DataFrame:
+        """Liste des snapshots enregistrés [ts, version, bridges]"""
+        where, params = self._range_filter(None, start, end)
+        df = pd.read_sql_query(f"SELECT ts, version, bridges FROM snapshots{where} ORDER BY ts",
+                               self.connection(), params=params)
+        df['ts'] = from_epoch(df['ts'])
+        return df
+
+    def count_snapshots(self, start: Optional[Timestamp] = None, end: Optional[Timestamp] = None) -> int:
+        """Nombre de snapshots enregistrés sur [start, end]"""
+        where, params = self._range_filter(None, start, end)
+        return self.connection().execute(f"SELECT COUNT(*) FROM snapshots{where}", params).fetchone()[0]
+
+    def bridge_names(self) -> pd.Series:
+        """Nom le plus récent de chaque bridge (index bridge_id)"""
+        df = pd.read_sql_query('SELECT bridge_id, name FROM bridges', self.connection())
+        return df.set_index('bridge_id')['name']
+
+    def data_version(self) -> int:
+        """Compteur incrémenté à chaque écriture (tous processus confondus)"""
+        return self.connection().execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()[0]
+
+    def last_version(self) -> Optional[str]:
+        """Version du dernier snapshot enregistré"""
+        row = self.connection().execute('SELECT version FROM snapshots ORDER BY ts DESC LIMIT 1').fetchone()
+        return row[0] if row else None
+
+
+_store: Optional[HistoryStore] = None
+_store_lock = threading.Lock()
+
+
+def get_history_store() -> HistoryStore:
+    """Store historique partagé du processus"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = HistoryStore()
+        return _store
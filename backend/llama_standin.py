@@ -0,0 +1,401 @@
+"""
+Serveur local remplaçant l'API DefiLlama bridges
+
+Rejoue des réponses enregistrées ou synthétise N bridges, avec latence,
+erreurs et 429 injectables : benchmarks et tests de charge de toute
+l'application hors ligne et reproductibles.
+
+Routes :
+    /bridges
+    /bridge/{id}
+    /bridgevolume/{chain}?id={id}   (ou /bridgevolume/{id})
+    /bridgedaystats/{timestamp}/{chain}?id={id}
+    /__stats                        compteurs du serveur
+
+Utilisation :
+    python -m backend.llama_standin serve --bridges 200 --latency 0.15 --error-rate 0.02
+    XRSK_DEFILLAMA_URL=http://127.0.0.1:8765 streamlit run Home.py
+
+    python -m backend.llama_standin record --out fixtures/defillama --limit 20
+    python -m backend.llama_standin serve --fixtures fixtures/defillama
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from backend.ratelimit import TokenBucket
+
+CHAINS = [
+    'Ethereum', 'Arbitrum', 'Optimism', 'Polygon', 'BSC', 'Avalanche', 'Base', 'Fantom',
+    'Gnosis', 'zkSync Era', 'Linea', 'Scroll', 'Solana', 'Tron', 'Celo', 'Moonbeam',
+]
+
+DAY = 86400
+
+
+@dataclass
+class StandinConfig:
+    """Comportement du serveur"""
+    bridges: int = 80                 # nombre de bridges synthétisés
+    seed: int = 42                    # graine des données synthétiques
+    history_days: int = 365           # profondeur de /bridgevolume
+    update_interval: float = 300.0    # les valeurs synthétiques évoluent à ce rythme (secondes)
+    latency: float = 0.0              # latence ajoutée (secondes)
+    jitter: float = 0.0               # variation uniforme de la latence (secondes)
+    error_rate: float = 0.0           # proportion de réponses 500
+    throttle_rate: float = 0.0        # proportion de réponses 429
+    rate_limit: float = 0.0           # débit maximum (req/s) avant 429, 0 = illimité
+    retry_after: int = 1              # valeur de Retry-After sur les 429
+    fixtures: Optional[str] = None    # dossier de réponses enregistrées
+
+
+class SyntheticBridges:
+    """Données DefiLlama synthétiques, déterministes pour (seed, époque)"""
+
+    def __init__(self, config: StandinConfig):
+        self.config = config
+        rng = random.Random(config.seed)
+        self._base = []
+        for i in range(1, config.bridges + 1):
+            chains = rng.sample(CHAINS, rng.randint(1, min(10, len(CHAINS))))
+            self._base.append({
+                'id': i,
+                'name': f"bridge-{i}",
+                'displayName': f"Bridge {i}",
+                'tvl': rng.lognormvariate(18, 2),
+                'volume': rng.lognormvariate(15, 2),
+                'chains': chains,
+            })
+
+    def epoch(self) -> int:
+        interval = max(self.config.update_interval, 1.0)
+        return int(time.time() // interval)
+
+    def _rng(self, *key) -> random.Random:
+        digest = hashlib.sha1(repr((self.config.seed,) + key).encode()).digest()
+        return random.Random(int.from_bytes(digest[:8], 'big'))
+
+    def bridges(self) -> Dict[str, Any]:
+        epoch = self.epoch()
+        bridges = []
+        for base in self._base:
+            rng = self._rng('bridges', base['id'], epoch)
+            daily = base['volume'] * rng.uniform(0.7, 1.3)
+            bridges.append({
+                'id': base['id'],
+                'name': base['name'],
+                'displayName': base['displayName'],
+                'icon': f"chain:{base['chains'][0].lower()}",
+                'tvl': base['tvl'] * rng.uniform(0.95, 1.05),
+                'volumePrevDay': daily * rng.uniform(0.8, 1.2),
+                'volumePrev2Day': daily * rng.uniform(0.8, 1.2),
+                'lastHourlyVolume': daily / 24 * rng.uniform(0.5, 1.5),
+                'last24hVolume': daily,
+                'lastDailyVolume': daily * rng.uniform(0.9, 1.1),
+                'dayBeforeLastVolume': daily * rng.uniform(0.8, 1.2),
+                'weeklyVolume': daily * 7 * rng.uniform(0.8, 1.2),
+                'monthlyVolume': daily * 30 * rng.uniform(0.8, 1.2),
+                'chains': base['chains'],
+                'destinationChain': 'false',
+            })
+        chains = [{'name': chain, 'gecko_id': chain.lower(), 'tokenSymbol': None} for chain in CHAINS]
+        return {'bridges': bridges, 'chains': chains}
+
+    def _get(self, bridge_id: int) -> Optional[Dict]:
+        if 1 <= bridge_id <= len(self._base):
+            return self._base[bridge_id - 1]
+        return None
+
+    def bridge(self, bridge_id: int) -> Optional[Dict[str, Any]]:
+        base = self._get(bridge_id)
+        if base is None:
+            return None
+        rng = self._rng('bridge', bridge_id, self.epoch())
+        daily = base['volume']
+        breakdown = {}
+        for chain in base['chains']:
+            share = rng.uniform(0.05, 0.5)
+            breakdown[chain] = {
+                'lastDailyVolume': daily * share,
+                'weeklyVolume': daily * share * 7,
+                'monthlyVolume': daily * share * 30,
+                'lastDailyTxs': {'deposits': rng.randint(10, 5000), 'withdrawals': rng.randint(10, 5000)},
+            }
+        return {
+            'id': bridge_id,
+            'name': base['name'],
+            'displayName': base['displayName'],
+            'lastHourlyVolume': daily / 24,
+            'currentDayVolume': daily * rng.uniform(0.2, 1.0),
+            'lastDailyVolume': daily,
+            'dayBeforeLastVolume': daily * rng.uniform(0.8, 1.2),
+            'weeklyVolume': daily * 7,
+            'monthlyVolume': daily * 30,
+            'lastDailyTxs': {'deposits': rng.randint(100, 50000), 'withdrawals': rng.randint(100, 50000)},
+            'chainBreakdown': breakdown,
+            'destinationChain': 'false',
+        }
+
+    def bridge_volume(self, bridge_id: int) -> Optional[List[Dict[str, Any]]]:
+        base = self._get(bridge_id)
+        if base is None:
+            return None
+        rng = self._rng('bridgevolume', bridge_id)
+        today = int(time.time() // DAY) * DAY
+        days = []
+        level = base['volume']
+        for d in range(self.config.history_days, 0, -1):
+            level *= rng.uniform(0.9, 1.1)
+            deposit = level * rng.uniform(0.4, 0.6)
+            days.append({
+                'date': str(today - d * DAY),
+                'depositUSD': deposit,
+                'withdrawUSD': level - deposit,
+                'depositTxs': rng.randint(10, 5000),
+                'withdrawTxs': rng.randint(10, 5000),
+            })
+        return days
+
+    def bridge_day_stats(self, bridge_id: int, timestamp: int) -> Optional[Dict[str, Any]]:
+        base = self._get(bridge_id)
+        if base is None:
+            return None
+        rng = self._rng('bridgedaystats', bridge_id, timestamp // DAY)
+        tokens = ['ETH', 'USDC', 'USDT', 'WBTC', 'DAI']
+        def side():
+            return {
+                f"ethereum:0x{rng.getrandbits(160):040x}": {
+                    'symbol': symbol, 'decimals': 18,
+                    'usdValue': base['volume'] * rng.uniform(0.01, 0.3), 'amount': rng.uniform(1, 1e6),
+                }
+                for symbol in tokens
+            }
+        return {
+            'date': timestamp // DAY * DAY,
+            'totalTokensDeposited': side(),
+            'totalTokensWithdrawn': side(),
+            'totalAddressDeposited': {},
+            'totalAddressWithdrawn': {},
+        }
+
+
+class Fixtures:
+    """Réponses enregistrées (voir la commande record)"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def load(self, name: str) -> Optional[Any]:
+        path = self.directory / f"{name}.json"
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding='utf-8'))
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: StandinConfig):
+        super().__init__(address, _Handler)
+        self.config = config
+        self.synthetic = SyntheticBridges(config)
+        self.fixtures = Fixtures(config.fixtures) if config.fixtures else None
+        self.bucket = TokenBucket(config.rate_limit, max(1, int(config.rate_limit))) if config.rate_limit > 0 else None
+        self.stats = Counter()
+        self.stats_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, key: str):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def resolve(self, path: str, query: Dict[str, List[str]]) -> Optional[Any]:
+        """Payload d'une route : enregistrement s'il existe, sinon synthèse"""
+        parts = [p for p in path.split('/') if p]
+        if not parts:
+            return None
+        route = parts[0]
+        query_id = query.get('id', [None])[0]
+
+        if route == 'bridges' and len(parts) == 1:
+            return self._fixture('bridges') or self.synthetic.bridges()
+        if route == 'bridge' and len(parts) == 2 and parts[1].isdigit():
+            bridge_id = int(parts[1])
+            return self._fixture(f"bridge/{bridge_id}") or self.synthetic.bridge(bridge_id)
+        if route == 'bridgevolume' and len(parts) == 2:
+            bridge_id = query_id or (parts[1] if parts[1].isdigit() else None)
+            if bridge_id is None or not str(bridge_id).isdigit():
+                return None
+            return self._fixture(f"bridgevolume/{bridge_id}") or self.synthetic.bridge_volume(int(bridge_id))
+        if route == 'bridgedaystats' and len(parts) >= 2 and parts[1].isdigit() and query_id and query_id.isdigit():
+            return (self._fixture(f"bridgedaystats/{query_id}/{parts[1]}")
+                    or self.synthetic.bridge_day_stats(int(query_id), int(parts[1])))
+        return None
+
+    def _fixture(self, name: str) -> Optional[Any]:
+        return self.fixtures.load(name) if self.fixtures else None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StandinServer
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b'', headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        config = server.config
+        url = urlsplit(self.path)
+
+        if url.path == '/__stats':
+            with server.stats_lock:
+                body = json.dumps(dict(server.stats)).encode('utf-8')
+            self._send(200, body, {'Content-Type': 'application/json'})
+            return
+
+        server.count('requests')
+        delay = config.latency + random.uniform(0, config.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        throttled = server.bucket is not None and not server.bucket.try_acquire()
+        if throttled or random.random() < config.throttle_rate:
+            server.count('429')
+            self._send(429, b'{"error":"rate limited"}', {'Retry-After': str(config.retry_after)})
+            return
+        if random.random() < config.error_rate:
+            server.count('500')
+            self._send(500, b'{"error":"injected"}')
+            return
+
+        payload = server.resolve(url.path, parse_qs(url.query))
+        if payload is None:
+            server.count('404')
+            self._send(404, b'{"error":"not found"}')
+            return
+
+        body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        headers = {'Content-Type': 'application/json', 'ETag': etag, 'Date': formatdate(usegmt=True)}
+        if self.headers.get('If-None-Match') == etag:
+            server.count('304')
+            self._send(304, headers={'ETag': etag})
+            return
+        server.count('200')
+        self._send(200, body, headers)
+
+
+def start_standin(config: Optional[StandinConfig] = None, host: str = '127.0.0.1', port: int = 0) -> StandinServer:
+    """
+    Démarre le serveur dans un thread d'arrière-plan (benchmarks, scripts)
+
+    Exemple :
+        server = start_standin(StandinConfig(bridges=500, latency=0.1))
+        collector = DefiLlamaCollector(base_url=server.base_url)
+        ...
+        server.shutdown()
+    """
+    server = StandinServer((host, port), config or StandinConfig())
+    threading.Thread(target=server.serve_forever, name='llama-standin', daemon=True).start()
+    return server
+
+
+def record_fixtures(out: str, limit: int = 20, base_url: Optional[str] = None):
+    """Enregistre des réponses de l'API réelle pour rejeu local"""
+    from backend.collectors.defillama import DefiLlamaCollector
+
+    collector = DefiLlamaCollector(base_url=base_url)
+    directory = Path(out)
+
+    def save(name: str, payload):
+        path = directory / f"{name}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(payload), encoding='utf-8')
+        print(f"   ✓ {path}")
+
+    bridges = collector._get_json("/bridges")
+    save('bridges', bridges)
+    for bridge in bridges.get('bridges', [])[:limit]:
+        bridge_id = bridge['id']
+        details = collector.get_bridge_details(bridge_id)
+        if details is not None:
+            save(f"bridge/{bridge_id}", details)
+        volume = collector.get_bridge_volume(bridge_id)
+        if volume is not None:
+            save(f"bridgevolume/{bridge_id}", volume)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m backend.llama_standin', description=__doc__.split('\n\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help='Démarre le serveur local')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--bridges', type=int, default=StandinConfig.bridges)
+    serve.add_argument('--seed', type=int, default=StandinConfig.seed)
+    serve.add_argument('--history-days', type=int, default=StandinConfig.history_days)
+    serve.add_argument('--update-interval', type=float, default=StandinConfig.update_interval)
+    serve.add_argument('--latency', type=float, default=0.0)
+    serve.add_argument('--jitter', type=float, default=0.0)
+    serve.add_argument('--error-rate', type=float, default=0.0)
+    serve.add_argument('--throttle-rate', type=float, default=0.0)
+    serve.add_argument('--rate-limit', type=float, default=0.0)
+    serve.add_argument('--retry-after', type=int, default=1)
+    serve.add_argument('--fixtures', default=None)
+
+    record = commands.add_parser('record', help="Enregistre des réponses de l'API réelle")
+    record.add_argument('--out', required=True)
+    record.add_argument('--limit', type=int, default=20)
+    record.add_argument('--base-url', default=None)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        record_fixtures(args.out, args.limit, args.base_url)
+        return
+
+    config = StandinConfig(
+        bridges=args.bridges, seed=args.seed, history_days=args.history_days,
+        update_interval=args.update_interval, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate, rate_limit=args.rate_limit,
+        retry_after=args.retry_after, fixtures=args.fixtures,
+    )
+    server = StandinServer((args.host, args.port), config)
+    print(f"✓ DefiLlama stand-in sur {server.base_url} ({config.bridges} bridges)")
+    print(f"   XRSK_DEFILLAMA_URL={server.base_url} streamlit run Home.py")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
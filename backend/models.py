@@ -20,7 +20,7 @@ class BridgeData:
     txs_24h: Optional[int] = None
     chains_count: Optional[int] = None
     
-    # Scores (à implémenter)
+    # Scores de pilier (0-100, voir backend.scoring)
     security_score: Optional[float] = None
     liquidity_score: Optional[float] = None
     governance_score: Optional[float] = None
@@ -29,16 +29,10 @@ class BridgeData:
     
     @property
     def total_score(self) -> Optional[float]:
-        """Score total pondéré"""
-        if all([self.security_score, self.liquidity_score]):
-            return (
-                self.security_score * 0.35 +
-                self.liquidity_score * 0.25 +
-                (self.governance_score or 0) * 0.20 +
-                (self.operational_score or 0) * 0.15 +
-                (self.regulatory_score or 0) * 0.05
-            )
-        return None
+        """Score total pondéré (pondérations courantes de backend.scoring)"""
+        # Import local : le moteur de scoring dépend du store historique
+        from backend.scoring import PILLARS, total_score
+        return total_score({pillar: getattr(self, f"{pillar}_score") for pillar in PILLARS})
 
 @dataclass
 class CryptoFlow:
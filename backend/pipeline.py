@@ -0,0 +1,80 @@
+"""
+Pipeline d'ingestion des snapshots bridges
+
+Appelé par la couche snapshot à chaque nouvelle version des données
+téléchargée depuis l'API. Chaque étape reçoit le snapshot ; l'échec
+d'une étape n'empêche ni les suivantes ni la publication du snapshot.
+"""
+
+from typing import Callable, List
+
+from backend.anomalies import detect_snapshot
+from backend.history import get_history_store
+from backend.retention import compact_in_background
+from backend.rolling import liquidity_inputs, update_rolling
+from backend.scoring import REQUIRED_PILLARS, rescore
+
+
+def record_history(snapshot):
+    """Ajoute le snapshot à l'historique"""
+    written = get_history_store().append_snapshot(snapshot.frame, snapshot.fetched_at, snapshot.version)
+    if written:
+        print(f"✓ Historique: {written}/{len(snapshot)} bridges modifiés enregistrés ({snapshot.version})")
+
+
+def update_rolling_stats(snapshot):
+    """Met à jour les statistiques glissantes des bridges (O(1) par bridge)"""
+    update_rolling(snapshot.frame, snapshot.fetched_at)
+
+
+def detect_anomalies(snapshot):
+    """Détecte les variations anormales de TVL et de volume (références par bridge persistées)"""
+    anomalies = detect_snapshot(snapshot.frame, snapshot.fetched_at)
+    for row in anomalies.itertuples():
+        print(f"⚠️ Anomalie {row.severity}: bridge {row.bridge_id} {row.kind} {row.metric} "
+              f"{row.change_pct:+.1f}% (z={row.zscore:+.1f})")
+
+
+def update_scores(snapshot):
+    """Recalcule les piliers dont les entrées ont changé et persiste la table des scores"""
+    frame = snapshot.frame
+    state = get_history_store().read_bridge_table('bridge_rolling')
+    extra = liquidity_inputs(state).reindex(frame['id'].astype('int64').to_numpy()).set_axis(frame.index)
+    scores = rescore(frame, extra)
+    rescored = {p: n for p, n in scores.attrs['rescored'].items() if n}
+    if rescored:
+        scored = int(scores['total_score'].notna().sum())
+        print("✓ Scores: recalculés " + ", ".join(f"{p} {n}" for p, n in rescored.items())
+              + f" - {scored}/{len(scores)} bridges notés")
+        if not scored:
+            print(f"⚠️ Scores: aucun score total calculable (piliers requis inconnus: {', '.join(REQUIRED_PILLARS)})")
+
+
+def schedule_compaction(snapshot):
+    """
+    Export des jours terminés en segments colonnes, rétention et compaction
+    de l'historique en tâche de fond (au plus une fois par heure)
+    """
+    compact_in_background()
+
+
+# Étapes exécutées dans l'ordre pour chaque nouveau snapshot
+INGEST_STEPS: List[Callable] = [
+    record_history,
+    update_rolling_stats,
+    detect_anomalies,
+    update_scores,
+    schedule_compaction,
+    # HOOK: Ajouter ici les traitements à l'ingestion
+]
+
+
+def ingest_snapshot(snapshot):
+    """Exécute les étapes d'ingestion sur un nouveau snapshot"""
+    if snapshot.empty:
+        return
+    for step in INGEST_STEPS:
+        try:
+            step(snapshot)
+        except Exception as e:
+            print(f"❌ Ingestion ({step.__name__}): {type(e).__name__} {e}")
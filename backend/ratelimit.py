@@ -0,0 +1,167 @@
+"""
+Limitation de débit et politique de retry des collecteurs
+
+- Un token bucket par endpoint, partagé par toutes les instances de
+  collecteurs (synchrones et asyncio) du processus.
+- Backoff exponentiel avec jitter, qui respecte l'en-tête Retry-After
+  (abandon si le serveur demande d'attendre plus de retry_after_max).
+- Limites configurables par endpoint (ENDPOINT_POLICIES / configure_endpoint).
+"""
+
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+# Statuts HTTP qui justifient une nouvelle tentative
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+@dataclass(frozen=True)
+class EndpointPolicy:
+    """Limites d'un endpoint"""
+    rate: float                 # requêtes par seconde (débit soutenu)
+    burst: int                  # rafale maximale
+    max_retries: int = 3        # tentatives supplémentaires après la première
+    backoff_base: float = 0.5   # délai de base du backoff (secondes)
+    backoff_max: float = 30.0   # plafond du backoff (secondes)
+    retry_after_max: float = 300.0  # Retry-After maximum attendu, au-delà abandon (secondes)
+    timeout: float = 10.0       # délai maximum par requête (secondes)
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Délai avant la tentative suivante
+
+        Full jitter : uniforme entre 0 et base * 2^attempt (plafonné).
+        Un Retry-After du serveur sert de minimum, sans plafond : au-delà
+        de retry_after_max l'appelant abandonne (voir gives_up).
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            delay = max(delay, server_delay)
+        return delay
+
+    def gives_up(self, delay: float) -> bool:
+        """True si le délai demandé par le serveur est trop long pour réessayer"""
+        return delay > self.retry_after_max
+
+
+# Limites par endpoint (premier segment du chemin : /bridges, /bridge/{id}, ...)
+ENDPOINT_POLICIES: Dict[str, EndpointPolicy] = {
+    'bridges': EndpointPolicy(rate=1.0, burst=3),
+    'bridge': EndpointPolicy(rate=10.0, burst=20),
+    'bridgevolume': EndpointPolicy(rate=10.0, burst=20),
+    'bridgedaystats': EndpointPolicy(rate=5.0, burst=10),
+    'default': EndpointPolicy(rate=5.0, burst=10),
+}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After en secondes (format délai ou date HTTP)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def endpoint_name(path: str) -> str:
+    """'/bridge/12?x=1' -> 'bridge'"""
+    return path.lstrip('/').split('?', 1)[0].split('/', 1)[0] or 'default'
+
+
+class TokenBucket:
+    """
+    Token bucket thread-safe
+
+    Chaque appel réserve un jeton et reçoit le délai d'attente
+    correspondant : les appelants concurrents sont servis dans l'ordre,
+    au débit maximal autorisé, sans rafale au-delà de `burst`.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Réserve un jeton, retourne le délai d'attente (secondes)"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def try_acquire(self) -> bool:
+        """Prend un jeton s'il y en a un disponible, sans attendre"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1 or now < self._paused_until:
+                return False
+            self._tokens -= 1
+            return True
+
+    def pause(self, seconds: float):
+        """Suspend l'endpoint (429 reçu) pour tous les appelants"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+_lock = threading.Lock()
+_buckets: Dict[str, TokenBucket] = {}
+
+
+def get_policy(endpoint: str) -> EndpointPolicy:
+    return ENDPOINT_POLICIES.get(endpoint, ENDPOINT_POLICIES['default'])
+
+
+def get_bucket(endpoint: str) -> TokenBucket:
+    """Token bucket partagé d'un endpoint (créé à la demande)"""
+    with _lock:
+        bucket = _buckets.get(endpoint)
+        if bucket is None:
+            policy = get_policy(endpoint)
+            bucket = _buckets[endpoint] = TokenBucket(policy.rate, policy.burst)
+        return bucket
+
+
+def configure_endpoint(endpoint: str, **limits):
+    """
+    Modifie les limites d'un endpoint
+
+    Exemple :
+        configure_endpoint('bridge', rate=20, burst=40, max_retries=5)
+    """
+    with _lock:
+        ENDPOINT_POLICIES[endpoint] = replace(get_policy(endpoint), **limits)
+        _buckets.pop(endpoint, None)
@@ -0,0 +1,119 @@
+"""
+Rétention et compaction de l'historique
+
+Publie les jours terminés en segments colonnes (par lots de EXPORT_BATCH
+jours), applique les paliers de rétention (settings.HISTORY_RETENTION_DAYS :
+brut 7 jours, horaire 90 jours, quotidien sans limite), fusionne les
+segments colonnes quotidiens en segments hebdomadaires, puis entretient la base
+(statistiques d'index, pages libres, checkpoint du WAL). Les volumes lus
+restent bornés : la latence des requêtes ne dépend pas de l'âge du store.
+
+Lancée en tâche de fond depuis l'ingestion au plus une fois par
+COMPACTION_INTERVAL (tous processus confondus) ; les lecteurs ne sont
+jamais bloqués (WAL, purges par lots courts, publication atomique des
+segments).
+
+Utilisation :
+    python -m backend.retention            # compaction immédiate
+    python -m backend.retention --full     # + REINDEX / VACUUM (bloquant)
+"""
+
+import argparse
+import threading
+import time
+from typing import Dict, Optional
+
+from backend.columnar import ColumnarHistory, export_closed_days, get_columnar_history
+from backend.history import HistoryStore, get_history_store
+
+# Intervalle minimum entre deux compactions (secondes)
+COMPACTION_INTERVAL = 3600
+
+_running = threading.Lock()
+
+
+def compact_history(
+    store: Optional[HistoryStore] = None,
+    history: Optional[ColumnarHistory] = None,
+    full: bool = False,
+) -> Dict[str, int]:
+    """
+    Export des jours terminés + rétention + fusion des segments +
+    maintenance de la base
+
+    Args:
+        store: Store historique (défaut : store partagé)
+        history: Segments colonnes (défaut : segments partagés)
+        full: Reconstruit aussi index et fichier (voir HistoryStore.maintain)
+
+    Returns:
+        Compteurs : segments publiés, lignes supprimées par table,
+        segments supprimés et fusionnés, pages libérées
+    """
+    store = store or get_history_store()
+    history = history or get_columnar_history()
+
+    exported = export_closed_days(store, history)
+    stats = store.apply_retention()
+    stats['segments_exported'] = exported
+    kept = store.retention.get('raw')
+    first, _ = store.time_bounds()
+    # Segments colonnes : même rétention que les snapshots bruts
+    stats['segments_expired'], stats['segments_merged'] = history.compact(first if kept else None)
+    stats.update(store.maintain(full=full))
+    return stats
+
+
+def _run(store: HistoryStore):
+    try:
+        started = time.time()
+        stats = compact_history(store)
+        if stats['segments_exported']:
+            print(f"✓ Historique: {stats['segments_exported']} segment(s) colonnes publiés")
+        removed = sum(v for k, v in stats.items() if k not in ('wal_pages', 'freed_pages', 'segments_exported'))
+        if removed:
+            print(f"✓ Compaction: {removed} lignes/segments purgés, "
+                  f"{stats['freed_pages']} pages libérées ({time.time() - started:.1f}s)")
+    except Exception as e:
+        print(f"❌ Compaction: {type(e).__name__} {e}")
+    finally:
+        _running.release()
+
+
+def compact_in_background(store: Optional[HistoryStore] = None, interval: int = COMPACTION_INTERVAL) -> bool:
+    """
+    Lance une compaction dans un thread si la dernière date d'au moins
+    `interval` secondes et qu'aucune n'est en cours
+
+    Returns:
+        True si une compaction a été lancée
+    """
+    store = store or get_history_store()
+    if not _running.acquire(blocking=False):
+        return False
+    try:
+        claimed = store.claim_maintenance(interval)
+    except Exception:
+        _running.release()
+        raise
+    if not claimed:
+        _running.release()
+        return False
+    threading.Thread(target=_run, args=(store,), name='xrsk-compaction', daemon=True).start()
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m backend.retention', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--full', action='store_true', help='REINDEX + VACUUM (bloque les écritures)')
+    args = parser.parse_args(argv)
+
+    started = time.time()
+    stats = compact_history(full=args.full)
+    for key, value in stats.items():
+        print(f"   {key}: {value}")
+    print(f"✓ Compaction terminée en {time.time() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
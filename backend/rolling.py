@@ -0,0 +1,147 @@
+"""
+Statistiques glissantes par bridge, mises à jour à chaque snapshot
+
+Pour chaque bridge, un état de taille fixe (table bridge_rolling) est
+mis à jour en O(1) par nouveau snapshot, pour tous les bridges à la fois
+(colonnes NumPy) - jamais en relisant l'historique :
+    - moyenne et variance de la TVL (Welford à pondération exponentielle) ;
+    - variance des variations log de la TVL, ramenée à un jour ;
+    - pic de TVL, drawdown courant et drawdown maximum ;
+    - rotation (volume 24h / TVL).
+
+Les moyennes sont exponentielles en temps (constante WINDOW) : les
+intervalles irréguliers entre snapshots (collecteur arrêté, rattrapage)
+pèsent selon leur durée. Pic et drawdown maximum s'effacent avec la même
+constante de temps : approximation O(1) des extrêmes sur la fenêtre.
+
+Ces statistiques alimentent le pilier liquidité (volatilité et drawdown
+sur 30 jours) dès l'ingestion du snapshot.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.history import DAY, HistoryStore, Timestamp, get_history_store, to_epoch
+
+# Constante de temps des moyennes, pics et drawdowns (secondes)
+WINDOW = 30 * DAY
+
+# Colonnes de l'état (table bridge_rolling, hors bridge_id)
+STATE_COLUMNS = ['ts', 'n', 'tvl_last', 'tvl_mean', 'tvl_var', 'return_var',
+                 'peak', 'drawdown', 'max_drawdown', 'turnover']
+
+
+def update_state(state: pd.DataFrame, frame: pd.DataFrame, ts: Timestamp, window: int = WINDOW) -> pd.DataFrame:
+    """
+    Ajoute un snapshot aux états des bridges (une passe vectorisée)
+
+    Args:
+        state: États précédents indexés par bridge_id (STATE_COLUMNS)
+        frame: DataFrame bridges (colonnes formatting.BRIDGE_DTYPES)
+        ts: Date du snapshot
+        window: Constante de temps (secondes)
+
+    Returns:
+        Nouveaux états des bridges du snapshot, indexés par bridge_id.
+        Un bridge dont l'état est plus récent que ts (rattrapage) garde
+        son état.
+    """
+    t = to_epoch(ts)
+    current = frame.drop_duplicates('id', keep='last')
+    ids = current['id'].astype('int64').to_numpy()
+    x = current['tvl'].to_numpy(dtype='float64')
+    volume = current['volume_24h'].to_numpy(dtype='float64')
+    prev = state.reindex(ids)
+
+    def column(name):
+        return prev[name].to_numpy(dtype='float64', na_value=np.nan)
+
+    last_ts = column('ts')
+    new = np.isnan(last_ts)
+    late = ~new & (last_ts >= t)
+    dt = np.where(new | late, 0.0, t - last_ts)
+    decay = np.exp(-dt / window)
+    alpha = 1.0 - decay
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Welford exponentiel : moyenne et variance de la TVL
+        mean, var = column('tvl_mean'), column('tvl_var')
+        diff = x - mean
+        increment = alpha * diff
+        mean = np.where(new, x, mean + increment)
+        var = np.where(new, 0.0, decay * (var + diff * increment))
+
+        # Variance des variations log, ramenée à un jour (variance par seconde x DAY)
+        last = column('tvl_last')
+        log_return = np.log(x / last)
+        sample = np.where((x > 0) & (last > 0) & (dt > 0), log_return ** 2 / dt * DAY, np.nan)
+        return_var = column('return_var')
+        return_var = np.where(np.isnan(sample), return_var,
+                              np.where(np.isnan(return_var), sample, decay * return_var + alpha * sample))
+
+        # Pic relâché vers la valeur courante, drawdowns
+        peak = np.where(new, x, np.maximum(x, x + (column('peak') - x) * decay))
+        drawdown = np.where(peak > 0, np.clip(1.0 - x / peak, 0.0, 1.0), 0.0)
+        max_drawdown = np.where(new, drawdown, np.maximum(drawdown, column('max_drawdown') * decay))
+
+        ratio = np.where(x > 0, volume / x, np.nan)
+        turnover = column('turnover')
+        turnover = np.where(np.isnan(ratio), turnover,
+                            np.where(np.isnan(turnover), ratio, decay * turnover + alpha * ratio))
+
+    values = {
+        'ts': np.full(len(ids), t, dtype='float64'),
+        'n': np.where(new, 0, column('n')) + 1,
+        'tvl_last': x,
+        'tvl_mean': mean,
+        'tvl_var': var,
+        'return_var': return_var,
+        'peak': peak,
+        'drawdown': drawdown,
+        'max_drawdown': max_drawdown,
+        'turnover': turnover,
+    }
+    # Rattrapage : l'état plus récent est conservé
+    updated = pd.DataFrame({name: np.where(late, column(name), v) for name, v in values.items()},
+                           index=pd.Index(ids, name='bridge_id'))
+    return updated.astype({'ts': 'int64', 'n': 'int64'})
+
+
+def update_rolling(frame: pd.DataFrame, ts: Timestamp, store: Optional[HistoryStore] = None) -> pd.DataFrame:
+    """
+    Met à jour et persiste les états glissants pour un snapshot
+
+    Returns:
+        États des bridges du snapshot (voir update_state)
+    """
+    store = store or get_history_store()
+    state = update_state(store.read_bridge_table('bridge_rolling'), frame, ts)
+    store.write_bridge_table('bridge_rolling', state[STATE_COLUMNS])
+    return state
+
+
+def liquidity_inputs(state: pd.DataFrame) -> pd.DataFrame:
+    """
+    Entrées du pilier liquidité tirées des états glissants
+
+    Returns:
+        DataFrame indexé par bridge_id [tvl_volatility_30d (écart-type
+        quotidien des variations), max_drawdown_30d] ; NaN tant que le
+        bridge n'a qu'un point
+    """
+    known = state['n'] > 1
+    return pd.DataFrame({
+        'tvl_volatility_30d': np.sqrt(state['return_var']).where(known),
+        'max_drawdown_30d': state['max_drawdown'].where(known),
+    }, index=state.index)
+
+
+def get_rolling_stats(store: Optional[HistoryStore] = None) -> pd.DataFrame:
+    """
+    États glissants de tous les bridges (indexés par bridge_id), avec
+    tvl_std (écart-type de la TVL) et tvl_volatility (quotidienne)
+    """
+    state = (store or get_history_store()).read_bridge_table('bridge_rolling')
+    return state.assign(tvl_std=np.sqrt(state['tvl_var']), tvl_volatility=np.sqrt(state['return_var']))
@@ -0,0 +1,383 @@
+"""
+Scoring des bridges - méthodologie XRSK (5 piliers, 32 métriques)
+
+Les entrées sont une matrice (bridges × 32 métriques), NaN quand une
+métrique est inconnue. Chaque passe est vectorisée sur toutes les lignes :
+    1. normalisation 0-100 sur des bornes fixes (échelle log pour les
+       montants USD, sens inversé quand une valeur basse est meilleure) ;
+    2. score de pilier : moyenne pondérée des métriques connues du pilier
+       (un produit matriciel avec la matrice métriques × piliers) ;
+    3. score total : somme pondérée des piliers.
+
+Les pondérations sont versionnées (WEIGHT_CONFIGS) : un score publié
+reste reproductible avec la version de pondération qui l'a produit.
+
+À l'ingestion, rescore() ne recalcule que les piliers dont les entrées ont
+changé (empreinte par pilier et par bridge) et persiste la table complète
+des scores avec l'empreinte de ses entrées.
+
+Utilisation :
+    from backend.scoring import score_bridges
+    scores = score_bridges(snapshot.frame)
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.history import HistoryStore, get_history_store
+
+# Piliers de la méthodologie, dans l'ordre des colonnes de score
+PILLARS = ['security', 'liquidity', 'governance', 'operational', 'regulatory']
+
+PILLAR_LABELS = {
+    'security': 'Sécurité',
+    'liquidity': 'Liquidité',
+    'governance': 'Gouvernance',
+    'operational': 'Opérationnel',
+    'regulatory': 'Réglementaire',
+}
+
+# Piliers sans lesquels le score total n'est pas calculé (les autres
+# piliers inconnus comptent pour 0). Tant qu'aucun collecteur ne fournit
+# les métriques de sécurité, le score total reste inconnu (NaN / None).
+REQUIRED_PILLARS = ('security', 'liquidity')
+
+
+@dataclass(frozen=True)
+class Metric:
+    """Métrique de la méthodologie et ses bornes de normalisation"""
+    key: str
+    pillar: str
+    label: str
+    lower: float                    # valeur notée 0 (100 si higher_is_better=False)
+    upper: float                    # valeur notée 100 (0 si higher_is_better=False)
+    higher_is_better: bool = True
+    log: bool = False               # bornes et valeurs en log10 (montants USD)
+    # Définition et bornes de travail, pas encore validées par la publication
+    provisional: bool = True
+
+
+# Métriques de la méthodologie - toutes provisoires (provisional=True) tant
+# que la publication n'a pas fixé définitions et bornes
+METRICS: List[Metric] = [
+    # Sécurité
+    Metric('audit_count', 'security', "Nombre d'audits publiés", 0, 5),
+    Metric('months_since_audit', 'security', 'Mois depuis le dernier audit', 0, 24, higher_is_better=False),
+    Metric('bug_bounty_usd', 'security', 'Bug bounty maximum (USD)', 1e4, 1e7, log=True),
+    Metric('exploit_count', 'security', 'Exploits historiques', 0, 3, higher_is_better=False),
+    Metric('exploit_loss_usd', 'security', 'Pertes cumulées (USD)', 1e5, 1e9, higher_is_better=False, log=True),
+    Metric('validator_count', 'security', 'Validateurs / signataires', 1, 100, log=True),
+    Metric('validator_threshold', 'security', 'Seuil de signature (fraction)', 0.5, 0.9),
+    Metric('verification_type', 'security', 'Vérification (0 externe, 1 optimiste, 2 light client / ZK)', 0, 2),
+    Metric('code_age_days', 'security', 'Ancienneté du code en production (jours)', 0, 1095),
+    # Liquidité
+    Metric('tvl', 'liquidity', 'TVL (USD)', 1e6, 1e10, log=True),
+    Metric('volume_24h', 'liquidity', 'Volume 24h (USD)', 1e5, 1e9, log=True),
+    Metric('volume_7d', 'liquidity', 'Volume 7j (USD)', 1e6, 1e10, log=True),
+    Metric('turnover_7d', 'liquidity', 'Rotation (volume quotidien moyen / TVL)', 0, 0.5),
+    Metric('tvl_volatility_30d', 'liquidity', 'Volatilité TVL 30j (écart-type des variations)', 0, 0.1,
+           higher_is_better=False),
+    Metric('max_drawdown_30d', 'liquidity', 'Drawdown TVL maximum 30j', 0, 0.5, higher_is_better=False),
+    Metric('chains_count', 'liquidity', 'Chaînes desservies', 1, 20),
+    # Gouvernance
+    Metric('admin_signers', 'governance', "Signataires des clés d'administration", 1, 10),
+    Metric('timelock_hours', 'governance', 'Timelock des mises à jour (heures)', 0, 72),
+    Metric('upgradeable', 'governance', 'Contrats modifiables (0/1)', 0, 1, higher_is_better=False),
+    Metric('governance_token', 'governance', 'Gouvernance on-chain (0/1)', 0, 1),
+    Metric('open_source', 'governance', 'Code source public (0/1)', 0, 1),
+    Metric('team_public', 'governance', 'Équipe identifiée (0/1)', 0, 1),
+    # Opérationnel
+    Metric('uptime_30d', 'operational', 'Disponibilité 30j', 0.95, 1),
+    Metric('median_latency_min', 'operational', 'Latence médiane de transfert (minutes)', 1, 60,
+           higher_is_better=False),
+    Metric('incident_count_12m', 'operational', 'Pauses / incidents 12 mois', 0, 5, higher_is_better=False),
+    Metric('fee_bps', 'operational', 'Frais (points de base)', 0, 50, higher_is_better=False),
+    Metric('supported_tokens', 'operational', 'Tokens supportés', 1, 500, log=True),
+    Metric('public_monitoring', 'operational', 'Supervision publique / page de statut (0/1)', 0, 1),
+    # Réglementaire
+    Metric('eu_entity', 'regulatory', 'Entité juridique UE (0/1)', 0, 1),
+    Metric('kyc_aml_controls', 'regulatory', 'Contrôles KYC/AML (0 aucun, 1 partiels, 2 complets)', 0, 2),
+    Metric('sanctions_screening', 'regulatory', 'Filtrage des sanctions (0/1)', 0, 1),
+    Metric('dora_incident_reporting', 'regulatory', 'Déclaration des incidents DORA (0/1)', 0, 1),
+]
+
+METRIC_KEYS = [m.key for m in METRICS]
+
+# Métriques calculées depuis un snapshot /bridges (voir build_inputs)
+SNAPSHOT_METRICS = ['tvl', 'volume_24h', 'volume_7d', 'turnover_7d', 'chains_count']
+
+# Métriques alimentées par les données collectées : snapshot et
+# statistiques glissantes (backend.rolling.liquidity_inputs) ; les autres
+# restent inconnues faute de collecteur
+# HOOK: Ajouter ici les métriques d'un nouveau collecteur
+COLLECTED_METRICS = SNAPSHOT_METRICS + ['tvl_volatility_30d', 'max_drawdown_30d']
+
+# Bornes de normalisation en colonnes (une valeur par métrique)
+_LOG = np.array([m.log for m in METRICS])
+_LOWER = np.array([np.log10(m.lower) if m.log else m.lower for m in METRICS], dtype='float64')
+_UPPER = np.array([np.log10(m.upper) if m.log else m.upper for m in METRICS], dtype='float64')
+_HIGHER = np.array([m.higher_is_better for m in METRICS])
+_PILLAR_OF = np.array([PILLARS.index(m.pillar) for m in METRICS])
+
+
+@dataclass(frozen=True)
+class WeightConfig:
+    """Pondérations versionnées : piliers et poids relatifs des métriques dans leur pilier"""
+    version: str
+    pillars: Dict[str, float]
+    metrics: Dict[str, float] = field(default_factory=dict)  # défaut 1 par métrique
+    note: str = ''
+
+    def pillar_vector(self) -> np.ndarray:
+        """Poids des piliers (ordre PILLARS)"""
+        return np.array([self.pillars[p] for p in PILLARS], dtype='float64')
+
+    def metric_matrix(self) -> np.ndarray:
+        """Matrice métriques × piliers : poids relatif de chaque métrique dans son pilier"""
+        matrix = np.zeros((len(METRICS), len(PILLARS)))
+        matrix[np.arange(len(METRICS)), _PILLAR_OF] = [self.metrics.get(key, 1.0) for key in METRIC_KEYS]
+        return matrix
+
+
+# Versions de pondération publiées
+# HOOK: Ajouter ici les nouvelles versions (ne jamais modifier une version publiée)
+WEIGHT_CONFIGS: Dict[str, WeightConfig] = {
+    '2025.1': WeightConfig(
+        version='2025.1',
+        pillars={'security': 0.35, 'liquidity': 0.25, 'governance': 0.20, 'operational': 0.15, 'regulatory': 0.05},
+        note='Framework for Cross-Chain Bridge Risk Assessment under MiCA & DORA',
+    ),
+}
+
+# Version utilisée par défaut
+CURRENT_WEIGHTS = '2025.1'
+
+
+def get_weights(version: Optional[str] = None) -> WeightConfig:
+    """Pondérations d'une version (défaut CURRENT_WEIGHTS)"""
+    version = version or CURRENT_WEIGHTS
+    if version not in WEIGHT_CONFIGS:
+        raise ValueError(f"Pondérations inconnues: {version}. Disponibles: {list(WEIGHT_CONFIGS)}")
+    return WEIGHT_CONFIGS[version]
+
+
+def normalize(values: np.ndarray, columns: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Entrées brutes [n, 32] -> notes 0-100 sur les bornes fixes (NaN conservés)
+
+    Args:
+        columns: Indices des métriques de `values` si elle n'en contient
+            qu'une partie (défaut : les 32)
+    """
+    values = np.asarray(values, dtype='float64')
+    columns = np.arange(len(METRICS)) if columns is None else columns
+    log, lower, upper, higher = _LOG[columns], _LOWER[columns], _UPPER[columns], _HIGHER[columns]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scaled = np.where(log, np.log10(np.maximum(values, 1e-12)), values)
+        notes = np.clip((scaled - lower) / (upper - lower), 0.0, 1.0)
+    notes = np.where(higher, notes, 1.0 - notes) * 100
+    return np.where(np.isnan(values), np.nan, notes)
+
+
+def pillar_scores(notes: np.ndarray, weights: WeightConfig) -> np.ndarray:
+    """
+    Notes [n, 32] -> scores de pilier [n, 5] : moyenne pondérée des
+    métriques connues (NaN si aucune métrique du pilier n'est connue)
+    """
+    matrix = weights.metric_matrix()
+    known = ~np.isnan(notes)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (np.where(known, notes, 0.0) @ matrix) / (known @ matrix)
+
+
+def total_scores(pillars: np.ndarray, weights: WeightConfig) -> np.ndarray:
+    """
+    Scores de pilier [n, 5] -> score total [n] (NaN si un pilier de
+    REQUIRED_PILLARS est inconnu, 0 pour les autres piliers inconnus)
+    """
+    required = [PILLARS.index(p) for p in REQUIRED_PILLARS]
+    totals = np.nan_to_num(pillars, nan=0.0) @ weights.pillar_vector()
+    return np.where(np.isnan(pillars[:, required]).any(axis=1), np.nan, totals)
+
+
+def score_matrix(values: np.ndarray, version: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Score complet d'une matrice d'entrées [n, 32] (colonnes METRIC_KEYS)
+
+    Returns:
+        (notes [n, 32], piliers [n, 5], total [n])
+    """
+    weights = get_weights(version)
+    notes = normalize(values)
+    pillars = pillar_scores(notes, weights)
+    return notes, pillars, total_scores(pillars, weights)
+
+
+def build_inputs(frame: pd.DataFrame, extra: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Matrice d'entrées depuis un DataFrame bridges
+
+    Args:
+        frame: DataFrame bridges (colonnes formatting.BRIDGE_DTYPES) ou
+            historique (tvl, volume_24h, volume_7d, chains_count)
+        extra: Métriques hors snapshot (audits, gouvernance...), colonnes
+            parmi METRIC_KEYS, alignées sur l'index de frame
+
+    Returns:
+        DataFrame [METRIC_KEYS] en float64, même index que frame
+    """
+    inputs = pd.DataFrame(np.nan, index=frame.index, columns=METRIC_KEYS)
+    for key in ('tvl', 'volume_24h', 'volume_7d', 'chains_count'):
+        if key in frame:
+            inputs[key] = frame[key].astype('float64')
+    if 'volume_7d' in frame and 'tvl' in frame:
+        tvl = frame['tvl'].astype('float64')
+        inputs['turnover_7d'] = (frame['volume_7d'].astype('float64') / 7 / tvl).where(tvl > 0)
+    if extra is not None:
+        known = [c for c in extra.columns if c in inputs.columns]
+        inputs.update(extra[known].astype('float64'))
+    return inputs
+
+
+def score_bridges(
+    frame: pd.DataFrame,
+    extra: Optional[pd.DataFrame] = None,
+    version: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Scores de tous les bridges d'un DataFrame (une passe vectorisée)
+
+    Args:
+        frame: DataFrame bridges ou lignes bridge × snapshot
+        extra: Métriques hors snapshot (voir build_inputs)
+        version: Version de pondération (défaut CURRENT_WEIGHTS)
+
+    Returns:
+        DataFrame aligné sur frame : {pillar}_score (0-100), total_score ;
+        attrs['weights_version']
+    """
+    inputs = build_inputs(frame, extra)
+    _, pillars, totals = score_matrix(inputs.to_numpy(), version)
+    scores = pd.DataFrame(pillars, index=frame.index, columns=[f"{p}_score" for p in PILLARS])
+    scores['total_score'] = totals
+    scores.attrs['weights_version'] = get_weights(version).version
+    return scores
+
+
+def _hash_rows(inputs: pd.DataFrame) -> np.ndarray:
+    """Empreinte 64 bits de chaque ligne d'entrées"""
+    return pd.util.hash_pandas_object(inputs, index=False).to_numpy().view('int64')
+
+
+def rescore(
+    frame: pd.DataFrame,
+    extra: Optional[pd.DataFrame] = None,
+    version: Optional[str] = None,
+    store: Optional[HistoryStore] = None,
+) -> pd.DataFrame:
+    """
+    Recalcul incrémental de la table des scores persistée
+
+    Une empreinte des entrées de chaque pilier est gardée par bridge : seuls
+    les piliers dont les entrées ont changé depuis le dernier passage
+    (liquidité à chaque snapshot, gouvernance ou réglementaire rarement)
+    sont recalculés, puis le total des bridges concernés. Un changement de
+    version de pondération recalcule tout.
+
+    Args:
+        frame: DataFrame bridges (colonnes formatting.BRIDGE_DTYPES)
+        extra: Métriques hors snapshot (voir build_inputs), indexées comme frame
+        version: Version de pondération (défaut CURRENT_WEIGHTS)
+        store: Store historique (défaut : store partagé)
+
+    Returns:
+        Table des scores complète, indexée par bridge_id : {pillar}_score,
+        total_score, weights_version, input_hash ; attrs['rescored'] :
+        {pillar: bridges recalculés}
+    """
+    store = store or get_history_store()
+    weights = get_weights(version)
+    inputs = build_inputs(frame, extra)
+    inputs.index = frame['id'].astype('int64').to_numpy()
+    inputs = inputs[~inputs.index.duplicated(keep='last')].rename_axis('bridge_id')
+    values = inputs.to_numpy()
+
+    previous = store.read_bridge_table('bridge_scores').reindex(inputs.index)
+    outdated = (previous['weights_version'] != weights.version).to_numpy()
+    table = pd.DataFrame(index=inputs.index)
+    changed = np.zeros((len(inputs), len(PILLARS)), dtype=bool)
+    matrix = weights.metric_matrix()
+
+    for j, pillar in enumerate(PILLARS):
+        columns = np.flatnonzero(_PILLAR_OF == j)
+        digest = _hash_rows(inputs.iloc[:, columns])
+        known = previous[f"{pillar}_hash"].notna().to_numpy()
+        rows = outdated | ~known | (previous[f"{pillar}_hash"].to_numpy(dtype='int64', na_value=0) != digest)
+        changed[:, j] = rows
+
+        score = previous[f"{pillar}_score"].to_numpy(dtype='float64', na_value=np.nan, copy=True)
+        if rows.any():
+            notes = normalize(values[rows][:, columns], columns)
+            known_notes = ~np.isnan(notes)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                score[rows] = (np.where(known_notes, notes, 0.0) @ matrix[columns, j]) / (known_notes @ matrix[columns, j])
+        table[f"{pillar}_hash"] = digest
+        table[f"{pillar}_score"] = score
+
+    rows = changed.any(axis=1)
+    total = previous['total_score'].to_numpy(dtype='float64', na_value=np.nan, copy=True)
+    total[rows] = total_scores(table[[f"{p}_score" for p in PILLARS]].to_numpy()[rows], weights)
+    table['total_score'] = total
+    table['weights_version'] = weights.version
+    table['input_hash'] = _hash_rows(inputs)
+    table['updated_at'] = np.where(rows, int(time.time()), previous['updated_at'].to_numpy(dtype='float64', na_value=0))
+    table['updated_at'] = table['updated_at'].astype('int64')
+
+    store.write_bridge_table('bridge_scores', table[rows], keep=inputs.index)
+    result = table[['weights_version', 'input_hash', *(f"{p}_score" for p in PILLARS), 'total_score']]
+    result.attrs['rescored'] = dict(zip(PILLARS, changed.sum(axis=0).tolist()))
+    return result
+
+
+def get_scores() -> pd.DataFrame:
+    """Dernière table des scores persistée (indexée par bridge_id)"""
+    scores = get_history_store().read_bridge_table('bridge_scores')
+    return scores[['weights_version', 'input_hash', *(f"{p}_score" for p in PILLARS), 'total_score', 'updated_at']]
+
+
+def total_score(pillars: Dict[str, Optional[float]], version: Optional[str] = None) -> Optional[float]:
+    """Score total d'un seul bridge depuis ses scores de pilier {pillar: score}"""
+    row = np.array([[np.nan if pillars.get(p) is None else pillars[p] for p in PILLARS]], dtype='float64')
+    total = total_scores(row, get_weights(version))[0]
+    return None if np.isnan(total) else float(total)
+
+
+def methodology(version: Optional[str] = None) -> pd.DataFrame:
+    """
+    Tableau de la méthodologie : pilier, poids, métrique, bornes, sens,
+    statut (provisional, collected : alimentée par les données collectées)
+    """
+    weights = get_weights(version)
+    matrix = weights.metric_matrix()
+    share = matrix.sum(axis=1) / matrix.sum(axis=0)[_PILLAR_OF]
+    return pd.DataFrame({
+        'pillar': [PILLAR_LABELS[m.pillar] for m in METRICS],
+        'pillar_weight': [weights.pillars[m.pillar] for m in METRICS],
+        'metric': METRIC_KEYS,
+        'label': [m.label for m in METRICS],
+        'weight': share * np.array([weights.pillars[m.pillar] for m in METRICS]),
+        'lower': [m.lower for m in METRICS],
+        'upper': [m.upper for m in METRICS],
+        'higher_is_better': [m.higher_is_better for m in METRICS],
+        'provisional': [m.provisional for m in METRICS],
+        'collected': [m.key in COLLECTED_METRICS for m in METRICS],
+    })
+
+
+def pillar_metrics(pillar: str) -> Sequence[str]:
+    """Métriques d'un pilier"""
+    return [m.key for m in METRICS if m.pillar == pillar]
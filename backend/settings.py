@@ -0,0 +1,49 @@
+"""
+Configuration backend XRSK Platform
+
+Chemins de stockage local et rétention de l'historique, surchargeables
+par variables d'environnement.
+"""
+
+import os
+from pathlib import Path
+from typing import Optional
+
+# Racine du projet (dossier contenant Home.py)
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+# Données locales (cache, historique) - XRSK_DATA_DIR pour surcharger
+DATA_DIR = Path(os.environ.get('XRSK_DATA_DIR', PROJECT_DIR / 'data'))
+
+# Cache disque des réponses brutes des collecteurs
+CACHE_DIR = Path(os.environ.get('XRSK_CACHE_DIR', DATA_DIR / 'cache'))
+
+# API DefiLlama bridges - XRSK_DEFILLAMA_URL pour pointer vers un serveur
+# local (python -m backend.llama_standin) en benchmark / test de charge
+DEFILLAMA_BASE_URL = os.environ.get('XRSK_DEFILLAMA_URL', 'https://bridges.llama.fi').rstrip('/')
+
+# Historique des snapshots bridges (SQLite)
+HISTORY_DB = Path(os.environ.get('XRSK_HISTORY_DB', DATA_DIR / 'history.sqlite'))
+
+# Snapshot courant et segments d'historique en colonnes mappées (memmap)
+COLUMNAR_DIR = Path(os.environ.get('XRSK_COLUMNAR_DIR', DATA_DIR / 'columnar'))
+
+
+def _days(name: str, default: Optional[int]) -> Optional[int]:
+    """Durée en jours depuis l'environnement ('' ou 0 = illimitée)"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    days = int(value) if value.strip() else 0
+    return days or None
+
+
+# Rétention de l'historique par résolution (jours, None = illimitée) :
+# snapshots bruts 7 jours, agrégats horaires 90 jours, quotidiens et
+# hebdomadaires sans limite
+HISTORY_RETENTION_DAYS = {
+    'raw': _days('XRSK_RETENTION_RAW_DAYS', 7),
+    '1h': _days('XRSK_RETENTION_HOURLY_DAYS', 90),
+    '1d': _days('XRSK_RETENTION_DAILY_DAYS', None),
+    '1w': _days('XRSK_RETENTION_WEEKLY_DAYS', None),
+}
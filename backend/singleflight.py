@@ -0,0 +1,73 @@
+"""
+Single-flight - Regroupement des appels concurrents identiques
+
+Quand plusieurs threads demandent la même ressource au même moment, un
+seul exécute l'appel ; les autres attendent et reçoivent son résultat
+(ou son exception).
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Garde single-flight, sûre entre threads d'un même processus
+
+    Utilisation :
+        flights = SingleFlight()
+        data = flights.do(('GET', url), lambda: fetch(url))
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Exécute fn() une seule fois pour tous les appelants concurrents de key
+
+        Args:
+            key: Clé de regroupement (endpoint + paramètres)
+            fn: Appel à exécuter
+
+        Returns:
+            Résultat de fn() - l'exception de fn() est relevée chez chaque appelant
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def in_flight(self) -> int:
+        """Nombre d'appels en cours"""
+        with self._lock:
+            return len(self._calls)
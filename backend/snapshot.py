@@ -0,0 +1,304 @@
+"""
+Snapshot partagé des bridges - couche d'accès aux données
+
+Toutes les pages lisent le même snapshot /bridges : un seul téléchargement
+par fenêtre TTL et par processus, quel que soit le nombre de pages visitées.
+La dernière réponse valide est aussi conservée sur disque (backend.cache)
+pour servir immédiatement après un redémarrage.
+
+Chaque version est publiée en colonnes mappées en mémoire
+(backend.columnar) : les workers du serveur partagent une seule copie des
+données, et un worker adopte la version publiée par un autre sans
+retélécharger.
+
+Chaque nouvelle version est ensuite ingérée (historique, statistiques,
+scores : backend.pipeline) par un thread dédié, dans l'ordre de
+publication : la requête qui a déclenché le téléchargement n'attend pas
+l'ingestion.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+from backend.cache import DiskCache
+from backend.columnar import get_columnar_snapshots
+from backend.collectors.decode import BridgeColumns
+from backend.collectors.defillama import DefiLlamaCollector
+from backend.pipeline import ingest_snapshot
+
+# Durée de vie du snapshot (secondes) - même fenêtre que l'ancien st.cache_data
+SNAPSHOT_TTL = 300
+
+# Au-delà du TTL, le snapshot reste servi pendant cette fenêtre (secondes)
+# le temps qu'un rafraîchissement en arrière-plan aboutisse
+SNAPSHOT_STALE_TTL = 24 * 3600
+
+
+@dataclass(frozen=True)
+class BridgeSnapshot:
+    """Snapshot immuable des bridges, partagé par toutes les pages"""
+    _frame: pd.DataFrame
+    version: str
+    fetched_at: datetime
+    # True si le snapshot a dépassé son TTL (source indisponible ou
+    # rafraîchissement en cours) : dernier état valide connu
+    stale: bool = False
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """
+        DataFrame des bridges
+
+        Copie superficielle : les colonnes ajoutées par une page ne
+        modifient pas le snapshot partagé.
+        """
+        return self._frame.copy(deep=False)
+
+    @property
+    def empty(self) -> bool:
+        return self._frame.empty
+
+    def __len__(self) -> int:
+        return len(self._frame)
+
+
+_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+_collector: Optional[DefiLlamaCollector] = None
+_snapshot: Optional[BridgeSnapshot] = None
+_fresh_until = 0.0
+_stale_until = 0.0
+_refreshing = False
+_ingest_queue: 'queue.Queue[BridgeSnapshot]' = queue.Queue()
+_ingest_worker: Optional[threading.Thread] = None
+
+
+def _empty_snapshot() -> BridgeSnapshot:
+    return BridgeSnapshot(pd.DataFrame(), version='', fetched_at=datetime.now())
+
+
+def _build_snapshot(columns: BridgeColumns, fetched_at: datetime) -> BridgeSnapshot:
+    # Version des données : empreinte du contenu, identique pour deux
+    # téléchargements identiques
+    version = columns.fingerprint()
+
+    # Publication en colonnes mappées, partagées avec les autres workers ;
+    # DataFrame privé en mémoire si le disque n'est pas disponible
+    try:
+        store = get_columnar_snapshots()
+        store.publish(columns, version, fetched_at)
+        mapped = store.open(version)
+        if mapped is not None:
+            return BridgeSnapshot(mapped[0], version=version, fetched_at=fetched_at)
+    except OSError as e:
+        print(f"⚠️ Snapshot colonnes non publié: {e}")
+    return BridgeSnapshot(columns.to_frame(fetched_at), version=version, fetched_at=fetched_at)
+
+
+def _open_shared(current: Optional[BridgeSnapshot]) -> Optional[BridgeSnapshot]:
+    """Dernière version publiée par un worker (colonnes mappées), si plus récente"""
+    store = get_columnar_snapshots()
+    info = store.current()
+    if not info or (current is not None and (info['version'] == current.version
+                                             or info['fetched_at'] <= current.fetched_at.timestamp())):
+        return None
+    mapped = store.open(info['version'])
+    if mapped is None:
+        return None
+    return BridgeSnapshot(mapped[0], version=info['version'], fetched_at=datetime.fromtimestamp(info['fetched_at']))
+
+
+def _get_collector() -> DefiLlamaCollector:
+    global _collector
+    if _collector is None:
+        _collector = DefiLlamaCollector(cache=DiskCache(ttl=SNAPSHOT_TTL, stale_ttl=SNAPSHOT_STALE_TTL))
+    return _collector
+
+
+def _fetch_snapshot(collector: DefiLlamaCollector, current: Optional[BridgeSnapshot]) -> Optional[BridgeSnapshot]:
+    fetched = collector.fetch_bridge_columns()
+    if not fetched or not fetched[0]:
+        return None
+    columns, not_modified = fetched
+
+    # 304 Not Modified : le snapshot courant reste valide, pas de reconstruction
+    if not_modified and current is not None:
+        return current
+
+    return _build_snapshot(columns, datetime.now())
+
+
+def _publish(snapshot: BridgeSnapshot, age: float, ttl: int):
+    """Installe un snapshot (appelé avec _lock)"""
+    global _snapshot, _fresh_until, _stale_until
+    if _snapshot is None or snapshot.version != _snapshot.version:
+        _snapshot = snapshot
+    now = time.monotonic()
+    _fresh_until = now + ttl - age
+    _stale_until = now + ttl + SNAPSHOT_STALE_TTL - age
+
+
+def _refresh(ttl: int) -> Optional[BridgeSnapshot]:
+    """Télécharge /bridges et publie le résultat ; un seul appel à la fois"""
+    with _refresh_lock:
+        with _lock:
+            current = _snapshot
+            if current is not None and time.monotonic() < _fresh_until:
+                return current  # rafraîchi par un autre thread pendant l'attente
+
+        # Version encore fraîche publiée par un autre worker : pas de téléchargement
+        shared = _open_shared(current)
+        if shared is not None:
+            age = time.time() - shared.fetched_at.timestamp()
+            if age < ttl:
+                with _lock:
+                    _publish(shared, age, ttl)
+                    return _snapshot
+
+        fresh = _fetch_snapshot(_get_collector(), current)
+
+        with _lock:
+            if fresh is not None:
+                _publish(fresh, 0.0, ttl)
+            published = _snapshot
+
+        # Nouvelle version téléchargée : historique et traitements d'ingestion
+        # en arrière-plan, le snapshot publié est servi immédiatement
+        if fresh is not None and fresh is not current and (current is None or fresh.version != current.version):
+            _ingest_in_background(fresh)
+        return published
+
+
+def _ingest_loop():
+    """Ingère les snapshots publiés, un à la fois et dans l'ordre"""
+    while True:
+        snapshot = _ingest_queue.get()
+        try:
+            ingest_snapshot(snapshot)
+        except Exception as e:
+            print(f"❌ Ingestion {snapshot.version}: {type(e).__name__} {e}")
+        finally:
+            _ingest_queue.task_done()
+
+
+def _ingest_in_background(snapshot: BridgeSnapshot):
+    """Confie un nouveau snapshot au thread d'ingestion (démarré au besoin)"""
+    global _ingest_worker
+    with _lock:
+        _ingest_queue.put(snapshot)
+        if _ingest_worker is None or not _ingest_worker.is_alive():
+            _ingest_worker = threading.Thread(target=_ingest_loop, name='xrsk-ingest', daemon=True)
+            _ingest_worker.start()
+
+
+def wait_for_ingestion():
+    """Attend la fin des ingestions en cours (scripts, arrêt propre)"""
+    _ingest_queue.join()
+
+
+def _refresh_in_background(ttl: int):
+    """Lance un rafraîchissement en arrière-plan s'il n'y en a pas déjà un"""
+    global _refreshing
+    with _lock:
+        if _refreshing:
+            return
+        _refreshing = True
+
+    def run():
+        global _refreshing
+        try:
+            _refresh(ttl)
+        finally:
+            with _lock:
+                _refreshing = False
+
+    threading.Thread(target=run, name='xrsk-snapshot-refresh', daemon=True).start()
+
+
+def _load_from_disk(ttl: int, allow_expired: bool = False) -> Optional[BridgeSnapshot]:
+    """
+    Démarrage à froid : dernière version publiée en colonnes mappées,
+    à défaut dernier /bridges connu depuis le cache disque
+    """
+    with _refresh_lock:
+        snapshot = _open_shared(None)
+        age = time.time() - snapshot.fetched_at.timestamp() if snapshot is not None else None
+        if snapshot is None or (not allow_expired and age > ttl + SNAPSHOT_STALE_TTL):
+            cached = _get_collector().get_cached_bridge_columns(allow_expired=allow_expired)
+            if not cached or not cached[0]:
+                return None
+            columns, entry = cached
+            snapshot, age = _build_snapshot(columns, datetime.fromtimestamp(entry.stored_at)), entry.age
+
+    with _lock:
+        if _snapshot is None:
+            _publish(snapshot, age, ttl)
+        snapshot = _snapshot
+    print(f"✓ Snapshot bridges chargé depuis le disque ({age:.0f}s)")
+    return snapshot
+
+
+def _mark(snapshot: BridgeSnapshot) -> BridgeSnapshot:
+    """Marque le snapshot périmé s'il a dépassé son TTL"""
+    with _lock:
+        stale = time.monotonic() >= _fresh_until
+    return replace(snapshot, stale=True) if stale else snapshot
+
+
+def get_bridge_snapshot(ttl: int = SNAPSHOT_TTL) -> BridgeSnapshot:
+    """
+    Retourne le snapshot courant des bridges
+
+    - Snapshot frais : retourné directement.
+    - Snapshot périmé (fenêtre stale-while-revalidate) : retourné
+      immédiatement, un rafraîchissement est lancé en arrière-plan.
+    - Démarrage à froid : dernier /bridges du cache disque s'il existe,
+      sinon téléchargement synchrone.
+    - Source indisponible (erreur, circuit ouvert) : dernier snapshot
+      valide connu, en mémoire ou sur disque.
+
+    Les appels concurrents partagent un seul téléchargement. Tout snapshot
+    au-delà de son TTL est retourné avec stale=True.
+
+    Args:
+        ttl: Durée de validité du snapshot en secondes
+
+    Returns:
+        BridgeSnapshot (vide si aucune donnée n'a jamais pu être chargée)
+    """
+    with _lock:
+        snapshot = _snapshot
+        now = time.monotonic()
+        if snapshot is not None and now < _fresh_until:
+            return snapshot
+        stale_usable = snapshot is not None and now < _stale_until
+
+    if stale_usable:
+        _refresh_in_background(ttl)
+        return _mark(snapshot)
+
+    if snapshot is None:
+        snapshot = _load_from_disk(ttl)
+        if snapshot is not None:
+            snapshot = _mark(snapshot)
+            if snapshot.stale:
+                _refresh_in_background(ttl)
+            return snapshot
+
+    snapshot = _refresh(ttl)
+    if snapshot is None:
+        snapshot = _load_from_disk(ttl, allow_expired=True)
+    return _mark(snapshot) if snapshot is not None else _empty_snapshot()
+
+
+def invalidate_snapshot():
+    """Force le rechargement au prochain appel"""
+    global _fresh_until
+    with _lock:
+        _fresh_until = 0.0
@@ -0,0 +1,184 @@
+"""
+Séries temporelles des bridges - point d'accès unique à l'historique
+
+get_history retourne une matrice alignée (temps × bridge) lue dans le
+store historique (snapshots bruts des jours terminés : segments colonnes
+mappés), à la résolution qui tient dans le budget de points
+(snapshots bruts ou agrégats 1h / 1j / 1sem). Les résultats sont gardés
+dans un cache LRU indexé par la version des données : toute écriture
+dans l'historique invalide le cache, sans TTL.
+
+Utilisation :
+    from backend.timeseries import get_history
+    tvl = get_history([1, 2, 3], start=datetime.now() - timedelta(days=30), max_points=300)
+    arbitrum = get_chain_history(['Arbitrum'], start=datetime.now() - timedelta(days=90))
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from backend.columnar import read_history
+from backend.history import DAY, Timestamp, day_epoch, get_history_store, to_epoch
+
+# Budget de points par bridge si ni résolution ni budget ne sont donnés
+DEFAULT_MAX_POINTS = 500
+
+# Nombre de résultats gardés en cache
+CACHE_SIZE = 64
+
+# Volume quotidien chargé par le backfill (dépôts + retraits, /bridgevolume)
+DAILY_VOLUME = 'volume_daily'
+
+_cache: 'OrderedDict[Tuple, pd.DataFrame]' = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_key(bridge_ids, start, end, resolution, max_points, metric, stat) -> Tuple:
+    ids = tuple(sorted(int(i) for i in bridge_ids)) if bridge_ids is not None else None
+    bounds = tuple(to_epoch(v) if v is not None else None for v in (start, end))
+    return ids, bounds, resolution, max_points, metric, stat
+
+
+def _daily_volume(bridge_ids, start, end, resolution: str) -> pd.DataFrame:
+    """Volume quotidien du backfill, sommé par semaine en résolution 1w"""
+    store = get_history_store()
+    daily = store.read_daily(bridge_ids, start, end)
+    frame = pd.DataFrame({
+        'ts': daily['day'],
+        'bridge_id': daily['bridge_id'],
+        DAILY_VOLUME: daily['deposit_usd'] + daily['withdraw_usd'],
+    })
+    if resolution == '1w':
+        frame = (frame.groupby(['bridge_id', pd.Grouper(key='ts', freq='W-MON', label='left', closed='left')])
+                 [DAILY_VOLUME].sum().reset_index())
+    return frame
+
+
+def _query(bridge_ids, start, end, resolution, max_points, metric, stat) -> pd.DataFrame:
+    store = get_history_store()
+
+    if metric == DAILY_VOLUME:
+        if resolution not in (None, '1d', '1w'):
+            raise ValueError(f"{DAILY_VOLUME}: résolution '1d' ou '1w' uniquement")
+        if resolution is None:
+            # Plage ouverte à droite : jusqu'à aujourd'hui
+            last = end if end is not None else int(time.time())
+            days = (day_epoch(last) - day_epoch(start)) // DAY + 1 if start is not None else None
+            resolution = '1w' if days and max_points and days > max_points else '1d'
+        long = _daily_volume(bridge_ids, start, end, resolution)
+    else:
+        if resolution is None and max_points is None:
+            max_points = DEFAULT_MAX_POINTS
+        if resolution is None:
+            resolution = store.choose_resolution(start, end, max_points)
+        if resolution == 'raw':
+            # Jours terminés lus dans les segments colonnes mappés
+            long = read_history(bridge_ids, start, end, columns=[metric])
+        else:
+            long = store.query_range(bridge_ids, start, end, metrics=[metric], resolution=resolution, stat=stat)
+
+    matrix = long.pivot(index='ts', columns='bridge_id', values=metric).sort_index()
+    matrix.columns.name = 'bridge_id'
+    matrix.attrs.update(resolution=resolution, metric=metric, stat=stat)
+    return matrix
+
+
+def get_history(
+    bridge_ids: Optional[Sequence[int]] = None,
+    start: Optional[Timestamp] = None,
+    end: Optional[Timestamp] = None,
+    resolution: Optional[str] = None,
+    max_points: Optional[int] = None,
+    metric: str = 'tvl',
+    stat: str = 'last',
+) -> pd.DataFrame:
+    """
+    Historique d'une métrique, matrice temps × bridge
+
+    Args:
+        bridge_ids: Bridges (tous si None)
+        start: Début inclus (None = depuis l'origine)
+        end: Fin incluse (None = jusqu'au dernier point)
+        resolution: 'raw', '1h', '1d' ou '1w' (défaut : selon max_points)
+        max_points: Nombre maximum de points par bridge
+            (défaut DEFAULT_MAX_POINTS si resolution n'est pas donnée)
+        metric: 'tvl', 'volume_24h' (agrégats disponibles), 'volume_7d',
+            'volume_30d' (résolution 'raw'), ou 'volume_daily' (backfill)
+        stat: Statistique par intervalle hors 'raw' (last, mean, min, max, sum)
+
+    Returns:
+        DataFrame indexé par le temps, une colonne par bridge_id (NaN si le
+        bridge est absent) ; attrs : resolution, metric, stat.
+        Partagé par le cache : ne pas modifier en place.
+    """
+    key = _cache_key(bridge_ids, start, end, resolution, max_points, metric, stat)
+    return _cached(key, lambda: _query(bridge_ids, start, end, resolution, max_points, metric, stat))
+
+
+def get_chain_history(
+    chains: Optional[Sequence[str]] = None,
+    start: Optional[Timestamp] = None,
+    end: Optional[Timestamp] = None,
+    resolution: Optional[str] = None,
+    max_points: Optional[int] = None,
+    metric: str = 'tvl',
+) -> pd.DataFrame:
+    """
+    Exposition des bridges par chaîne, matrice temps × chaîne
+
+    Lue dans les séries par chaîne du store (index sur (chain, ts)) :
+    la somme sur les bridges qui desservent chaque chaîne.
+
+    Args:
+        chains: Chaînes (toutes si None), ex: ['Arbitrum']
+        start: Début inclus
+        end: Fin incluse
+        resolution: 'raw', '1h', '1d' ou '1w' (défaut : selon max_points)
+        max_points: Nombre maximum de points par chaîne
+        metric: 'tvl', 'volume_24h', 'volume_7d', 'volume_30d' ou 'bridges'
+
+    Returns:
+        DataFrame indexé par le temps, une colonne par chaîne ;
+        attrs : resolution, metric. Partagé par le cache : ne pas modifier.
+    """
+    key = ('chains', tuple(sorted(chains)) if chains is not None else None,
+           *_cache_key(None, start, end, resolution, max_points, metric, 'last')[1:])
+
+    def query():
+        store = get_history_store()
+        level = resolution or store.choose_resolution(start, end, max_points or DEFAULT_MAX_POINTS)
+        long = store.read_chain_history(chains, start, end, columns=[metric], resolution=level)
+        matrix = long.pivot(index='ts', columns='chain', values=metric).sort_index()
+        matrix.attrs.update(resolution=level, metric=metric)
+        return matrix
+
+    return _cached(key, query)
+
+
+def _cached(key: Tuple, compute: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """Résultat en cache LRU pour la version courante des données"""
+    key = (get_history_store().data_version(),) + key
+
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+
+    matrix = compute()
+
+    with _cache_lock:
+        _cache[key] = matrix
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return matrix
+
+
+def clear_history_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,136 @@
+"""
+Variations des bridges sur 1h / 24h / 7j / 30j
+
+Le snapshot courant est joint, pour chaque horizon, à l'état historique
+des bridges à (date du snapshot - horizon), lu dans le store historique :
+snapshot brut le plus proche (segment colonnes mappé pour un jour
+terminé), à défaut agrégat horaire puis quotidien.
+Tous les bridges sont calculés en une fois (colonnes), et le résultat est
+gardé en cache par version de snapshot.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.columnar import ColumnarHistory, get_columnar_history, read_snapshot
+from backend.history import DAY, ROLLUPS, HistoryStore, bucket_start, get_history_store, to_epoch
+
+# Horizons de variation (secondes)
+HORIZONS: Dict[str, int] = {'1h': 3600, '24h': DAY, '7d': 7 * DAY, '30d': 30 * DAY}
+
+# Métriques comparées
+VARIATION_METRICS = ['tvl', 'volume_24h']
+
+# Écart maximum entre la date visée et le point historique utilisé,
+# en fraction de l'horizon (10 % : point de 24h entre 21h36 et 24h)
+AS_OF_TOLERANCE = 0.1
+
+# Nombre de snapshots dont les variations restent en cache
+CACHE_SIZE = 8
+
+_cache: 'OrderedDict[Tuple, pd.DataFrame]' = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _as_of(store: HistoryStore, history: Optional[ColumnarHistory], when: int, tolerance: int,
+           metrics: Sequence[str]) -> pd.DataFrame:
+    """
+    Valeurs des bridges à une date, indexées par bridge_id
+
+    Snapshot brut à moins de `tolerance` secondes avant la date (segment
+    colonnes mappé si le jour est publié), sinon dernière valeur de
+    l'agrégat (1h puis 1j) contenant la date.
+    """
+    nearest = store.snapshot_before(when)
+    if nearest is not None and when - nearest <= tolerance:
+        if history is not None:
+            state = read_snapshot(nearest, columns=list(metrics), store=store, history=history)
+        else:
+            state = store.read_as_of(nearest, columns=list(metrics))
+        if not state.empty:
+            return state.set_index('bridge_id')[list(metrics)]
+
+    for resolution in ('1h', '1d'):
+        step = ROLLUPS[resolution]
+        if step > tolerance:
+            break
+        bucket = bucket_start(when, step)
+        rollup = store.read_rollup(resolution, start=bucket, end=bucket)
+        if not rollup.empty:
+            return rollup.set_index('bridge_id')[[f"{m}_last" for m in metrics]].set_axis(list(metrics), axis=1)
+
+    return pd.DataFrame(columns=list(metrics), index=pd.Index([], name='bridge_id'), dtype='float64')
+
+
+def compute_variations(
+    frame: pd.DataFrame,
+    fetched_at,
+    horizons: Optional[Dict[str, int]] = None,
+    metrics: Sequence[str] = VARIATION_METRICS,
+    store: Optional[HistoryStore] = None,
+) -> pd.DataFrame:
+    """
+    Variations absolues et relatives de chaque bridge
+
+    Args:
+        frame: DataFrame bridges courant (colonnes formatting.BRIDGE_DTYPES)
+        fetched_at: Date du snapshot
+        horizons: {nom: secondes} (défaut HORIZONS)
+        metrics: Colonnes comparées
+        store: Store historique (défaut : store partagé et ses segments
+            colonnes ; un store explicite est lu dans SQLite uniquement)
+
+    Returns:
+        DataFrame aligné sur `frame` (même index), colonnes
+        {metric}_delta_{horizon} (USD) et {metric}_pct_{horizon} (%).
+        NaN si pas d'historique à cet horizon ou valeur passée nulle.
+    """
+    history = get_columnar_history() if store is None else None
+    store = store or get_history_store()
+    horizons = horizons or HORIZONS
+    now = to_epoch(fetched_at)
+    ids = frame['id'].to_numpy()
+
+    columns = {}
+    for name, seconds in horizons.items():
+        past = _as_of(store, history, now - seconds, int(seconds * AS_OF_TOLERANCE), metrics).reindex(ids)
+        for metric in metrics:
+            current = frame[metric].to_numpy(dtype='float64')
+            before = past[metric].to_numpy(dtype='float64')
+            delta = current - before
+            with np.errstate(divide='ignore', invalid='ignore'):
+                pct = np.where(before > 0, delta / before * 100, np.nan)
+            columns[f"{metric}_delta_{name}"] = delta
+            columns[f"{metric}_pct_{name}"] = pct
+    return pd.DataFrame(columns, index=frame.index)
+
+
+def get_variations(snapshot) -> pd.DataFrame:
+    """
+    Variations du snapshot (voir compute_variations), en cache par version
+
+    Args:
+        snapshot: BridgeSnapshot
+
+    Returns:
+        DataFrame aligné sur snapshot.frame - partagé par le cache :
+        ne pas modifier en place (utiliser frame.join(...))
+    """
+    key = (snapshot.version, snapshot.fetched_at)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+
+    variations = compute_variations(snapshot.frame, snapshot.fetched_at)
+
+    with _cache_lock:
+        _cache[key] = variations
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return variations
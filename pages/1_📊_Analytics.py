@@ -12,7 +12,8 @@ XRSK Platform - Bridge Analytics
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from backend.collectors.defillama import DefiLlamaCollector
+from backend.snapshot import get_bridge_snapshot
+from backend.timeseries import get_chain_history, get_history
 
 st.set_page_config(page_title="Bridge Analytics - XRSK", page_icon="📊", layout="wide")
 
@@ -20,19 +21,17 @@ st.title("📊 Bridge Analytics")
 st.markdown("Analyse détaillée des bridges cross-chain")
 st.markdown("---")
 
-# Chargement données
-@st.cache_data(ttl=300)
-def load_data():
-    collector = DefiLlamaCollector()
-    bridges = collector.get_formatted_bridges()
-    return pd.DataFrame(bridges) if bridges else pd.DataFrame()
-
-df = load_data()
+# Chargement données (snapshot partagé avec les autres pages)
+snapshot = get_bridge_snapshot()
+df = snapshot.frame
 
 if df.empty:
     st.error("❌ Données indisponibles")
     st.stop()
 
+if snapshot.stale:
+    st.warning(f"⚠️ Données du {snapshot.fetched_at.strftime('%d/%m %H:%M')} - actualisation DefiLlama en cours ou source indisponible")
+
 # Protection contre valeurs nulles
 df = df.fillna(0)
 
@@ -122,7 +121,47 @@ with tab2:
         st.info("Aucune donnée à afficher avec ces filtres")
 
 with tab3:
-    st.info("📊 Graphique d'évolution temporelle - Disponible prochainement (nécessite historique)")
+    if len(df_filtered) > 0:
+        periodes = {"7 jours": 7, "30 jours": 30, "90 jours": 90, "1 an": 365}
+        metriques = {"TVL": 'tvl', "Volume 24h": 'volume_24h', "Volume quotidien (historique)": 'volume_daily'}
+
+        col_a, col_b = st.columns(2)
+        with col_a:
+            periode = st.selectbox("Période", list(periodes), index=1)
+        with col_b:
+            metrique = st.selectbox("Métrique", list(metriques))
+
+        # Début arrondi à l'heure : résultat réutilisé par le cache entre deux rechargements
+        top10 = df_filtered.nlargest(10, 'tvl')
+        debut = pd.Timestamp.now().floor('h') - pd.Timedelta(days=periodes[periode])
+        history = get_history(top10['id'].tolist(), start=debut, max_points=300, metric=metriques[metrique])
+
+        if history.empty:
+            st.info("📊 Historique en cours de constitution (un point toutes les 5 minutes). "
+                    "Historique quotidien des volumes : `python -m backend.backfill`")
+        else:
+            fig3 = px.line(
+                history.rename(columns=dict(zip(top10['id'], top10['name']))),
+                title=f"{metrique} - Top 10 TVL (résolution {history.attrs['resolution']})",
+                labels={'value': metrique, 'ts': 'Date', 'bridge_id': 'Bridge'}
+            )
+            st.plotly_chart(fig3, use_container_width=True)
+
+        # Exposition par chaîne : somme des bridges qui desservent la chaîne
+        chaines = sorted(df_filtered['chains'].explode().dropna().unique())
+        if chaines:
+            chaine = st.selectbox("Chaîne", chaines, index=chaines.index('Arbitrum') if 'Arbitrum' in chaines else 0)
+            metrique_chaine = metriques[metrique] if metriques[metrique] != 'volume_daily' else 'tvl'
+            exposition = get_chain_history([chaine], start=debut, max_points=300, metric=metrique_chaine)
+            if not exposition.empty:
+                fig4 = px.line(
+                    exposition,
+                    title=f"Exposition des bridges à {chaine} (résolution {exposition.attrs['resolution']})",
+                    labels={'value': metrique_chaine, 'ts': 'Date', 'chain': 'Chaîne'}
+                )
+                st.plotly_chart(fig4, use_container_width=True)
+    else:
+        st.info("Aucune donnée à afficher avec ces filtres")
 
 # Tableau détaillé
 st.subheader("📋 Tableau comparatif")
@@ -6,7 +6,7 @@ Analyse des cryptomonnaies transitant par les bridges
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from backend.collectors.defillama import DefiLlamaCollector
+from backend.snapshot import get_bridge_snapshot
 
 st.set_page_config(page_title="Crypto Flows - XRSK", page_icon="💱", layout="wide")
 
@@ -26,46 +26,48 @@ Cette fonctionnalité nécessite des appels API supplémentaires.
 """)
 
 # Chargement données
-@st.cache_data(ttl=300)
-def load_bridge_tokens():
+def load_bridge_tokens(snapshot):
     """
     Charge les données de tokens par bridge
     Note: Fonction placeholder - à enrichir avec API détails bridges
     """
-    collector = DefiLlamaCollector()
-    bridges = collector.get_formatted_bridges()
-    
-    if not bridges:
+    if snapshot.empty:
         return pd.DataFrame()
     
+    bridges = snapshot.frame.head(20)  # Top 20 pour démo
+    
     # Placeholder: On simule les données de tokens les plus communs
     # En production, il faudrait appeler get_bridge_details() pour chaque bridge
     common_tokens = ['ETH', 'USDC', 'USDT', 'WBTC', 'DAI', 'MATIC', 'BNB', 'AVAX']
     
-    data = []
-    for bridge in bridges[:20]:  # Top 20 pour démo
-        # Pour chaque bridge, on attribue quelques tokens principaux
-        for token in common_tokens[:5]:  # 5 tokens principaux par bridge
-            # Estimation basée sur le TVL
-            estimated_amount = bridge['tvl'] * (0.1 + 0.3 * (common_tokens.index(token) / len(common_tokens)))
-            
-            data.append({
-                'bridge_name': bridge['name'],
-                'bridge_id': bridge['id'],
-                'token_symbol': token,
-                'estimated_tvl': estimated_amount,
-                'chains': ', '.join(bridge['chains'][:3]) if bridge['chains'] else 'N/A'
-            })
-    
-    return pd.DataFrame(data)
+    # 5 tokens principaux par bridge, part du TVL croissante avec le rang du token
+    tokens = pd.DataFrame({'token_symbol': common_tokens[:5]})
+    tokens['share'] = 0.1 + 0.3 * (tokens.index / len(common_tokens))
+    
+    bridges = pd.DataFrame({
+        'bridge_name': bridges['name'],
+        'bridge_id': bridges['id'],
+        'tvl': bridges['tvl'],
+        'chains': bridges['chains'].str[:3].str.join(', ').replace('', 'N/A'),
+    })
+    
+    # Estimation basée sur le TVL
+    data = bridges.merge(tokens, how='cross')
+    data['estimated_tvl'] = data['tvl'] * data['share']
+    
+    return data[['bridge_name', 'bridge_id', 'token_symbol', 'estimated_tvl', 'chains']]
 
 with st.spinner("🔄 Analyse des flux crypto..."):
-    df_flows = load_bridge_tokens()
+    snapshot = get_bridge_snapshot()
+    df_flows = load_bridge_tokens(snapshot)
 
 if df_flows.empty:
     st.error("❌ Données indisponibles")
     st.stop()
 
+if snapshot.stale:
+    st.warning(f"⚠️ Données du {snapshot.fetched_at.strftime('%d/%m %H:%M')} - actualisation DefiLlama en cours ou source indisponible")
+
 # Statistiques globales
 st.subheader("📊 Vue d'ensemble")
 
@@ -4,9 +4,19 @@ Publications et méthodologie
 """
 
 import streamlit as st
+from backend.scoring import COLLECTED_METRICS, METRICS, PILLAR_LABELS, PILLARS, get_weights, methodology
 
 st.set_page_config(page_title="Research Lab - XRSK", page_icon="🔬", layout="wide")
 
+# Pondérations publiées (version courante du moteur de scoring)
+weights = get_weights()
+piliers = "\n".join(
+    f"        {i}. **{PILLAR_LABELS[p]}** ({weights.pillars[p]:.0%}) - "
+    f"{sum(m.pillar == p for m in METRICS)} métriques"
+    for i, p in enumerate(PILLARS, start=1)
+)
+provisional = sum(m.provisional for m in METRICS)
+
 st.title("🔬 Research Lab")
 st.markdown("Publications scientifiques et méthodologie de scoring")
 st.markdown("---")
@@ -20,7 +30,7 @@ with st.container():
     col1, col2 = st.columns([3, 1])
     
     with col1:
-        st.markdown("""
+        st.markdown(f"""
         **Statut** : 🟡 En préparation - Soumission ArXiv prévue 2025/2026
         
         **Résumé**
@@ -31,13 +41,10 @@ with st.container():
         
         **Approche méthodologique**
         
-        Le framework repose sur 5 piliers pondérés évaluant 32 métriques quantifiables :
+        Le framework repose sur 5 piliers pondérés évaluant 32 métriques quantifiables
+        (définitions et bornes provisoires, en cours de validation) :
         
-        1. **Sécurité** (35%) - Audits, incidents historiques, type de validation
-        2. **Liquidité** (25%) - TVL, volumes, profondeur de marché
-        3. **Gouvernance** (20%) - Décentralisation, transparence, processus décisionnels
-        4. **Opérationnel** (15%) - Performance technique, disponibilité, latence
-        5. **Réglementaire** (5%) - Conformité, KYC/AML, juridiction
+{piliers}
         
         **Contributions clés**
         
@@ -66,17 +73,31 @@ st.markdown("---")
 # Section Méthodologie (simplifié pour éviter erreurs)
 st.header("📊 Méthodologie de Scoring")
 
-st.write("""
-Le framework XRSK évalue les bridges cross-chain selon 5 piliers :
-
-**1. Sécurité (35%)** - Audits, historique incidents, validation
-**2. Liquidité (25%)** - TVL, volumes, profondeur marché  
-**3. Gouvernance (20%)** - Décentralisation, transparence
-**4. Opérationnel (15%)** - Performance, uptime, frais
-**5. Réglementaire (5%)** - Conformité MiCA/DORA
+if provisional:
+    st.warning(f"⚠️ Méthodologie provisoire : {provisional} métriques sur {len(METRICS)} ont des définitions et "
+               f"des bornes de travail, non encore validées par la publication. Seules {len(COLLECTED_METRICS)} "
+               f"métriques sont aujourd'hui alimentées par les données collectées ; les scores affichés ne "
+               f"constituent pas une évaluation publiée.")
 
-Détails complets disponibles dans la publication ArXiv.
+st.write(f"""
+Le framework XRSK évalue les bridges cross-chain selon 5 piliers et 32 métriques,
+chacune normalisée de 0 à 100 sur des bornes fixes (échelle log pour les montants USD).
+Le score d'un pilier est la moyenne pondérée de ses métriques connues ; le score total
+est la somme pondérée des piliers (pondérations version **{weights.version}**).
 """)
 
+table = methodology()
+table['pillar_weight'] = table['pillar_weight'].map(lambda x: f"{x:.0%}")
+table['weight'] = table['weight'].map(lambda x: f"{x:.2%}")
+table['higher_is_better'] = table['higher_is_better'].map({True: '↑', False: '↓'})
+table['provisional'] = table['provisional'].map({True: '🟡 Provisoire', False: '✓ Publiée'})
+table['collected'] = table['collected'].map({True: '✓', False: '—'})
+table = table.drop(columns='metric')
+table.columns = ['Pilier', 'Poids pilier', 'Métrique', 'Poids total', 'Borne basse', 'Borne haute', 'Sens',
+                 'Statut', 'Collectée']
+st.dataframe(table, use_container_width=True, hide_index=True, height=600)
+
+st.caption("Détails complets disponibles dans la publication ArXiv.")
+
 st.markdown("---")
 st.caption("XRSK Platform Research Lab - Contribution à une DeFi plus sûre et conforme")
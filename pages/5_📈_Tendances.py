@@ -8,7 +8,10 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from backend.collectors.defillama import DefiLlamaCollector
+from backend.anomalies import get_anomalies
+from backend.snapshot import get_bridge_snapshot
+from backend.timeseries import get_history
+from backend.variations import get_variations
 
 st.set_page_config(page_title="Tendances - XRSK", page_icon="📈", layout="wide")
 
@@ -35,28 +38,31 @@ st.title("📈 Tendances & Évolution")
 st.markdown("Analyse des variations et performances des bridges cross-chain")
 st.markdown("---")
 
-# Chargement données
-@st.cache_data(ttl=300)
-def load_data():
-    collector = DefiLlamaCollector()
-    bridges = collector.get_formatted_bridges()
-    return pd.DataFrame(bridges) if bridges else pd.DataFrame()
-
-df = load_data()
+# Chargement données (snapshot partagé avec les autres pages)
+snapshot = get_bridge_snapshot()
+df = snapshot.frame
 
 if df.empty:
     st.error("❌ Données indisponibles")
     st.stop()
 
-# Calcul des variations (simulées car API ne fournit pas l'historique en direct)
-# En production, il faudrait stocker l'historique ou utiliser l'endpoint /bridgedaystats
-import random
-random.seed(42)  # Pour reproductibilité
+if snapshot.stale:
+    st.warning(f"⚠️ Données du {snapshot.fetched_at.strftime('%d/%m %H:%M')} - actualisation DefiLlama en cours ou source indisponible")
 
-df['variation_24h'] = df['volume_24h'].apply(lambda x: random.uniform(-15, 25) if x > 0 else 0)
-df['variation_7d'] = df['tvl'].apply(lambda x: random.uniform(-30, 40) if x > 0 else 0)
+# Variations réelles de TVL et de volume (historique local, en cache par snapshot)
+variations = get_variations(snapshot)
+df['variation_1h'] = variations['tvl_pct_1h']
+df['variation_24h'] = variations['tvl_pct_24h']
+df['variation_7d'] = variations['tvl_pct_7d']
+df['variation_30d'] = variations['tvl_pct_30d']
+df['variation_volume_24h'] = variations['volume_24h_pct_24h']
 df['dominance'] = (df['tvl'] / df['tvl'].sum() * 100)
 
+# Bridges avec un historique à 24h (les nouveaux bridges n'en ont pas)
+df_var = df[df['variation_24h'].notna()]
+if df_var.empty:
+    st.info("📊 Variations 24h disponibles après 24h d'historique local - l'historique est enregistré à chaque actualisation des données")
+
 # ============================================
 # VUE D'ENSEMBLE
 # ============================================
@@ -66,37 +72,69 @@ st.subheader("📊 Vue d'ensemble du marché")
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    avg_variation = df['variation_24h'].mean()
+    # Variation de la TVL totale des bridges comparables (pondérée par la TVL)
+    tvl_before = (df_var['tvl'] - variations.loc[df_var.index, 'tvl_delta_24h']).sum()
+    avg_variation = (df_var['tvl'].sum() / tvl_before - 1) * 100 if tvl_before > 0 else 0.0
     st.metric(
-        "Variation moyenne 24h",
+        "Variation TVL 24h",
         f"{avg_variation:+.1f}%",
         delta=f"{avg_variation:+.1f}%"
     )
 
 with col2:
-    bullish = len(df[df['variation_24h'] > 0])
+    bullish = int((df_var['variation_24h'] > 0).sum())
     st.metric(
         "Bridges en hausse",
         f"{bullish}",
-        delta=f"{bullish}/{len(df)}"
+        delta=f"{bullish}/{len(df_var)}"
     )
 
 with col3:
-    bearish = len(df[df['variation_24h'] < 0])
+    bearish = int((df_var['variation_24h'] < 0).sum())
     st.metric(
         "Bridges en baisse",
         f"{bearish}",
-        delta=f"{bearish}/{len(df)}",
+        delta=f"{bearish}/{len(df_var)}",
         delta_color="inverse"
     )
 
 with col4:
-    top_bridge = df.nlargest(1, 'variation_24h').iloc[0]
-    st.metric(
-        "Meilleure perf 24h",
-        f"{top_bridge['name'][:15]}...",
-        delta=f"+{top_bridge['variation_24h']:.1f}%"
-    )
+    if df_var.empty:
+        st.metric("Meilleure perf 24h", "-")
+    else:
+        top_bridge = df_var.nlargest(1, 'variation_24h').iloc[0]
+        st.metric(
+            "Meilleure perf 24h",
+            f"{top_bridge['name'][:15]}...",
+            delta=f"{top_bridge['variation_24h']:+.1f}%"
+        )
+
+st.markdown("---")
+
+# ============================================
+# ANOMALIES
+# ============================================
+
+st.subheader("🚨 Anomalies de TVL et de volume (24h)")
+
+# Variations brutales détectées à l'ingestion (z-score robuste par bridge)
+anomalies = get_anomalies(start=snapshot.fetched_at - timedelta(days=1))
+if anomalies.empty:
+    st.success("✓ Aucune variation anormale de TVL ou de volume détectée sur les dernières 24h")
+else:
+    names = df.drop_duplicates('id').set_index('id')['name']
+    table = anomalies.assign(bridge=anomalies['bridge_id'].map(names).fillna(anomalies['bridge_id'].astype(str)))
+    table = table[['ts', 'bridge', 'severity', 'metric', 'kind', 'previous', 'value', 'change_pct', 'zscore']]
+    table['ts'] = table['ts'].dt.strftime('%d/%m %H:%M')
+    table['severity'] = table['severity'].map({'critical': '🔴 Critique', 'high': '🟠 Élevée', 'medium': '🟡 Moyenne'})
+    table['metric'] = table['metric'].map({'tvl': 'TVL', 'volume_24h': 'Volume 24h'})
+    table['kind'] = table['kind'].map({'drop': '📉 Baisse', 'spike': '📈 Hausse'})
+    table['previous'] = table['previous'].map(lambda x: f"${x/1e6:.1f}M")
+    table['value'] = table['value'].map(lambda x: f"${x/1e6:.1f}M")
+    table['change_pct'] = table['change_pct'].map(lambda x: f"{x:+.1f}%")
+    table['zscore'] = table['zscore'].map(lambda x: f"{x:+.1f}")
+    table.columns = ['Date', 'Bridge', 'Sévérité', 'Métrique', 'Type', 'Avant', 'Après', 'Variation', 'Z-score']
+    st.dataframe(table, use_container_width=True, hide_index=True)
 
 st.markdown("---")
 
@@ -110,19 +148,19 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.markdown("### 🚀 Top Gainers")
-    top_gainers = df.nlargest(10, 'variation_24h')[['name', 'tvl', 'variation_24h', 'dominance']]
-    top_gainers['tvl'] = top_gainers['tvl'].apply(lambda x: f"${x/1e6:.1f}M")
-    top_gainers['variation_24h'] = top_gainers['variation_24h'].apply(lambda x: f"+{x:.1f}%")
-    top_gainers['dominance'] = top_gainers['dominance'].apply(lambda x: f"{x:.2f}%")
+    top_gainers = df_var.nlargest(10, 'variation_24h')[['name', 'tvl', 'variation_24h', 'dominance']]
+    top_gainers['tvl'] = top_gainers['tvl'].map(lambda x: f"${x/1e6:.1f}M")
+    top_gainers['variation_24h'] = top_gainers['variation_24h'].map(lambda x: f"{x:+.1f}%")
+    top_gainers['dominance'] = top_gainers['dominance'].map(lambda x: f"{x:.2f}%")
     top_gainers.columns = ['Bridge', 'TVL', 'Var 24h', 'Dominance']
     st.dataframe(top_gainers, use_container_width=True, hide_index=True)
 
 with col2:
     st.markdown("### 📉 Top Losers")
-    top_losers = df.nsmallest(10, 'variation_24h')[['name', 'tvl', 'variation_24h', 'dominance']]
-    top_losers['tvl'] = top_losers['tvl'].apply(lambda x: f"${x/1e6:.1f}M")
-    top_losers['variation_24h'] = top_losers['variation_24h'].apply(lambda x: f"{x:.1f}%")
-    top_losers['dominance'] = top_losers['dominance'].apply(lambda x: f"{x:.2f}%")
+    top_losers = df_var.nsmallest(10, 'variation_24h')[['name', 'tvl', 'variation_24h', 'dominance']]
+    top_losers['tvl'] = top_losers['tvl'].map(lambda x: f"${x/1e6:.1f}M")
+    top_losers['variation_24h'] = top_losers['variation_24h'].map(lambda x: f"{x:+.1f}%")
+    top_losers['dominance'] = top_losers['dominance'].map(lambda x: f"{x:.2f}%")
     top_losers.columns = ['Bridge', 'TVL', 'Var 24h', 'Dominance']
     st.dataframe(top_losers, use_container_width=True, hide_index=True)
 
@@ -135,11 +173,11 @@ st.markdown("---")
 st.subheader("📊 Distribution des variations 24h")
 
 fig_hist = px.histogram(
-    df,
+    df_var,
     x='variation_24h',
     nbins=30,
     title='',
-    labels={'variation_24h': 'Variation 24h (%)', 'count': 'Nombre de bridges'},
+    labels={'variation_24h': 'Variation TVL 24h (%)', 'count': 'Nombre de bridges'},
     color_discrete_sequence=['#1F4E78']
 )
 fig_hist.add_vline(x=0, line_dash="dash", line_color="red", annotation_text="0%")
@@ -188,7 +226,7 @@ st.plotly_chart(fig_dom, use_container_width=True)
 st.subheader("💹 Variation 24h vs TVL")
 
 fig_scatter = px.scatter(
-    df,
+    df_var,
     x='tvl',
     y='variation_24h',
     size='volume_24h',
@@ -208,20 +246,52 @@ fig_scatter.update_layout(
 )
 st.plotly_chart(fig_scatter, use_container_width=True)
 
+# ============================================
+# ÉVOLUTION HISTORIQUE
+# ============================================
+
+st.subheader("📈 Évolution de la TVL (Top 10)")
+
+periodes = {"24 heures": 1, "7 jours": 7, "30 jours": 30, "90 jours": 90}
+periode = st.radio("Période", list(periodes), index=1, horizontal=True)
+
+top10 = df.nlargest(10, 'tvl')
+debut = pd.Timestamp.now().floor('h') - pd.Timedelta(days=periodes[periode])
+history = get_history(top10['id'].tolist(), start=debut, max_points=300)
+
+if history.empty:
+    st.info("📊 Historique en cours de constitution - un point est enregistré à chaque actualisation des données")
+else:
+    fig_evol = px.line(
+        history.rename(columns=dict(zip(top10['id'], top10['name']))),
+        title='',
+        labels={'value': 'TVL (USD)', 'ts': 'Date', 'bridge_id': 'Bridge'}
+    )
+    fig_evol.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="Inter, sans-serif", color="#2C3E50"),
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=True, gridcolor='#F0F0F0')
+    )
+    st.plotly_chart(fig_evol, use_container_width=True)
+    st.caption(f"Résolution : {history.attrs['resolution']} - {len(history)} points")
+
 # ============================================
 # TABLEAU COMPLET
 # ============================================
 
 st.subheader("📋 Tableau détaillé des variations")
 
-df_display = df[['name', 'tvl', 'volume_24h', 'variation_24h', 'variation_7d', 'dominance']].copy()
-df_display = df_display.sort_values('variation_24h', ascending=False)
-df_display['tvl'] = df_display['tvl'].apply(lambda x: f"${x/1e6:.1f}M")
-df_display['volume_24h'] = df_display['volume_24h'].apply(lambda x: f"${x/1e6:.1f}M")
-df_display['variation_24h'] = df_display['variation_24h'].apply(lambda x: f"{x:+.1f}%")
-df_display['variation_7d'] = df_display['variation_7d'].apply(lambda x: f"{x:+.1f}%")
-df_display['dominance'] = df_display['dominance'].apply(lambda x: f"{x:.2f}%")
-df_display.columns = ['Bridge', 'TVL', 'Volume 24h', 'Var 24h', 'Var 7j', 'Dominance']
+variation_columns = ['variation_1h', 'variation_24h', 'variation_7d', 'variation_30d', 'variation_volume_24h']
+df_display = df[['name', 'tvl', 'volume_24h', *variation_columns, 'dominance']].copy()
+df_display = df_display.sort_values('variation_24h', ascending=False, na_position='last')
+df_display['tvl'] = df_display['tvl'].map(lambda x: f"${x/1e6:.1f}M")
+df_display['volume_24h'] = df_display['volume_24h'].map(lambda x: f"${x/1e6:.1f}M")
+for column in variation_columns:
+    df_display[column] = df_display[column].map(lambda x: f"{x:+.1f}%" if pd.notna(x) else "-")
+df_display['dominance'] = df_display['dominance'].map(lambda x: f"{x:.2f}%")
+df_display.columns = ['Bridge', 'TVL', 'Volume 24h', 'Var 1h', 'Var 24h', 'Var 7j', 'Var 30j', 'Var volume 24h', 'Dominance']
 
 st.dataframe(df_display, use_container_width=True, height=500, hide_index=True)
 
@@ -242,13 +312,9 @@ st.markdown("---")
 st.info("""
 📊 **Note sur les variations**
 
-Les variations affichées sont des **estimations** basées sur les données actuelles de DefiLlama.
-Pour des variations historiques précises, il faudrait :
-1. Stocker l'historique des données (base de données)
-2. Utiliser l'endpoint `/bridgedaystats` de DefiLlama
-3. Comparer les valeurs sur différentes périodes
-
-**Hook préparé** : La structure permet d'ajouter facilement une base de données historique.
+Les variations comparent le snapshot courant DefiLlama à l'historique local (`data/history.sqlite`),
+enregistré à chaque actualisation : TVL sur 1h, 24h, 7 jours et 30 jours, volume 24h sur 24h.
+Un horizon s'affiche dès que l'historique le couvre ; les nouveaux bridges n'ont pas encore de variation.
 """)
 
 st.markdown("---")
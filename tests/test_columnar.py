@@ -0,0 +1,51 @@
+"""
+Tests de la lecture des segments colonnes (backend.columnar)
+
+    python -m unittest discover tests
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from backend.columnar import ColumnarHistory, export_closed_days, read_snapshot
+from backend.history import HistoryStore
+
+from tests.test_history import T0, bridges_frame
+
+
+class ReadSnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        root = Path(self.directory.name)
+        self.store = HistoryStore(root / 'history.sqlite')
+        self.history = ColumnarHistory(root / 'columnar')
+        # 3 jours, un snapshot par heure : les 2 premiers jours sont exportés
+        self.store.append_snapshots(
+            (bridges_frame(n=10, seed=k % 5), T0 + k * 3600, str(k)) for k in range(3 * 24))
+        self.assertEqual(export_closed_days(self.store, self.history), 2)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assertSameState(self, t):
+        state = read_snapshot(t, columns=('tvl', 'volume_24h'), store=self.store, history=self.history)
+        expected = self.store.read_as_of(t, columns=['tvl', 'volume_24h'])
+        self.assertEqual(state.shape, expected.shape)
+        self.assertEqual(state['bridge_id'].tolist(), expected['bridge_id'].tolist())
+        self.assertEqual(state['tvl'].tolist(), expected['tvl'].tolist())
+        self.assertEqual(state['volume_24h'].tolist(), expected['volume_24h'].tolist())
+
+    def test_exact_snapshot_in_segment(self):
+        self.assertSameState(T0 + 30 * 3600)
+
+    def test_time_between_snapshots_in_segment(self):
+        self.assertSameState(T0 + 30 * 3600 + 1800)
+
+    def test_time_before_first_snapshot(self):
+        self.assertTrue(read_snapshot(T0 - 1, store=self.store, history=self.history).empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+Tests du décodage en flux /bridges (backend.collectors.decode)
+
+    python -m unittest discover tests
+"""
+
+import json
+import unittest
+from datetime import datetime
+
+import pandas as pd
+
+from backend.collectors.decode import decode_bridges_stream
+from backend.collectors.formatting import format_bridges_frame
+
+SNAPSHOT_TIME = datetime(2026, 1, 1)
+
+# Lignes mal formées : champs manquants, nuls, de mauvais type
+MALFORMED = [
+    {'id': 1, 'displayName': 'Chaîne texte', 'tvl': '12.5', 'chains': 'Ethereum'},
+    {'id': '3.7', 'name': None, 'chains': None, 'last24hVolume': None, 'lastDailyVolume': '7'},
+    {'id': 'x', 'name': 5, 'tvl': 'abc', 'weeklyVolume': True, 'chains': ['Ethereum', 'Base']},
+    {'chains': {'Ethereum': 1}},
+    {'id': 4, 'monthlyVolume': 1e9, 'chains': []},
+]
+
+
+def stream(bridges, chunk_size: int = 7):
+    """Corps JSON /bridges découpé en petits morceaux"""
+    body = json.dumps({'bridges': bridges}).encode('utf-8')
+    return [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+
+class DecodeParityTest(unittest.TestCase):
+
+    def test_malformed_rows_match_format_bridges_frame(self):
+        decoded = decode_bridges_stream(stream(MALFORMED)).to_frame(SNAPSHOT_TIME)
+        pd.testing.assert_frame_equal(decoded, format_bridges_frame(MALFORMED, SNAPSHOT_TIME))
+
+    def test_string_chains_are_not_split(self):
+        decoded = decode_bridges_stream(stream(MALFORMED[:1])).to_frame(SNAPSHOT_TIME)
+        self.assertEqual(decoded['chains'].iloc[0], [])
+        self.assertEqual(decoded['chains_count'].iloc[0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
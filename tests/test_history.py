@@ -0,0 +1,68 @@
+"""
+Tests du store historique (backend.history)
+
+    python -m unittest discover tests
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from backend.history import DAY, HistoryStore
+
+# Début des séries de test (epoch, minuit UTC)
+T0 = 1_790_812_800
+
+
+def bridges_frame(n: int = 5, seed: int = 0) -> pd.DataFrame:
+    """DataFrame bridges minimal (colonnes formatting.BRIDGE_DTYPES)"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1, dtype='int64'),
+        'name': [f"Bridge {i}" for i in range(1, n + 1)],
+        'tvl': rng.uniform(1e6, 1e9, n),
+        'volume_24h': rng.uniform(1e5, 1e8, n),
+        'volume_7d': rng.uniform(1e6, 1e9, n),
+        'volume_30d': rng.uniform(1e7, 1e10, n),
+        'chains': [['Ethereum', 'Arbitrum']] * n,
+        'chains_count': np.full(n, 2, dtype='int64'),
+    })
+
+
+class RetentionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = HistoryStore(Path(self.directory.name) / 'history.sqlite',
+                                  retention={'raw': 7 * DAY, '1h': 90 * DAY})
+        # 20 jours, un snapshot par heure
+        self.store.append_snapshots(
+            (bridges_frame(seed=k % 5), T0 + k * 3600, str(k)) for k in range(20 * 24))
+        self.last = self.store.time_bounds()[1]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_window_older_than_raw_tier_reads_rollups(self):
+        self.store.apply_retention()
+        start, end = self.last - 15 * DAY, self.last - 12 * DAY
+        self.assertTrue(self.store.read_range(start=start, end=end).empty)
+
+        self.assertEqual(self.store.choose_resolution(start, end, max_points=1000), '1h')
+        history = self.store.query_range(start=start, end=end, max_points=1000)
+        self.assertEqual(history.attrs['resolution'], '1h')
+        self.assertEqual(history['ts'].nunique(), 3 * 24 + 1)
+
+    def test_recent_window_stays_raw(self):
+        self.store.apply_retention()
+        start, end = self.last - 2 * DAY, self.last
+        history = self.store.query_range(start=start, end=end, max_points=1000)
+        self.assertEqual(history.attrs['resolution'], 'raw')
+        self.assertEqual(history['ts'].nunique(), 2 * 24 + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
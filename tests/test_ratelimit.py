@@ -0,0 +1,31 @@
+"""
+Tests de la politique de retry (backend.ratelimit)
+
+    python -m unittest discover tests
+"""
+
+import unittest
+
+from backend.ratelimit import EndpointPolicy
+
+
+class BackoffTest(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = EndpointPolicy(rate=1.0, burst=1, backoff_max=30.0, retry_after_max=300.0)
+
+    def test_jitter_is_capped(self):
+        for attempt in range(10):
+            self.assertLessEqual(self.policy.backoff(attempt), 30.0)
+
+    def test_retry_after_is_honoured_beyond_backoff_cap(self):
+        delay = self.policy.backoff(0, '120')
+        self.assertEqual(delay, 120.0)
+        self.assertFalse(self.policy.gives_up(delay))
+
+    def test_too_long_retry_after_gives_up(self):
+        self.assertTrue(self.policy.gives_up(self.policy.backoff(0, '3600')))
+
+
+if __name__ == '__main__':
+    unittest.main()